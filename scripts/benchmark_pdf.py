@@ -0,0 +1,306 @@
+"""Benchmark of the PDF text extraction backends.
+
+A corpus of text PDF files is generated, and the text of every file is
+extracted with every available backend, by a single process and by page
+ranges in parallel worker processes. The throughput in pages per second
+and the peak total resident memory of every run are reported.
+
+Every run is done in a fresh process, so the memories of the runs do not
+add up. The total memory of a run is the sum of the resident memories of
+its process and its worker processes, sampled while it runs, which needs
+the /proc file system of Linux. The workers read the files themselves, as
+the indexing does, instead of receiving their content. The environment
+variables of the application must be set, as the parsers are imported from
+it.
+
+Usage:
+    python -m scripts.benchmark_pdf --files 8 --pages 200 --workers 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+from src.core.config import PDFBackend
+from src.service.parser.factory import backend_to_pdf_parser
+from src.service.parser.pdf_parser import PDFParser
+
+LINE: str = "The quick brown fox jumps over the lazy dog, {page} {line}."
+
+# Seconds between two samples of the resident memory of a run.
+RSS_SAMPLE_INTERVAL: float = 0.005
+
+
+def generate_pdf(pages: int, lines_per_page: int) -> bytes:
+    """Generate a PDF file with lines of text on every page.
+
+    Arguments:
+        pages: The number of pages.
+        lines_per_page: The number of lines of every page.
+
+    Returns:
+        The content of the PDF file.
+    """
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids: list[int] = []
+    for page in range(pages):
+        text: str = "".join(
+            f"({LINE.format(page=page, line=line)}) Tj T* "
+            for line in range(lines_per_page)
+        )
+        stream: bytes = f"BT /F1 10 Tf 12 TL 40 800 Td {text}ET".encode()
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        page_ids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % page_id for page_id in page_ids),
+        pages,
+    )
+
+    content: bytearray = bytearray(b"%PDF-1.4\n")
+    offsets: list[int] = []
+    for object_id, body in enumerate(objects, start=1):
+        offsets.append(len(content))
+        content += b"%d 0 obj\n%s\nendobj\n" % (object_id, body)
+    xref: int = len(content)
+    content += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    content += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    content += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(content)
+
+
+def parse_pages(backend: PDFBackend, path: Path, start: int, stop: int) -> list[str]:
+    """Parse a range of pages of a PDF file in a worker process.
+
+    Arguments:
+        backend: The PDF backend.
+        path: The path of the PDF file.
+        start: The index of the first page.
+        stop: The index after the last page.
+
+    Returns:
+        The text of every page of the range.
+    """
+    parser: PDFParser = backend_to_pdf_parser[backend]()
+    with path.open("rb") as file:
+        return list(parser.parse_pages(content=file, start=start, stop=stop))
+
+
+def get_rss(pid: int) -> int:
+    """Get the resident memory of a process.
+
+    Arguments:
+        pid: The ID of the process.
+
+    Returns:
+        The resident memory in KiB, 0 if the process is gone.
+    """
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (FileNotFoundError, ProcessLookupError):
+        pass
+    return 0
+
+
+def get_children(pid: int) -> list[int]:
+    """Get the child processes of a process.
+
+    Arguments:
+        pid: The ID of the process.
+
+    Returns:
+        The IDs of the children.
+    """
+    children: list[int] = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as task_children:
+                children.extend(int(child) for child in task_children.read().split())
+        except FileNotFoundError:
+            continue
+    return children
+
+
+class TotalRSSSampler(threading.Thread):
+    """Sampler of the peak total resident memory of a process and children.
+
+    Attributes:
+        peak: The highest sampled total in KiB.
+    """
+
+    def __init__(self):
+        """Initialize the sampler."""
+        super().__init__(daemon=True)
+        self.peak: int = 0
+        self._stopped: threading.Event = threading.Event()
+
+    def run(self) -> None:
+        """Sample the total resident memory until stopped."""
+        pid: int = os.getpid()
+        while True:
+            self.sample(pid)
+            if self._stopped.wait(RSS_SAMPLE_INTERVAL):
+                return
+
+    def sample(self, pid: int) -> None:
+        """Sample the total resident memory of a process and its children.
+
+        Arguments:
+            pid: The ID of the process.
+        """
+        self.peak = max(self.peak, get_rss(pid) + sum(map(get_rss, get_children(pid))))
+
+    def stop(self) -> None:
+        """Stop sampling, after a last sample."""
+        self._stopped.set()
+        self.join()
+        self.sample(os.getpid())
+
+
+def run(
+    backend: PDFBackend, paths: list[Path], workers: int, pages_per_task: int
+) -> dict[str, Any]:
+    """Extract the text of the corpus and measure the run.
+
+    Arguments:
+        backend: The PDF backend.
+        paths: The paths of the PDF files.
+        workers: The number of worker processes, 1 to parse serially.
+        pages_per_task: The number of pages parsed by a worker at a time.
+
+    Returns:
+        The number of pages and characters, the seconds and the peak total
+        resident memory in MiB of the run.
+    """
+    parser: PDFParser = backend_to_pdf_parser[backend]()
+    pages: int = 0
+    characters: int = 0
+    sampler: TotalRSSSampler = TotalRSSSampler()
+    sampler.start()
+    started_at: float = perf_counter()
+    if workers == 1:
+        for path in paths:
+            for text in parser.parse(path.read_bytes()):
+                pages += 1
+                characters += len(text)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            for path in paths:
+                with path.open("rb") as file:
+                    page_count: int = parser.count_pages(file)
+                for texts in executor.map(
+                    parse_pages,
+                    *zip(
+                        *(
+                            (
+                                backend,
+                                path,
+                                start,
+                                min(start + pages_per_task, page_count),
+                            )
+                            for start in range(0, page_count, pages_per_task)
+                        )
+                    ),
+                ):
+                    pages += len(texts)
+                    characters += sum(len(text) for text in texts)
+            sampler.sample(os.getpid())
+    seconds: float = perf_counter() - started_at
+    sampler.stop()
+    return {
+        "pages": pages,
+        "characters": characters,
+        "seconds": seconds,
+        "peak_rss_mib": sampler.peak / 1024,
+    }
+
+
+def is_available(backend: PDFBackend) -> bool:
+    """Check whether the library of a backend is installed.
+
+    Arguments:
+        backend: The PDF backend.
+
+    Returns:
+        Whether the backend can be benchmarked.
+    """
+    if backend != PDFBackend.PDFIUM:
+        return True
+    try:
+        import pypdfium2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def main() -> None:
+    """Generate the corpus and benchmark every available backend."""
+    arguments_parser = argparse.ArgumentParser(description=__doc__)
+    arguments_parser.add_argument("--files", type=int, default=8)
+    arguments_parser.add_argument("--pages", type=int, default=200)
+    arguments_parser.add_argument("--lines-per-page", type=int, default=60)
+    arguments_parser.add_argument("--workers", type=int, default=4)
+    arguments_parser.add_argument("--pages-per-task", type=int, default=32)
+    arguments = arguments_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths: list[Path] = []
+        for index in range(arguments.files):
+            path = Path(directory) / f"{index}.pdf"
+            path.write_bytes(
+                generate_pdf(
+                    pages=arguments.pages, lines_per_page=arguments.lines_per_page
+                )
+            )
+            paths.append(path)
+
+        print(
+            f"{'backend':<8} {'workers':>7} {'pages':>7} {'pages/s':>9} "
+            f"{'total MiB':>9}"
+        )
+        context = multiprocessing.get_context("spawn")
+        for backend in PDFBackend:
+            if not is_available(backend):
+                print(f"{backend.value:<8} skipped, its library is not installed")
+                continue
+            for workers in sorted({1, arguments.workers}):
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as runner:
+                    result: dict[str, Any] = runner.submit(
+                        run,
+                        backend=backend,
+                        paths=paths,
+                        workers=workers,
+                        pages_per_task=arguments.pages_per_task,
+                    ).result()
+                print(
+                    f"{backend.value:<8} {workers:>7} {result['pages']:>7} "
+                    f"{result['pages'] / result['seconds']:>9.1f} "
+                    f"{result['peak_rss_mib']:>9.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
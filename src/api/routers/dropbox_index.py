@@ -2,9 +2,12 @@
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Path, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
 
-from src.service.dropbox.resource_index import ResourceIndexService
+from src.schemas.index_job import IndexJobSchema
+from src.service.dropbox.index_job import IndexJobService
 
 from ..deps import ResourcePathParams, SessionDep, UserTeamsIdDependency
 
@@ -13,18 +16,40 @@ dropbox_index_router = APIRouter(
     tags=["dropbox-index"],
 )
 
-resource_index_service: ResourceIndexService = ResourceIndexService()
+index_job_service: IndexJobService = IndexJobService()
 
 
-@dropbox_index_router.post("/{resource_id}/", status_code=status.HTTP_201_CREATED)
+@dropbox_index_router.post(
+    "/{resource_id}/",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=IndexJobSchema,
+)
 async def index_resources(
     session: SessionDep,
     user_teams_id_dependency: Annotated[UserTeamsIdDependency, Depends()],
     resource_path_params: Annotated[ResourcePathParams, Depends()],
-) -> None:
-    """Index resources for a user."""
-    await resource_index_service.index_resource(
+) -> ORJSONResponse:
+    """Create a job to index resources for a user."""
+    job: IndexJobSchema = await index_job_service.create_job(
         user_teams_id=user_teams_id_dependency.teams_id,
         session=session,
         resource_id=resource_path_params.resource_id,
     )
+    return ORJSONResponse(
+        content=jsonable_encoder(job), status_code=status.HTTP_202_ACCEPTED
+    )
+
+
+@dropbox_index_router.get("/jobs/{job_id}/", response_model=IndexJobSchema)
+async def get_index_job(
+    session: SessionDep,
+    user_teams_id_dependency: Annotated[UserTeamsIdDependency, Depends()],
+    job_id: Annotated[int, Path(description="Index job ID.")],
+) -> ORJSONResponse:
+    """Get the status and the progress of an index job of a user."""
+    job: IndexJobSchema = await index_job_service.get_job(
+        user_teams_id=user_teams_id_dependency.teams_id,
+        session=session,
+        job_id=job_id,
+    )
+    return ORJSONResponse(content=jsonable_encoder(job))
@@ -2,9 +2,12 @@
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
 
+from src.schemas.query import QueryResponse, SearchMode
 from src.service.query import QueryService
 
 from ..deps import SessionDep, UserTeamsIdDependency
@@ -17,20 +20,50 @@ query_router = APIRouter(
 query_service: QueryService = QueryService()
 
 
+class QueryParams(BaseModel):
+    """Query parameters for query operations."""
+
+    query: str = Query(description="The query to search.")
+    mode: SearchMode = Query(
+        default=SearchMode.VECTOR,
+        description="Search mode: vector, hybrid (BM25 + vector) or keyword.",
+    )
+    alpha: float = Query(
+        default=0.5,
+        ge=0,
+        le=1,
+        description=(
+            "Weight of the vector score in hybrid mode, "
+            "0 is pure keyword and 1 is pure vector search."
+        ),
+    )
+    limit: int = Query(
+        default=10, ge=1, le=100, description="Maximum number of results."
+    )
+    cursor: str | None = Query(
+        default=None, description="Cursor of the page from the previous response."
+    )
+
+
 @query_router.get(
     "/",
     summary="Query the resources of a user.",
+    response_model=QueryResponse,
 )
 async def query_resources(
-    query: str,
     session: SessionDep,
     user_teams_id_dependency: Annotated[UserTeamsIdDependency, Depends()],
+    query_params: Annotated[QueryParams, Depends()],
 ):
     """Query the resources of a user."""
     result = await query_service.query(
-        query=query,
+        query=query_params.query,
         session=session,
         user_teams_id=user_teams_id_dependency.teams_id,
+        mode=query_params.mode,
+        alpha=query_params.alpha,
+        limit=query_params.limit,
+        cursor=query_params.cursor,
     )
 
-    return ORJSONResponse(content=result)
+    return ORJSONResponse(content=jsonable_encoder(result))
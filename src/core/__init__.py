@@ -5,6 +5,8 @@ from .exceptions import (
     ConflictError,
     InvalidInputError,
     NotFoundError,
+    ServiceUnavailableError,
+    TooManyRequestsError,
     UnprocessableEntityError,
 )
 
@@ -14,5 +16,7 @@ __all__ = [
     "ConflictError",
     "InvalidInputError",
     "NotFoundError",
+    "ServiceUnavailableError",
+    "TooManyRequestsError",
     "UnprocessableEntityError",
 ]
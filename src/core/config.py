@@ -1,5 +1,7 @@
 """Project configurations."""
 
+from enum import Enum
+
 from pydantic import BaseModel, PostgresDsn, computed_field
 from pydantic_core import MultiHostUrl
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -39,16 +41,222 @@ class SqlDBConfigurations(BaseModel):
         )
 
 
+class VectorDBBackend(str, Enum):
+    """Vector database backend enumeration."""
+
+    WEAVIATE = "weaviate"
+    LOCAL = "local"
+
+
+class PDFBackend(str, Enum):
+    """PDF text extraction backend enumeration."""
+
+    PYPDF2 = "pypdf2"
+    PDFIUM = "pdfium"
+
+
 class VectorDBConfigurations(BaseModel):
     """Vector DB configurations class.
 
     Attributes:
         HOST: Database host.
         KEY: Database key.
+        POOL_CONNECTIONS: Number of connection pools of the shared client.
+        POOL_MAXSIZE: Maximum number of connections in a pool.
+        HEALTH_CHECK_INTERVAL: Seconds between health checks of the
+            shared client.
+        MAX_WORKERS: Maximum number of threads running blocking
+            vector database operations.
+        BACKEND: Vector database backend.
+        LOCAL_PATH: Directory of the collections of the local backend.
+        EMBEDDING_DIMENSIONS: Vector dimensions of the local backend.
+        COLLECTION: Name of the multi-tenant collection shared by the users.
+        TENANT_IDLE_TIMEOUT: Seconds without use after which the data of
+            a tenant is offloaded.
+        TENANT_IDLE_CHECK_INTERVAL: Seconds between two checks of the
+            idle tenants, each recording the tenants used by the process.
+        BATCH_SIZE: Number of buffered objects which triggers a batch
+            insert during an index job.
+        BATCH_FLUSH_INTERVAL: Maximum seconds an object is buffered before
+            it is inserted during an index job.
+        SHARED_GC_INTERVAL: Seconds between two deletions of the shared
+            contents no longer indexed by any user.
+        SHARED_GC_GRACE_PERIOD: Seconds since the last use of a shared
+            content before it can be deleted.
+        SHARED_FILTER_MAX_CONTENTS: Maximum number of contents of a user
+            whose hashes filter the query of the shared tenant. The shared
+            results of a user with more contents are found among the best
+            results of all the users instead.
+        SHARED_OVERFETCH_FACTOR: Number of times more results searched in
+            the shared tenant for a user with too many contents to filter
+            them.
+        QUERY_MAX_OFFSET: Maximum number of results skipped by the cursor
+            of a query page, since every page searches all the results
+            before it.
     """
 
     HOST: str
     KEY: str
+    POOL_CONNECTIONS: int = 20
+    POOL_MAXSIZE: int = 100
+    HEALTH_CHECK_INTERVAL: float = 30.0
+    MAX_WORKERS: int = 16
+    BACKEND: VectorDBBackend = VectorDBBackend.WEAVIATE
+    LOCAL_PATH: str = ".vector_db"
+    EMBEDDING_DIMENSIONS: int = 256
+    COLLECTION: str = "Resource"
+    TENANT_IDLE_TIMEOUT: float = 3600.0
+    TENANT_IDLE_CHECK_INTERVAL: float = 300.0
+    BATCH_SIZE: int = 1000
+    BATCH_FLUSH_INTERVAL: float = 2.0
+    SHARED_GC_INTERVAL: float = 3600.0
+    SHARED_GC_GRACE_PERIOD: float = 86400.0
+    SHARED_FILTER_MAX_CONTENTS: int = 1000
+    SHARED_OVERFETCH_FACTOR: int = 10
+    QUERY_MAX_OFFSET: int = 1000
+
+
+class QueryCacheConfigurations(BaseModel):
+    """Query cache configurations class.
+
+    Attributes:
+        MAX_ITEMS: Maximum number of cached query results.
+        TTL: Seconds a query result is kept in the cache.
+        MAX_BYTES: Approximate memory bound of the cache in bytes.
+    """
+
+    MAX_ITEMS: int = 1024
+    TTL: float = 300.0
+    MAX_BYTES: int = 64 * 1024 * 1024
+
+
+class UserIdCacheConfigurations(BaseModel):
+    """User ID cache configurations class.
+
+    Attributes:
+        MAX_ITEMS: Maximum number of cached teams ids.
+        TTL: Seconds the user ID of a teams id is kept in the cache.
+    """
+
+    MAX_ITEMS: int = 100000
+    TTL: float = 3600.0
+
+
+class ChunkCacheConfigurations(BaseModel):
+    """Parsed content chunk cache configurations class.
+
+    Attributes:
+        ENABLED: Whether the chunks of the parsed files are cached by
+            content hash.
+        MAX_BYTES: Maximum total size of the cached chunks, the least
+            recently used ones are evicted beyond it.
+        EVICT_INTERVAL: Seconds between two evictions.
+    """
+
+    ENABLED: bool = True
+    MAX_BYTES: int = 10 * 1024 * 1024 * 1024
+    EVICT_INTERVAL: float = 3600.0
+
+
+class TokenCacheConfigurations(BaseModel):
+    """Dropbox token cache configurations class.
+
+    Attributes:
+        MAX_ITEMS: Maximum number of users whose tokens are cached.
+        TTL: Seconds the tokens of a user are kept in the cache, bounding
+            how long a change missed by the invalidation listener is
+            ignored.
+        LISTEN_RETRY_INTERVAL: Seconds to wait before listening to the
+            token and query result changes again after the connection is
+            lost.
+    """
+
+    MAX_ITEMS: int = 10000
+    TTL: float = 600.0
+    LISTEN_RETRY_INTERVAL: float = 5.0
+
+
+class IndexConfigurations(BaseModel):
+    """Index configurations class.
+
+    Attributes:
+        PARSE_WORKERS: Number of processes parsing and chunking the files,
+            or None for the number of CPUs.
+        PARSE_QUEUE_SIZE: Maximum number of files submitted to the parsing
+            processes at a time.
+        DOWNLOAD_CONCURRENCY: Maximum number of files of a user downloaded
+            at a time by a process.
+        DOWNLOAD_INITIAL_CONCURRENCY: Number of files of a user downloaded
+            at a time at the start, adapted to the rate limits and the
+            server errors of Dropbox up to the maximum.
+        DOWNLOAD_MAX_RETRIES: Maximum number of retries of a rate limited
+            download or folder listing request.
+        DOWNLOAD_LIMITER_MAX_USERS: Maximum number of users whose download
+            concurrency is kept by a process.
+        DOWNLOAD_LIMITER_IDLE_TIMEOUT: Seconds without downloads after which
+            the download concurrency of a user starts again from the
+            initial one.
+        MAX_FILES_IN_FLIGHT: Maximum number of files an index job processes
+            at a time, from download to insert.
+        MAX_FILE_SIZE: Maximum size in bytes of a file to index, larger
+            files are skipped without downloading them.
+        PDF_BACKEND: PDF text extraction backend. The pdfium backend needs
+            the `pdfium` extra.
+        PDF_PARALLEL_MIN_SIZE: Minimum size in bytes of a PDF file whose
+            page ranges are extracted in parallel worker processes.
+        PDF_PAGES_PER_TASK: Number of pages of a PDF file extracted by a
+            worker process at a time.
+        JOB_WORKERS: Number of index job workers run by the API process or
+            by a worker process, 0 to leave the jobs of the API to separate
+            worker processes.
+        JOB_POLL_INTERVAL: Seconds between two checks for pending index jobs
+            when there is none.
+        JOB_STALE_AFTER: Seconds without progress after which a running
+            index job listing or file is considered abandoned and claimed
+            again.
+        JOB_FILE_BATCH_SIZE: Maximum number of queued files claimed at a
+            time by an index job worker.
+        JOB_PROGRESS_INTERVAL: Seconds between two saves of the progress of
+            a running index job.
+    """
+
+    PARSE_WORKERS: int | None = None
+    PARSE_QUEUE_SIZE: int = 16
+    DOWNLOAD_CONCURRENCY: int = 32
+    DOWNLOAD_INITIAL_CONCURRENCY: int = 4
+    DOWNLOAD_MAX_RETRIES: int = 3
+    DOWNLOAD_LIMITER_MAX_USERS: int = 10000
+    DOWNLOAD_LIMITER_IDLE_TIMEOUT: float = 3600.0
+    MAX_FILES_IN_FLIGHT: int = 64
+    MAX_FILE_SIZE: int = 100 * 1024 * 1024
+    PDF_BACKEND: PDFBackend = PDFBackend.PYPDF2
+    PDF_PARALLEL_MIN_SIZE: int = 4 * 1024 * 1024
+    PDF_PAGES_PER_TASK: int = 32
+    JOB_WORKERS: int = 1
+    JOB_POLL_INTERVAL: float = 2.0
+    JOB_STALE_AFTER: float = 600.0
+    JOB_FILE_BATCH_SIZE: int = 64
+    JOB_PROGRESS_INTERVAL: float = 2.0
+
+
+class HttpClientConfigurations(BaseModel):
+    """Outbound HTTP client configurations class.
+
+    Attributes:
+        LIMIT: Maximum number of open connections.
+        LIMIT_PER_HOST: Maximum number of open connections to a host.
+        KEEPALIVE_TIMEOUT: Seconds an idle connection is kept open.
+        DNS_CACHE_TTL: Seconds a resolved host address is cached.
+        CONNECT_TIMEOUT: Seconds to wait for a connection.
+        READ_TIMEOUT: Seconds to wait for data from an open connection.
+    """
+
+    LIMIT: int = 100
+    LIMIT_PER_HOST: int = 50
+    KEEPALIVE_TIMEOUT: float = 30.0
+    DNS_CACHE_TTL: int = 300
+    CONNECT_TIMEOUT: float = 10.0
+    READ_TIMEOUT: float = 60.0
 
 
 class DropboxConfigurations(BaseModel):
@@ -73,6 +281,12 @@ class Configuration(BaseSettings):
     VECTOR_DB: VectorDBConfigurations
     DROPBOX: DropboxConfigurations
     COHERE_API_KEY: str
+    QUERY_CACHE: QueryCacheConfigurations = QueryCacheConfigurations()
+    INDEX: IndexConfigurations = IndexConfigurations()
+    TOKEN_CACHE: TokenCacheConfigurations = TokenCacheConfigurations()
+    USER_ID_CACHE: UserIdCacheConfigurations = UserIdCacheConfigurations()
+    CHUNK_CACHE: ChunkCacheConfigurations = ChunkCacheConfigurations()
+    HTTP_CLIENT: HttpClientConfigurations = HttpClientConfigurations()
 
 
 configuration: Configuration = Configuration()
@@ -31,3 +31,21 @@ class UnprocessableEntityError(ValueError):
     def __init__(self, item_name: str):
         """Initialize the exception."""
         super().__init__(f"{item_name.title()} is unprocessable!")
+
+
+class TooManyRequestsError(ValueError):
+    """Raised when a service rejects a request because of its rate limit."""
+
+    def __init__(self, item_name: str, retry_after: float | None = None):
+        """Initialize the exception with the seconds to wait, if known."""
+        super().__init__(f"Too many requests to {item_name}!")
+        self.retry_after: float | None = retry_after
+
+
+class ServiceUnavailableError(ValueError):
+    """Raised when a service fails a request with a server error."""
+
+    def __init__(self, item_name: str, retry_after: float | None = None):
+        """Initialize the exception with the seconds to wait, if known."""
+        super().__init__(f"{item_name} is unavailable!")
+        self.retry_after: float | None = retry_after
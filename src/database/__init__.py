@@ -1,11 +1,22 @@
 """Database module."""
 
+from .async_vector_db import AsyncVectorDB, vector_db_executor
+from .base_vector_db import BaseVectorDB
+from .factory import create_vector_db
+from .local_vector_db import LocalVectorDB
 from .session import database_session_manager
 from .vector_db import VectorDB
+from .vector_db_client import vector_db_client_manager
 
 __all__ = [
     # Session
     "database_session_manager",
     # VectorDB
+    "AsyncVectorDB",
+    "BaseVectorDB",
+    "LocalVectorDB",
     "VectorDB",
+    "create_vector_db",
+    "vector_db_client_manager",
+    "vector_db_executor",
 ]
@@ -0,0 +1,359 @@
+"""Asynchronous vector database operations service."""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+from threading import Lock
+from typing import Any, Callable, TypeVar
+
+from pydantic import BaseModel, Field, InstanceOf
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as psql_insert
+
+from src.core import configuration
+from src.models import TenantUsage
+from src.schemas.query import QueryResult, SearchMode
+from src.schemas.vector_db import VectorObject
+
+from .base_vector_db import SHARED_TENANT, BaseVectorDB
+from .factory import create_vector_db
+from .session import DatabaseSessionManager, database_session_manager
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+vector_db_executor: ThreadPoolExecutor = ThreadPoolExecutor(
+    max_workers=configuration.VECTOR_DB.MAX_WORKERS,
+    thread_name_prefix="vector-db",
+)
+
+
+class TenantActivity:
+    """Tenants used by this process since their uses were last recorded.
+
+    The activity is shared by all copies of the models which hold it.
+
+    Methods:
+        touch: Record the use of a tenant.
+        pop_used: Forget and return the used tenants.
+    """
+
+    def __init__(self):
+        """Initialize the tenant activity."""
+        self._used: set[str] = set()
+        self._lock: Lock = Lock()
+
+    def touch(self, tenant: str) -> None:
+        """Record the use of a tenant.
+
+        Arguments:
+            tenant: The name of the tenant.
+
+        Returns:
+            None.
+        """
+        with self._lock:
+            self._used.add(tenant)
+
+    def pop_used(self) -> list[str]:
+        """Forget and return the tenants used since the last call.
+
+        Returns:
+            The names of the used tenants.
+        """
+        with self._lock:
+            used: list[str] = sorted(self._used)
+            self._used.clear()
+            return used
+
+
+tenant_activity: TenantActivity = TenantActivity()
+
+
+class CreatedTenants:
+    """Tenants known by this process to exist in the vector database.
+
+    The tenants are shared by all copies of the models which hold them.
+
+    Methods:
+        add: Record that a tenant exists.
+        __contains__: Whether a tenant is known to exist.
+    """
+
+    def __init__(self):
+        """Initialize the created tenants."""
+        self._tenants: set[str] = set()
+
+    def __contains__(self, tenant: str) -> bool:
+        """Whether a tenant is known to exist."""
+        return tenant in self._tenants
+
+    def add(self, tenant: str) -> None:
+        """Record that a tenant exists.
+
+        Arguments:
+            tenant: The name of the tenant.
+
+        Returns:
+            None.
+        """
+        self._tenants.add(tenant)
+
+
+created_tenants: CreatedTenants = CreatedTenants()
+
+
+class AsyncVectorDB(BaseModel):
+    """Asynchronous vector database operations.
+
+    The vector database backends are synchronous, so the operations are run
+    in a bounded thread pool to keep the event loop free while they wait.
+
+    Attributes:
+        vector_db: The synchronous vector database operations of the
+            configured backend.
+        tenant_activity: The tenants used by this process.
+        created_tenants: The tenants known by this process to exist.
+        session_manager: The manager of the database sessions recording the
+            uses of the tenants.
+
+    Methods:
+        create_tenant: Create a tenant in the vector database.
+        create_shared_tenant: Create the shared tenant, without failing.
+        record_tenant_usages: Record the uses of the tenants in the database.
+        deactivate_idle_tenants: Offload the data of the idle tenants.
+        deactivate_idle_tenants_periodically: Offload the data of the idle
+            tenants at every interval.
+        batch_insert_objects: Batch insert objects into the tenant.
+        delete_resource_objects: Delete the objects of a resource.
+        query: Query the resources of a user.
+    """
+
+    vector_db: BaseVectorDB = Field(default_factory=create_vector_db)
+    tenant_activity: InstanceOf[TenantActivity] = Field(
+        default_factory=lambda: tenant_activity
+    )
+    created_tenants: InstanceOf[CreatedTenants] = Field(
+        default_factory=lambda: created_tenants
+    )
+    session_manager: InstanceOf[DatabaseSessionManager] = Field(
+        default_factory=lambda: database_session_manager
+    )
+
+    async def create_tenant(self, tenant: str) -> None:
+        """Create a tenant in the vector database.
+
+        Arguments:
+            tenant: The name of the tenant.
+
+        Returns:
+            None.
+        """
+        await self._run(self.vector_db.create_tenant, tenant=tenant)
+        self.created_tenants.add(tenant)
+        self.tenant_activity.touch(tenant)
+
+    async def create_shared_tenant(self) -> bool:
+        """Create the shared tenant, logging instead of raising on failure.
+
+        The process starts even if the vector database is down, the shared
+        tenant is then created on its first use.
+
+        Returns:
+            Whether the shared tenant exists.
+        """
+        try:
+            await self.create_tenant(tenant=SHARED_TENANT)
+        except Exception:
+            logger.exception("Shared tenant not created, retrying on first use.")
+            return False
+        return True
+
+    async def record_tenant_usages(self) -> None:
+        """Record the uses of the tenants by this process in the database.
+
+        The uses are kept in memory and recorded again at the next call if
+        they could not be recorded.
+
+        Returns:
+            None.
+        """
+        tenants: list[str] = self.tenant_activity.pop_used()
+        if not tenants:
+            return
+        statement = psql_insert(TenantUsage).values(
+            [{"tenant": tenant, "is_active": True} for tenant in tenants]
+        )
+        try:
+            async with self.session_manager.get_session() as session:
+                await session.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=[TenantUsage.tenant],
+                        set_={"used_at": func.now(), "is_active": True},
+                    )
+                )
+        except Exception:
+            for tenant in tenants:
+                self.tenant_activity.touch(tenant)
+            raise
+
+    async def deactivate_idle_tenants(self, idle_for: float) -> list[str]:
+        """Offload the data of the tenants no process has used for a while.
+
+        The uses of this process are recorded first. The idleness of a
+        tenant is that recorded by all the processes, and the rows of the
+        deactivated tenants are locked, so concurrent processes do not
+        deactivate them twice. The shared tenant is never deactivated. A
+        deactivated tenant is activated again by its next use.
+
+        Arguments:
+            idle_for: Seconds since the last use of an idle tenant.
+
+        Returns:
+            The names of the deactivated tenants.
+        """
+        await self.record_tenant_usages()
+        async with self.session_manager.get_session() as session:
+            idle_tenants: list[TenantUsage] = list(
+                (
+                    await session.execute(
+                        select(TenantUsage)
+                        .filter(TenantUsage.is_active)
+                        .filter(TenantUsage.tenant != SHARED_TENANT)
+                        .filter(
+                            TenantUsage.used_at
+                            < func.now() - timedelta(seconds=idle_for)
+                        )
+                        .with_for_update(skip_locked=True)
+                    )
+                ).scalars()
+            )
+            for tenant_usage in idle_tenants:
+                await self._run(
+                    self.vector_db.deactivate_tenant, tenant=tenant_usage.tenant
+                )
+                tenant_usage.is_active = False
+        return [tenant_usage.tenant for tenant_usage in idle_tenants]
+
+    async def deactivate_idle_tenants_periodically(
+        self, interval: float, idle_for: float
+    ) -> None:
+        """Offload the data of the idle tenants at every interval.
+
+        Arguments:
+            interval: Seconds between two checks.
+            idle_for: Seconds since the last use of an idle tenant.
+
+        Returns:
+            None.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.deactivate_idle_tenants(idle_for=idle_for)
+            except Exception:
+                logger.exception("Idle tenants could not be deactivated.")
+
+    async def batch_insert_objects(
+        self, tenant: str, objects: list[VectorObject]
+    ) -> dict[str, str]:
+        """Batch insert objects into the tenant.
+
+        Arguments:
+            tenant: The name of the tenant.
+            objects: The objects to insert.
+
+        Returns:
+            The error messages of the resources whose objects could not be
+            inserted, by resource ID.
+        """
+        await self._create_shared_tenant_on_first_use(tenant=tenant)
+        self.tenant_activity.touch(tenant)
+        return await self._run(
+            self.vector_db.batch_insert_objects, tenant=tenant, objects=objects
+        )
+
+    async def delete_resource_objects(self, tenant: str, resource_id: str) -> None:
+        """Delete the objects of a resource from the tenant.
+
+        Arguments:
+            tenant: The name of the tenant.
+            resource_id: The ID of the resource.
+
+        Returns:
+            None.
+        """
+        self.tenant_activity.touch(tenant)
+        await self._run(
+            self.vector_db.delete_resource_objects,
+            tenant=tenant,
+            resource_id=resource_id,
+        )
+
+    async def query(
+        self,
+        tenant: str,
+        query: str,
+        mode: SearchMode = SearchMode.VECTOR,
+        alpha: float = 0.5,
+        limit: int = 10,
+        offset: int = 0,
+        resource_ids: list[str] | None = None,
+    ) -> list[QueryResult]:
+        """Query the resources of a user.
+
+        Arguments:
+            tenant: The name of the tenant.
+            query: The query to search.
+            mode: The search mode.
+            alpha: The weight of the vector score in the hybrid search,
+                where 0 is pure keyword and 1 is pure vector search.
+            limit: The maximum number of results.
+            offset: The number of best results to skip.
+            resource_ids: The IDs of the resources to search, or None for
+                all the resources of the tenant.
+
+        Returns:
+            The found chunks, best match first.
+        """
+        await self._create_shared_tenant_on_first_use(tenant=tenant)
+        self.tenant_activity.touch(tenant)
+        return await self._run(
+            self.vector_db.query,
+            tenant=tenant,
+            query=query,
+            mode=mode,
+            alpha=alpha,
+            limit=limit,
+            offset=offset,
+            resource_ids=resource_ids,
+        )
+
+    async def _create_shared_tenant_on_first_use(self, tenant: str) -> None:
+        """Create the shared tenant if the startup could not create it.
+
+        Arguments:
+            tenant: The name of the used tenant.
+
+        Returns:
+            None.
+        """
+        if tenant == SHARED_TENANT and tenant not in self.created_tenants:
+            await self.create_tenant(tenant=tenant)
+
+    @staticmethod
+    async def _run(func: Callable[..., T], **kwargs: Any) -> T:
+        """Run a blocking function in the vector database thread pool.
+
+        Arguments:
+            func: The function to run.
+            kwargs: The keyword arguments of the function.
+
+        Returns:
+            The result of the function.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(vector_db_executor, partial(func, **kwargs))
@@ -0,0 +1,149 @@
+"""Base class for vector database operations."""
+
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from typing import Any, Final
+
+from pydantic import BaseModel
+
+from src.schemas.query import QueryResult, SearchMode
+from src.schemas.vector_db import VectorObject
+
+# Maximum cosine distance of the objects returned by a query.
+MAX_DISTANCE: Final[float] = 0.4
+
+# Tenant of the objects of the contents shared by users. The resource ID of
+# a shared object is the content hash of its file.
+SHARED_TENANT: Final[str] = "shared"
+
+
+class BaseVectorDB(BaseModel, ABC):
+    """Base class for vector database operations.
+
+    The objects of every user are isolated in a tenant named after the user.
+    The objects of the files with a content hash are stored once for all
+    the users in the shared tenant instead.
+
+    Methods:
+        create_tenant: Create a tenant in the vector database.
+        activate_tenant: Load the data of a tenant to serve its requests.
+        deactivate_tenant: Offload the data of an idle tenant.
+        batch_insert_objects: Batch insert objects into the tenant.
+        delete_resource_objects: Delete the objects of a resource.
+        query: Query the resources of a user.
+    """
+
+    @abstractmethod
+    def create_tenant(self, tenant: str) -> None:
+        """Create a tenant in the vector database if it does not exist.
+
+        Arguments:
+            tenant: The name of the tenant.
+
+        Returns:
+            None.
+        """
+
+    @abstractmethod
+    def activate_tenant(self, tenant: str) -> None:
+        """Load the data of a tenant to serve its requests.
+
+        Arguments:
+            tenant: The name of the tenant.
+
+        Returns:
+            None.
+        """
+
+    @abstractmethod
+    def deactivate_tenant(self, tenant: str) -> None:
+        """Offload the data of an idle tenant.
+
+        Arguments:
+            tenant: The name of the tenant.
+
+        Returns:
+            None.
+        """
+
+    @abstractmethod
+    def batch_insert_objects(
+        self, tenant: str, objects: list[VectorObject]
+    ) -> dict[str, str]:
+        """Batch insert objects into the tenant.
+
+        The objects may belong to several resources.
+
+        Arguments:
+            tenant: The name of the tenant.
+            objects: The objects to insert.
+
+        Returns:
+            The error messages of the resources whose objects could not be
+            inserted, by resource ID.
+        """
+
+    @abstractmethod
+    def delete_resource_objects(self, tenant: str, resource_id: str) -> None:
+        """Delete the objects of a resource from the tenant.
+
+        Arguments:
+            tenant: The name of the tenant.
+            resource_id: The ID of the resource.
+
+        Returns:
+            None.
+        """
+
+    @abstractmethod
+    def query(
+        self,
+        tenant: str,
+        query: str,
+        mode: SearchMode = SearchMode.VECTOR,
+        alpha: float = 0.5,
+        limit: int = 10,
+        offset: int = 0,
+        resource_ids: list[str] | None = None,
+    ) -> list[QueryResult]:
+        """Query the resources of a user.
+
+        Arguments:
+            tenant: The name of the tenant.
+            query: The query to search.
+            mode: The search mode.
+            alpha: The weight of the vector score in the hybrid search,
+                where 0 is pure keyword and 1 is pure vector search.
+            limit: The maximum number of results.
+            offset: The number of best results to skip.
+            resource_ids: The IDs of the resources to search, or None for
+                all the resources of the tenant.
+
+        Returns:
+            The found chunks, best match first.
+        """
+
+    @staticmethod
+    def _to_result(
+        properties: Mapping[str, Any],
+        distance: float | None = None,
+        score: float | None = None,
+    ) -> QueryResult:
+        """Convert the properties of a found object to a query result.
+
+        Arguments:
+            properties: The properties of the found object.
+            distance: The distance between the object and the query.
+            score: The ranking score of the object.
+
+        Returns:
+            The query result.
+        """
+        return QueryResult(
+            content=str(properties["content"]),
+            resource_id=str(properties["resource_id"]),
+            name=str(properties["name"]),
+            path=str(properties["path"]),
+            distance=distance,
+            score=score,
+        )
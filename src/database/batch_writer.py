@@ -0,0 +1,159 @@
+"""Buffered vector database writes of an index job."""
+
+import asyncio
+from types import TracebackType
+
+from src.schemas.dropbox import DropboxFileMetadata
+from src.schemas.vector_db import VectorObject
+
+from .async_vector_db import AsyncVectorDB
+
+
+class VectorBatchWriter:
+    """Buffered batch writer of the objects of an index job.
+
+    The chunks of all the files of a job are buffered and inserted together
+    when the buffer reaches the batch size or its oldest object has waited
+    for the flush interval. Every write waits for the insert of its file,
+    so the failures of the objects are reported to the file which produced
+    them.
+
+    Usage:
+        async with VectorBatchWriter(vector_db, tenant) as writer:
+            await writer.write(chunks=chunks, resource=resource)
+
+    Methods:
+        write: Insert the chunks of a file.
+        flush: Insert the buffered objects.
+        close: Insert the buffered objects and wait for all inserts.
+    """
+
+    def __init__(
+        self,
+        vector_db: AsyncVectorDB,
+        tenant: str,
+        batch_size: int,
+        flush_interval: float,
+    ):
+        """Initialize the batch writer."""
+        self.vector_db: AsyncVectorDB = vector_db
+        self.tenant: str = tenant
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+        self._objects: list[VectorObject] = []
+        self._waiters: dict[str, asyncio.Future[None]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._inserts: set[asyncio.Task[None]] = set()
+
+    async def __aenter__(self) -> "VectorBatchWriter":
+        """Open the batch writer."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the batch writer."""
+        await self.close()
+
+    async def write(self, chunks: list[str], resource: DropboxFileMetadata) -> None:
+        """Insert the chunks of a file.
+
+        The chunks of a file are always inserted in the same batch.
+
+        Arguments:
+            chunks: The chunks of the file.
+            resource: The resource metadata.
+
+        Returns:
+            None.
+
+        Raises:
+            RuntimeError: If some objects of the file could not be inserted.
+        """
+        if not chunks:
+            return
+        loop = asyncio.get_running_loop()
+        waiter: asyncio.Future[None] = loop.create_future()
+        self._waiters[resource.id] = waiter
+        self._objects.extend(
+            VectorObject(
+                content=chunk,
+                resource_id=resource.id,
+                name=resource.name,
+                path=resource.path,
+            )
+            for chunk in chunks
+        )
+        if len(self._objects) >= self.batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.flush_interval, self.flush)
+        await waiter
+
+    def flush(self) -> None:
+        """Insert the buffered objects in the background.
+
+        Returns:
+            None.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._objects:
+            return
+        task: asyncio.Task[None] = asyncio.create_task(
+            self._insert(objects=self._objects, waiters=self._waiters)
+        )
+        self._inserts.add(task)
+        task.add_done_callback(self._inserts.discard)
+        self._objects = []
+        self._waiters = {}
+
+    async def close(self) -> None:
+        """Insert the buffered objects and wait for all inserts.
+
+        Returns:
+            None.
+        """
+        self.flush()
+        await asyncio.gather(*self._inserts)
+
+    async def _insert(
+        self,
+        objects: list[VectorObject],
+        waiters: dict[str, asyncio.Future[None]],
+    ) -> None:
+        """Insert a batch and wake up the writers of its files.
+
+        Arguments:
+            objects: The objects of the batch.
+            waiters: The futures of the writers by resource ID.
+
+        Returns:
+            None.
+        """
+        try:
+            errors: dict[str, str] = await self.vector_db.batch_insert_objects(
+                tenant=self.tenant, objects=objects
+            )
+        except Exception as error:
+            for waiter in waiters.values():
+                if not waiter.done():
+                    waiter.set_exception(error)
+            return
+
+        for resource_id, waiter in waiters.items():
+            if waiter.done():
+                continue
+            if resource_id in errors:
+                waiter.set_exception(
+                    RuntimeError(
+                        f"Objects of {resource_id} could not be inserted: "
+                        f"{errors[resource_id]}"
+                    )
+                )
+            else:
+                waiter.set_result(None)
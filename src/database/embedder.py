@@ -0,0 +1,75 @@
+"""Text embedders for the in-process vector database."""
+
+import re
+from abc import ABC, abstractmethod
+from hashlib import blake2b
+
+import numpy as np
+from pydantic import BaseModel
+
+
+def tokenize(text: str) -> list[str]:
+    """Split a text into lowercase words.
+
+    Arguments:
+        text: The text to split.
+
+    Returns:
+        The words of the text.
+    """
+    return re.findall(r"\w+", text.casefold())
+
+
+class Embedder(BaseModel, ABC):
+    """Base class for text embedders.
+
+    Methods:
+        embed: Embed the texts.
+    """
+
+    dimensions: int
+
+    @abstractmethod
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Embed the texts.
+
+        Arguments:
+            texts: The texts to embed.
+
+        Returns:
+            The L2 normalized float32 vectors, one row per text.
+        """
+
+
+class HashEmbedder(Embedder):
+    """Deterministic feature hashing embedder.
+
+    Every lowercase word is hashed into one of the dimensions with a sign
+    taken from the same hash. It needs no model or network access, so it
+    gives the same vectors in every process and test run.
+
+    Attributes:
+        dimensions: The number of dimensions of the vectors.
+    """
+
+    dimensions: int = 256
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Embed the texts.
+
+        Arguments:
+            texts: The texts to embed.
+
+        Returns:
+            The L2 normalized float32 vectors, one row per text.
+        """
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                digest: int = int.from_bytes(
+                    blake2b(token.encode(), digest_size=8).digest(), "little"
+                )
+                sign: float = 1.0 if digest & 1 else -1.0
+                vectors[row, (digest >> 1) % self.dimensions] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
@@ -0,0 +1,27 @@
+"""Factory for creating vector database objects."""
+
+from src.core import configuration
+from src.core.config import VectorDBBackend
+
+from .base_vector_db import BaseVectorDB
+from .local_vector_db import LocalVectorDB
+from .vector_db import VectorDB
+
+backend_to_vector_db: dict[VectorDBBackend, type[BaseVectorDB]] = {
+    VectorDBBackend.WEAVIATE: VectorDB,
+    VectorDBBackend.LOCAL: LocalVectorDB,
+}
+
+
+def create_vector_db(
+    backend: VectorDBBackend = configuration.VECTOR_DB.BACKEND,
+) -> BaseVectorDB:
+    """Create the vector database operations of a backend.
+
+    Arguments:
+        backend: The vector database backend.
+
+    Returns:
+        The vector database operations.
+    """
+    return backend_to_vector_db[backend]()
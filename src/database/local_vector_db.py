@@ -0,0 +1,594 @@
+"""In-process vector database operations service."""
+
+import json
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Annotated, Any, Final
+
+import numpy as np
+from pydantic import Field, InstanceOf, validate_call
+from weaviate.util import generate_uuid5
+
+from src.core import NotFoundError, configuration
+from src.schemas.query import QueryResult, SearchMode
+from src.schemas.vector_db import VectorObject
+
+from .base_vector_db import MAX_DISTANCE, BaseVectorDB
+from .embedder import Embedder, HashEmbedder, tokenize
+
+# BM25 term frequency saturation and length normalization parameters.
+BM25_K1: Final[float] = 1.2
+BM25_B: Final[float] = 0.75
+
+
+@dataclass
+class _KeywordIndex:
+    """Inverted index of a loaded collection for the BM25 search.
+
+    Attributes:
+        postings: The object indices and term frequencies of every term.
+        lengths: The number of terms of every object.
+    """
+
+    postings: dict[str, tuple[np.ndarray, np.ndarray]]
+    lengths: np.ndarray
+
+
+@dataclass
+class _Collection:
+    """Loaded collection of the local vector store.
+
+    Attributes:
+        size: The size of the vectors file when it was loaded.
+        vectors: The memory-mapped vectors, one row per object.
+        objects: The properties of the objects.
+        keyword_index: The inverted index, built on the first keyword search.
+    """
+
+    size: int
+    vectors: np.ndarray
+    objects: list[dict[str, Any]]
+    keyword_index: _KeywordIndex | None = field(default=None)
+
+
+class LocalVectorStore:
+    """File based vector store.
+
+    Every collection is a directory holding the raw float32 vectors, which
+    are memory-mapped for searching, and the object properties as JSON
+    lines. A loaded collection is reused until its vectors file changes,
+    and the store is shared by all copies of the models which hold it.
+
+    Methods:
+        create_collection: Create a collection.
+        unload: Release the loaded vectors and objects of a collection.
+        insert: Insert vectors and their objects into a collection.
+        delete: Delete the objects with a property value from a collection.
+        score: Score the objects by cosine similarity and BM25.
+    """
+
+    def __init__(self, path: str):
+        """Initialize the local vector store."""
+        self.path: Path = Path(path)
+        self._collections: dict[str, _Collection] = {}
+        self._lock: Lock = Lock()
+
+    def create_collection(self, collection_name: str, dimensions: int) -> None:
+        """Create a collection.
+
+        Arguments:
+            collection_name: The name of the collection.
+            dimensions: The number of dimensions of the vectors.
+
+        Returns:
+            None.
+        """
+        directory: Path = self.path / collection_name
+        with self._lock:
+            directory.mkdir(parents=True, exist_ok=True)
+            (directory / "meta.json").write_text(json.dumps({"dimensions": dimensions}))
+            (directory / "vectors.f32").touch()
+            (directory / "objects.jsonl").touch()
+
+    def unload(self, collection_name: str) -> None:
+        """Release the loaded vectors and objects of a collection.
+
+        Arguments:
+            collection_name: The name of the collection.
+
+        Returns:
+            None.
+        """
+        with self._lock:
+            self._collections.pop(collection_name, None)
+
+    def insert(
+        self,
+        collection_name: str,
+        vectors: np.ndarray,
+        objects: list[dict[str, Any]],
+        key: str,
+    ) -> None:
+        """Insert vectors and their objects into a collection.
+
+        The objects are identified by a key property. An object replaces the
+        stored object with the same key, and of several objects with the
+        same key only the last one is inserted, so repeated inserts do not
+        duplicate the objects.
+
+        Arguments:
+            collection_name: The name of the collection.
+            vectors: The vectors, one row per object.
+            objects: The properties of the objects.
+            key: The name of the property which identifies the objects.
+
+        Returns:
+            None.
+
+        Raises:
+            NotFoundError: If the collection does not exist.
+        """
+        directory: Path = self._get_directory(collection_name)
+        positions: dict[Any, int] = {obj[key]: i for i, obj in enumerate(objects)}
+        rows: list[int] = sorted(positions.values())
+        new_vectors: np.ndarray = np.ascontiguousarray(vectors[rows], dtype=np.float32)
+        new_objects: list[dict[str, Any]] = [objects[i] for i in rows]
+        with self._lock:
+            stored_objects: list[dict[str, Any]] = self._read_objects(directory)
+            if not any(obj.get(key) in positions for obj in stored_objects):
+                with (directory / "vectors.f32").open("ab") as file:
+                    file.write(new_vectors.tobytes())
+                with (directory / "objects.jsonl").open("a") as file:
+                    file.writelines(json.dumps(obj) + "\n" for obj in new_objects)
+                return
+
+            stored_vectors: np.ndarray = self._read_vectors(directory)
+            stored_objects = stored_objects[: len(stored_vectors)]
+            keep: list[int] = [
+                i
+                for i, obj in enumerate(stored_objects)
+                if obj.get(key) not in positions
+            ]
+            self._replace(
+                directory,
+                vectors=np.concatenate([stored_vectors[keep], new_vectors]),
+                objects=[stored_objects[i] for i in keep] + new_objects,
+            )
+            self._collections.pop(collection_name, None)
+
+    def delete(self, collection_name: str, property_name: str, value: Any) -> int:
+        """Delete the objects with a property value from a collection.
+
+        The remaining vectors and objects are written to new files which
+        replace the old ones, so the loaded collections stay readable.
+
+        Arguments:
+            collection_name: The name of the collection.
+            property_name: The name of the property.
+            value: The value of the property of the objects to delete.
+
+        Returns:
+            The number of deleted objects.
+
+        Raises:
+            NotFoundError: If the collection does not exist.
+        """
+        directory: Path = self._get_directory(collection_name)
+        with self._lock:
+            vectors: np.ndarray = self._read_vectors(directory)
+            objects: list[dict[str, Any]] = self._read_objects(directory)
+            objects = objects[: len(vectors)]
+            keep: list[int] = [
+                i for i, obj in enumerate(objects) if obj.get(property_name) != value
+            ]
+            if len(keep) == len(objects):
+                return 0
+
+            self._replace(
+                directory, vectors=vectors[keep], objects=[objects[i] for i in keep]
+            )
+            self._collections.pop(collection_name, None)
+            return len(objects) - len(keep)
+
+    def score(
+        self,
+        collection_name: str,
+        vector: np.ndarray | None = None,
+        terms: list[str] | None = None,
+    ) -> tuple[list[dict[str, Any]], np.ndarray | None, np.ndarray | None]:
+        """Score the objects of a collection.
+
+        Arguments:
+            collection_name: The name of the collection.
+            vector: The normalized query vector for the vector scores.
+            terms: The terms of the query for the keyword scores.
+
+        Returns:
+            The objects, their cosine similarities to the vector and their
+                BM25 scores. A score is None if its input is not given.
+
+        Raises:
+            NotFoundError: If the collection does not exist.
+        """
+        collection: _Collection = self._load(collection_name)
+        similarities: np.ndarray | None = (
+            np.asarray(collection.vectors @ vector) if vector is not None else None
+        )
+        keyword_scores: np.ndarray | None = (
+            self._bm25(collection, terms) if terms is not None else None
+        )
+        return collection.objects, similarities, keyword_scores
+
+    def _bm25(self, collection: _Collection, terms: list[str]) -> np.ndarray:
+        """Score the objects of a loaded collection by BM25.
+
+        Arguments:
+            collection: The loaded collection.
+            terms: The terms of the query.
+
+        Returns:
+            The BM25 scores of the objects.
+        """
+        if collection.keyword_index is None:
+            collection.keyword_index = self._build_keyword_index(collection.objects)
+        index: _KeywordIndex = collection.keyword_index
+
+        scores = np.zeros(len(collection.objects), dtype=np.float32)
+        if not len(index.lengths):
+            return scores
+        normalization = BM25_K1 * (
+            1 - BM25_B + BM25_B * index.lengths / max(index.lengths.mean(), 1)
+        )
+        for term in set(terms):
+            if term not in index.postings:
+                continue
+            indices, frequencies = index.postings[term]
+            idf = np.log(
+                1 + (len(index.lengths) - len(indices) + 0.5) / (len(indices) + 0.5)
+            )
+            scores[indices] += (
+                idf
+                * frequencies
+                * (BM25_K1 + 1)
+                / (frequencies + normalization[indices])
+            )
+        return scores
+
+    @staticmethod
+    def _build_keyword_index(objects: list[dict[str, Any]]) -> _KeywordIndex:
+        """Build the inverted index of the objects.
+
+        Arguments:
+            objects: The properties of the objects.
+
+        Returns:
+            The inverted index.
+        """
+        postings: dict[str, tuple[list[int], list[int]]] = {}
+        lengths: list[int] = []
+        for i, obj in enumerate(objects):
+            terms: list[str] = tokenize(str(obj["content"]))
+            lengths.append(len(terms))
+            for term, frequency in Counter(terms).items():
+                indices, frequencies = postings.setdefault(term, ([], []))
+                indices.append(i)
+                frequencies.append(frequency)
+        return _KeywordIndex(
+            postings={
+                term: (np.array(indices), np.array(frequencies, dtype=np.float32))
+                for term, (indices, frequencies) in postings.items()
+            },
+            lengths=np.array(lengths, dtype=np.float32),
+        )
+
+    def _get_directory(self, collection_name: str) -> Path:
+        """Get the directory of a collection.
+
+        Arguments:
+            collection_name: The name of the collection.
+
+        Returns:
+            The directory of the collection.
+
+        Raises:
+            NotFoundError: If the collection does not exist.
+        """
+        directory: Path = self.path / collection_name
+        if not (directory / "meta.json").is_file():
+            raise NotFoundError("Collection")
+        return directory
+
+    @staticmethod
+    def _read_objects(directory: Path) -> list[dict[str, Any]]:
+        """Read the objects of a collection.
+
+        Arguments:
+            directory: The directory of the collection.
+
+        Returns:
+            The properties of the objects.
+        """
+        with (directory / "objects.jsonl").open() as file:
+            return [json.loads(line) for line in file]
+
+    @staticmethod
+    def _read_vectors(directory: Path) -> np.ndarray:
+        """Read the vectors of a collection into memory.
+
+        Arguments:
+            directory: The directory of the collection.
+
+        Returns:
+            The vectors, one row per object.
+        """
+        dimensions: int = json.loads((directory / "meta.json").read_text())[
+            "dimensions"
+        ]
+        return np.fromfile(directory / "vectors.f32", dtype=np.float32).reshape(
+            -1, dimensions
+        )
+
+    @staticmethod
+    def _replace(
+        directory: Path, vectors: np.ndarray, objects: list[dict[str, Any]]
+    ) -> None:
+        """Replace the vectors and objects of a collection.
+
+        They are written to new files which replace the old ones, so the
+        loaded collections stay readable.
+
+        Arguments:
+            directory: The directory of the collection.
+            vectors: The vectors, one row per object.
+            objects: The properties of the objects.
+
+        Returns:
+            None.
+        """
+        vectors.tofile(directory / "vectors.f32.tmp")
+        with (directory / "objects.jsonl.tmp").open("w") as file:
+            file.writelines(json.dumps(obj) + "\n" for obj in objects)
+        os.replace(directory / "vectors.f32.tmp", directory / "vectors.f32")
+        os.replace(directory / "objects.jsonl.tmp", directory / "objects.jsonl")
+
+    def _load(self, collection_name: str) -> _Collection:
+        """Load a collection, reusing it until its vectors file changes.
+
+        Arguments:
+            collection_name: The name of the collection.
+
+        Returns:
+            The loaded collection.
+
+        Raises:
+            NotFoundError: If the collection does not exist.
+        """
+        directory: Path = self._get_directory(collection_name)
+        vectors_path: Path = directory / "vectors.f32"
+        with self._lock:
+            size: int = vectors_path.stat().st_size
+            collection: _Collection | None = self._collections.get(collection_name)
+            if collection is not None and collection.size == size:
+                return collection
+            dimensions: int = json.loads((directory / "meta.json").read_text())[
+                "dimensions"
+            ]
+            with (directory / "objects.jsonl").open() as file:
+                objects: list[dict[str, Any]] = [json.loads(line) for line in file]
+            rows: int = min(len(objects), size // (dimensions * 4))
+            vectors: np.ndarray = (
+                np.memmap(
+                    vectors_path, dtype=np.float32, mode="r", shape=(rows, dimensions)
+                )
+                if rows
+                else np.empty((0, dimensions), dtype=np.float32)
+            )
+            collection = _Collection(size=size, vectors=vectors, objects=objects[:rows])
+            self._collections[collection_name] = collection
+            return collection
+
+
+local_vector_store: LocalVectorStore = LocalVectorStore(
+    path=configuration.VECTOR_DB.LOCAL_PATH
+)
+
+
+def _min_max_normalize(scores: np.ndarray) -> np.ndarray:
+    """Scale the scores to the range between 0 and 1.
+
+    Arguments:
+        scores: The scores.
+
+    Returns:
+        The normalized scores.
+    """
+    if not len(scores):
+        return scores
+    spread = scores.max() - scores.min()
+    return (scores - scores.min()) / spread if spread else np.ones_like(scores)
+
+
+class LocalVectorDB(BaseVectorDB):
+    """In-process vector database operations.
+
+    The vectors are kept in memory-mapped NumPy arrays and searched with
+    vectorized cosine similarity, so no vector database cluster is needed.
+    Every tenant is a collection of the store.
+
+    Attributes:
+        store: The file based vector store.
+        embedder: The embedder of the objects and queries.
+    """
+
+    store: InstanceOf[LocalVectorStore] = Field(
+        default_factory=lambda: local_vector_store
+    )
+    embedder: Embedder = HashEmbedder(
+        dimensions=configuration.VECTOR_DB.EMBEDDING_DIMENSIONS
+    )
+
+    @validate_call
+    def create_tenant(self, tenant: str) -> None:
+        """Create a tenant in the vector database if it does not exist.
+
+        Arguments:
+            tenant: The name of the tenant.
+
+        Returns:
+            None.
+        """
+        self.store.create_collection(
+            collection_name=tenant, dimensions=self.embedder.dimensions
+        )
+
+    @validate_call
+    def activate_tenant(self, tenant: str) -> None:
+        """Load the data of a tenant to serve its requests.
+
+        The data is loaded on the first query, so nothing is done.
+
+        Arguments:
+            tenant: The name of the tenant.
+
+        Returns:
+            None.
+        """
+
+    @validate_call
+    def deactivate_tenant(self, tenant: str) -> None:
+        """Offload the data of an idle tenant.
+
+        Arguments:
+            tenant: The name of the tenant.
+
+        Returns:
+            None.
+        """
+        self.store.unload(collection_name=tenant)
+
+    @validate_call
+    def batch_insert_objects(
+        self, tenant: str, objects: list[VectorObject]
+    ) -> dict[str, str]:
+        """Batch insert objects into the tenant.
+
+        The objects are written at once, so either all or none of them are
+        inserted. Like in Weaviate, every object is identified by a UUID
+        generated from its resource ID and content, so inserting it again
+        replaces it instead of duplicating it.
+
+        Arguments:
+            tenant: The name of the tenant.
+            objects: The objects to insert.
+
+        Returns:
+            The error messages of the resources whose objects could not be
+            inserted, by resource ID, which is always empty.
+
+        Raises:
+            NotFoundError: If the tenant does not exist.
+        """
+        self.store.insert(
+            collection_name=tenant,
+            vectors=self.embedder.embed([obj.content for obj in objects]),
+            objects=[
+                {
+                    **obj.model_dump(),
+                    "uuid": str(generate_uuid5([obj.resource_id, obj.content])),
+                }
+                for obj in objects
+            ],
+            key="uuid",
+        )
+        return {}
+
+    @validate_call
+    def delete_resource_objects(self, tenant: str, resource_id: str) -> None:
+        """Delete the objects of a resource from the tenant.
+
+        Arguments:
+            tenant: The name of the tenant.
+            resource_id: The ID of the resource.
+
+        Returns:
+            None.
+
+        Raises:
+            NotFoundError: If the tenant does not exist.
+        """
+        self.store.delete(
+            collection_name=tenant, property_name="resource_id", value=resource_id
+        )
+
+    @validate_call
+    def query(
+        self,
+        tenant: str,
+        query: str,
+        mode: SearchMode = SearchMode.VECTOR,
+        alpha: Annotated[float, Field(ge=0, le=1)] = 0.5,
+        limit: Annotated[int, Field(gt=0)] = 10,
+        offset: Annotated[int, Field(ge=0)] = 0,
+        resource_ids: list[str] | None = None,
+    ) -> list[QueryResult]:
+        """Query the resources of a user.
+
+        The hybrid search fuses the min-max normalized vector and keyword
+        scores of the objects which match either of the searches.
+
+        Arguments:
+            tenant: The name of the tenant.
+            query: The query to search.
+            mode: The search mode.
+            alpha: The weight of the vector score in the hybrid search,
+                where 0 is pure keyword and 1 is pure vector search.
+            limit: The maximum number of results.
+            offset: The number of best results to skip.
+            resource_ids: The IDs of the resources to search, or None for
+                all the resources of the tenant.
+
+        Returns:
+            The found chunks, best match first.
+        """
+        if mode == SearchMode.KEYWORD:
+            objects, _, scores = self.store.score(
+                collection_name=tenant, terms=tokenize(query)
+            )
+            matches = scores > 0
+        else:
+            [vector] = self.embedder.embed([query])
+            objects, similarities, keyword_scores = self.store.score(
+                collection_name=tenant,
+                vector=vector,
+                terms=tokenize(query) if mode == SearchMode.HYBRID else None,
+            )
+            scores, matches = similarities, 1 - similarities <= MAX_DISTANCE
+            if mode == SearchMode.HYBRID:
+                scores = alpha * _min_max_normalize(similarities) + (
+                    1 - alpha
+                ) * _min_max_normalize(keyword_scores)
+                matches |= keyword_scores > 0
+        if resource_ids is not None:
+            allowed: set[str] = set(resource_ids)
+            matches &= np.fromiter(
+                (obj["resource_id"] in allowed for obj in objects),
+                dtype=bool,
+                count=len(objects),
+            )
+
+        [indices] = np.nonzero(matches)
+        if offset + limit < len(indices):
+            top = np.argpartition(-scores[indices], offset + limit - 1)
+            indices = indices[top[: offset + limit]]
+        indices = indices[np.argsort(-scores[indices], kind="stable")]
+        return [
+            self._to_result(
+                properties=objects[i],
+                distance=(float(1 - scores[i]) if mode == SearchMode.VECTOR else None),
+                score=float(scores[i]) if mode != SearchMode.VECTOR else None,
+            )
+            for i in indices[offset : offset + limit]
+        ]
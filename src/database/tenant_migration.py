@@ -0,0 +1,109 @@
+"""Move the per user collections into the tenants of the shared collection.
+
+Before multi-tenancy every user had a `user_{id}` collection. This tool
+copies the objects of those collections, including their vectors, into the
+tenant of the same name, so nothing has to be embedded again.
+
+Usage:
+    python -m src.database.tenant_migration [--delete]
+"""
+
+import argparse
+import re
+from typing import Final
+
+from weaviate import WeaviateClient
+from weaviate.classes.tenants import Tenant
+
+from .vector_db import VectorDB
+
+USER_COLLECTION_PATTERN: Final[re.Pattern[str]] = re.compile(r"^user_\d+$")
+
+
+def migrate_collection(
+    client: WeaviateClient, vector_db: VectorDB, collection_name: str
+) -> int:
+    """Copy the objects of a user collection into the tenant of the user.
+
+    Arguments:
+        client: The Weaviate client.
+        vector_db: The vector database operations.
+        collection_name: The name of the user collection.
+
+    Returns:
+        The number of copied objects.
+
+    Raises:
+        RuntimeError: If some objects could not be copied.
+    """
+    collection = vector_db.get_or_create_collection(client)
+    if not collection.tenants.exists(collection_name):
+        collection.tenants.create(Tenant(name=collection_name))
+
+    source = client.collections.get(name=collection_name)
+    target = collection.with_tenant(collection_name)
+    count: int = 0
+    with target.batch.dynamic() as batch:
+        for obj in source.iterator(include_vector=True):
+            batch.add_object(
+                properties=obj.properties,
+                uuid=obj.uuid,
+                vector=obj.vector,
+            )
+            count += 1
+
+    if target.batch.failed_objects:
+        raise RuntimeError(
+            f"{len(target.batch.failed_objects)} objects of {collection_name} "
+            "could not be copied."
+        )
+    return count
+
+
+def migrate(delete: bool = False) -> None:
+    """Move all user collections into tenants.
+
+    Arguments:
+        delete: Whether to delete the user collections after copying them.
+
+    Returns:
+        None.
+    """
+    vector_db: VectorDB = VectorDB()
+    with vector_db.connect() as client:
+        collection_names: list[str] = [
+            name
+            for name in client.collections.list_all(simple=True)
+            if USER_COLLECTION_PATTERN.match(name)
+        ]
+        for collection_name in collection_names:
+            count: int = migrate_collection(
+                client=client, vector_db=vector_db, collection_name=collection_name
+            )
+            print(f"{collection_name}: {count} objects copied.")
+            if delete:
+                client.collections.delete(collection_name)
+                print(f"{collection_name}: deleted.")
+    vector_db.client_manager.close()
+
+
+def main() -> None:
+    """Move the user collections into tenants from the command line.
+
+    Returns:
+        None.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--delete",
+        action="store_true",
+        help="Delete the user collections after copying them.",
+    )
+    arguments = parser.parse_args()
+    print("Migrating user collections to tenants.")
+    migrate(delete=arguments.delete)
+    print("Done.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,143 +1,323 @@
 """Vector Database operations service."""
 
+import logging
 from contextlib import contextmanager
-from typing import Final, Generator
+from typing import Annotated, Generator
 
-from pydantic import BaseModel, validate_call
-from weaviate import WeaviateClient, connect_to_wcs
-from weaviate.auth import AuthApiKey
+from pydantic import Field, InstanceOf, validate_call
+from weaviate import WeaviateClient
 from weaviate.classes import config as wvconfig
+from weaviate.classes.query import Filter, MetadataQuery
+from weaviate.classes.tenants import Tenant, TenantActivityStatus
+from weaviate.collections import Collection
+from weaviate.collections.classes.internal import QueryReturn
+from weaviate.exceptions import WeaviateConnectionError, WeaviateQueryError
+from weaviate.util import generate_uuid5
 
 from src.core import configuration
-from src.schemas.dropbox import DropboxFileMetadata
-from src.schemas.query import Query
+from src.schemas.query import QueryResult, SearchMode
+from src.schemas.vector_db import VectorObject
 
+from .base_vector_db import MAX_DISTANCE, BaseVectorDB
+from .vector_db_client import VectorDBClientManager, vector_db_client_manager
 
-class VectorDB(BaseModel):
-    """Vector Database operations.
+logger = logging.getLogger(__name__)
+
+
+class VectorDB(BaseVectorDB):
+    """Weaviate vector database operations.
+
+    All users share one multi-tenant collection and every user is a
+    tenant of it.
 
     Attributes:
-        api_key: The API key to connect to the vector database.
-        host: The host of the vector database.
-        cohere_key: The API key to connect to the Cohere API.
+        client_manager: The manager of the shared Weaviate client.
+        collection_name: The name of the shared collection.
     """
 
-    api_key: Final[str] = configuration.VECTOR_DB.KEY
-    host: Final[str] = configuration.VECTOR_DB.HOST
-    cohere_key: Final[str] = configuration.COHERE_API_KEY
+    client_manager: InstanceOf[VectorDBClientManager] = Field(
+        default_factory=lambda: vector_db_client_manager
+    )
+    collection_name: str = configuration.VECTOR_DB.COLLECTION
 
     @contextmanager
     def connect(self) -> Generator[WeaviateClient, None, None]:
         """Connect to the vector database.
 
+        The shared client is not closed after use. If the connection fails,
+        the client is health checked before the next use.
+
         Yields:
             The Weaviate client.
         """
-        client: WeaviateClient = connect_to_wcs(
-            cluster_url=self.host,
-            auth_credentials=AuthApiKey(
-                self.api_key,
-            ),
-            headers={
-                "X-Cohere-Api-Key": self.cohere_key,
-            },
-        )
+        client: WeaviateClient = self.client_manager.get_client()
         try:
             yield client
-        finally:
-            client.close()
+        except WeaviateConnectionError:
+            self.client_manager.invalidate()
+            raise
+
+    def get_or_create_collection(self, client: WeaviateClient) -> Collection:
+        """Create the shared collection if it does not exist.
+
+        Arguments:
+            client: The Weaviate client.
+
+        Returns:
+            The shared collection.
+        """
+        if client.collections.exists(self.collection_name):
+            return client.collections.get(name=self.collection_name)
+
+        return client.collections.create(
+            name=self.collection_name,
+            multi_tenancy_config=wvconfig.Configure.multi_tenancy(
+                enabled=True, auto_tenant_activation=True
+            ),
+            vectorizer_config=[
+                wvconfig.Configure.NamedVectors.text2vec_cohere(
+                    name="content_vector",
+                    source_properties=["content"],
+                    vectorize_collection_name=False,
+                ),
+            ],
+            properties=[
+                wvconfig.Property(name="content", data_type=wvconfig.DataType.TEXT),
+                wvconfig.Property(name="resource_id", data_type=wvconfig.DataType.TEXT),
+                wvconfig.Property(name="name", data_type=wvconfig.DataType.TEXT),
+                wvconfig.Property(name="path", data_type=wvconfig.DataType.TEXT),
+            ],
+        )
 
     @validate_call
-    def create_collection(self, collection_name: str) -> None:
-        """Create a collection in the vector database.
+    def create_tenant(self, tenant: str) -> None:
+        """Create a tenant in the vector database if it does not exist.
 
         Arguments:
-            collection_name: The name of the collection.
+            tenant: The name of the tenant.
 
         Returns:
             None.
         """
         with self.connect() as client:
-            client.collections.create(
-                name=collection_name,
-                vectorizer_config=[
-                    wvconfig.Configure.NamedVectors.text2vec_cohere(
-                        name="content_vector",
-                        source_properties=["content"],
-                        vectorize_collection_name=False,
-                    ),
-                ],
-                properties=[
-                    wvconfig.Property(name="content", data_type=wvconfig.DataType.TEXT),
-                    wvconfig.Property(
-                        name="resource_id", data_type=wvconfig.DataType.TEXT
-                    ),
-                    wvconfig.Property(name="name", data_type=wvconfig.DataType.TEXT),
-                    wvconfig.Property(name="path", data_type=wvconfig.DataType.TEXT),
-                ],
-            )
+            collection = self.get_or_create_collection(client)
+            if not collection.tenants.exists(tenant):
+                collection.tenants.create(Tenant(name=tenant))
 
     @validate_call
-    def batch_insert_objects(
-        self, collection_name: str, chunks: list[str], resource: DropboxFileMetadata
-    ) -> None:
-        """Batch insert objects into the collection.
+    def activate_tenant(self, tenant: str) -> None:
+        """Load the data of a tenant to serve its requests.
+
+        Arguments:
+            tenant: The name of the tenant.
+
+        Returns:
+            None.
+        """
+        self._set_tenant_status(tenant=tenant, status=TenantActivityStatus.HOT)
+
+    @validate_call
+    def deactivate_tenant(self, tenant: str) -> None:
+        """Offload the data of an idle tenant.
 
         Arguments:
-            collection_name: The name of the collection.
-            chunks: The objects to insert.
-            resource: The resource metadata.
+            tenant: The name of the tenant.
 
         Returns:
             None.
         """
+        self._set_tenant_status(tenant=tenant, status=TenantActivityStatus.COLD)
+
+    @validate_call
+    def batch_insert_objects(
+        self, tenant: str, objects: list[VectorObject]
+    ) -> dict[str, str]:
+        """Batch insert objects into the tenant.
+
+        The objects may belong to several resources. The UUID of an object
+        is derived from its resource ID and content, so inserting the same
+        objects again, as concurrent indexings of a shared content do,
+        replaces them instead of duplicating them.
+
+        Arguments:
+            tenant: The name of the tenant.
+            objects: The objects to insert.
+
+        Returns:
+            The error messages of the resources whose objects could not be
+            inserted, by resource ID.
+        """
         with self.connect() as client:
             collection = client.collections.get(
-                name=collection_name,
-            )
+                name=self.collection_name,
+            ).with_tenant(tenant)
             with collection.batch.dynamic() as batch:
-                for chunk in chunks:
+                for obj in objects:
                     batch.add_object(
-                        properties={
-                            "content": chunk,
-                            "resource_id": resource.id,
-                            "name": resource.name,
-                            "path": resource.path,
-                        },
+                        properties=obj.model_dump(),
+                        uuid=generate_uuid5([obj.resource_id, obj.content]),
                     )
+            errors: dict[str, str] = {}
+            for failed_object in collection.batch.failed_objects:
+                properties = failed_object.object_.properties or {}
+                errors.setdefault(
+                    str(properties.get("resource_id")), failed_object.message
+                )
+            return errors
 
     @validate_call
-    def query(self, collection_name: str, query: str) -> dict[str, Query]:
+    def delete_resource_objects(self, tenant: str, resource_id: str) -> None:
+        """Delete the objects of a resource from the tenant.
+
+        Arguments:
+            tenant: The name of the tenant.
+            resource_id: The ID of the resource.
+
+        Returns:
+            None.
+        """
+        with self.connect() as client:
+            collection = client.collections.get(
+                name=self.collection_name,
+            ).with_tenant(tenant)
+            collection.data.delete_many(
+                where=Filter.by_property("resource_id").equal(resource_id)
+            )
+
+    @validate_call
+    def query(
+        self,
+        tenant: str,
+        query: str,
+        mode: SearchMode = SearchMode.VECTOR,
+        alpha: Annotated[float, Field(ge=0, le=1)] = 0.5,
+        limit: Annotated[int, Field(gt=0)] = 10,
+        offset: Annotated[int, Field(ge=0)] = 0,
+        resource_ids: list[str] | None = None,
+    ) -> list[QueryResult]:
         """Query the resources of a user.
 
+        If the vector or hybrid search fails, for example because the
+        vectorizer is rate limited, the keyword search is used instead.
+
         Arguments:
-            collection_name: The name of the collection.
+            tenant: The name of the tenant.
             query: The query to search.
+            mode: The search mode.
+            alpha: The weight of the vector score in the hybrid search,
+                where 0 is pure keyword and 1 is pure vector search.
+            limit: The maximum number of results.
+            offset: The number of best results to skip.
+            resource_ids: The IDs of the resources to search, or None for
+                all the resources of the tenant.
 
         Returns:
-            The result of the query as dictionary whose keys
-                are resource ids.
+            The found chunks, best match first.
         """
+        if resource_ids is not None and not resource_ids:
+            return []
+        filters: Filter | None = (
+            Filter.by_property("resource_id").contains_any(resource_ids)
+            if resource_ids is not None
+            else None
+        )
         with self.connect() as client:
             collection = client.collections.get(
-                name=collection_name,
+                name=self.collection_name,
+            ).with_tenant(tenant)
+            try:
+                response: QueryReturn = self._search(
+                    collection=collection,
+                    query=query,
+                    mode=mode,
+                    alpha=alpha,
+                    limit=limit,
+                    offset=offset,
+                    filters=filters,
+                )
+            except WeaviateQueryError:
+                if mode == SearchMode.KEYWORD:
+                    raise
+                logger.warning("%s search failed, using keyword search.", mode.value)
+                response = self._search(
+                    collection=collection,
+                    query=query,
+                    mode=SearchMode.KEYWORD,
+                    limit=limit,
+                    offset=offset,
+                    filters=filters,
+                )
+            return [
+                self._to_result(
+                    properties=obj.properties,
+                    distance=obj.metadata.distance,
+                    score=obj.metadata.score,
+                )
+                for obj in response.objects
+            ]
+
+    @staticmethod
+    def _search(
+        collection: Collection,
+        query: str,
+        mode: SearchMode,
+        alpha: float = 0.5,
+        limit: int = 10,
+        offset: int = 0,
+        filters: Filter | None = None,
+    ) -> QueryReturn:
+        """Search the objects of a collection.
+
+        Arguments:
+            collection: The collection of the tenant.
+            query: The query to search.
+            mode: The search mode.
+            alpha: The weight of the vector score in the hybrid search.
+            limit: The maximum number of results.
+            offset: The number of best results to skip.
+            filters: The filters of the objects to search, if any.
+
+        Returns:
+            The found objects.
+        """
+        if mode == SearchMode.KEYWORD:
+            return collection.query.bm25(
+                query=query,
+                limit=limit,
+                offset=offset,
+                filters=filters,
+                return_metadata=MetadataQuery(score=True),
             )
-            response = collection.query.near_text(
+        if mode == SearchMode.HYBRID:
+            return collection.query.hybrid(
                 query=query,
-                # limit=2,
-                distance=0.4,
+                alpha=alpha,
+                target_vector="content_vector",
+                limit=limit,
+                offset=offset,
+                filters=filters,
+                return_metadata=MetadataQuery(score=True),
             )
+        return collection.query.near_text(
+            query=query,
+            distance=MAX_DISTANCE,
+            limit=limit,
+            offset=offset,
+            filters=filters,
+            return_metadata=MetadataQuery(distance=True),
+        )
 
-            result: dict[str, Query] = {}
-            for obj in response.objects:
-                property = obj.properties
-                if property["resource_id"] not in result:
-                    result[str(obj.properties["resource_id"])] = Query(
-                        content=[],
-                        name=str(property["name"]),
-                        path=str(property["path"]),
-                    )
-                result[str(property["resource_id"])].content.append(
-                    str(property["content"])
-                )
-            return result
+    def _set_tenant_status(self, tenant: str, status: TenantActivityStatus) -> None:
+        """Set the activity status of a tenant.
+
+        Arguments:
+            tenant: The name of the tenant.
+            status: The activity status.
+
+        Returns:
+            None.
+        """
+        with self.connect() as client:
+            client.collections.get(name=self.collection_name).tenants.update(
+                Tenant(name=tenant, activity_status=status)
+            )
@@ -0,0 +1,164 @@
+"""Module to manage the shared vector database client."""
+
+import logging
+from threading import Lock
+from time import monotonic
+
+from weaviate import WeaviateClient, connect_to_wcs
+from weaviate.auth import AuthApiKey
+from weaviate.classes.init import AdditionalConfig
+from weaviate.config import ConnectionConfig
+from weaviate.exceptions import WeaviateBaseError
+
+from src.core import configuration
+
+logger = logging.getLogger(__name__)
+
+
+class VectorDBClientManager:
+    """Vector database client manager.
+
+    The manager owns one long-lived Weaviate client whose HTTP and gRPC
+    connection pools are shared by every vector database operation. It is
+    opened and closed by the application lifespan.
+
+    Methods:
+        connect: Open the shared client.
+        get_client: Get the shared client, reconnecting if it is unhealthy.
+        invalidate: Mark the shared client as unhealthy.
+        close: Close the shared client.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        api_key: str,
+        cohere_key: str,
+        pool_connections: int,
+        pool_maxsize: int,
+        health_check_interval: float,
+    ):
+        """Initialize the vector database client manager."""
+        self.host: str = host
+        self.api_key: str = api_key
+        self.cohere_key: str = cohere_key
+        self.pool_connections: int = pool_connections
+        self.pool_maxsize: int = pool_maxsize
+        self.health_check_interval: float = health_check_interval
+        self._client: WeaviateClient | None = None
+        self._last_health_check: float = 0.0
+        self._lock: Lock = Lock()
+
+    def connect(self) -> None:
+        """Open the shared client.
+
+        A failure is only logged, so the application can start while the
+        cluster is unreachable. The client is created on the first use then.
+
+        Returns:
+            None.
+        """
+        try:
+            self.get_client()
+        except WeaviateBaseError:
+            logger.warning("Vector database is unreachable, will retry on use.")
+
+    def get_client(self) -> WeaviateClient:
+        """Get the shared client.
+
+        The client is health checked at most once per health check interval
+        and recreated if it is not ready.
+
+        Returns:
+            The Weaviate client.
+        """
+        with self._lock:
+            if self._client is not None and not self._is_healthy(self._client):
+                self._close_client()
+            if self._client is None:
+                self._client = self._create_client()
+                self._last_health_check = monotonic()
+            return self._client
+
+    def invalidate(self) -> None:
+        """Mark the shared client as unhealthy.
+
+        The next call of `get_client` checks the client health immediately.
+
+        Returns:
+            None.
+        """
+        with self._lock:
+            self._last_health_check = 0.0
+
+    def close(self) -> None:
+        """Close the shared client.
+
+        Returns:
+            None.
+        """
+        with self._lock:
+            self._close_client()
+
+    def _create_client(self) -> WeaviateClient:
+        """Create a new Weaviate client.
+
+        Returns:
+            The Weaviate client.
+        """
+        return connect_to_wcs(
+            cluster_url=self.host,
+            auth_credentials=AuthApiKey(
+                self.api_key,
+            ),
+            headers={
+                "X-Cohere-Api-Key": self.cohere_key,
+            },
+            additional_config=AdditionalConfig(
+                connection=ConnectionConfig(
+                    session_pool_connections=self.pool_connections,
+                    session_pool_maxsize=self.pool_maxsize,
+                ),
+            ),
+        )
+
+    def _is_healthy(self, client: WeaviateClient) -> bool:
+        """Check whether the client can still reach the cluster.
+
+        Arguments:
+            client: The Weaviate client.
+
+        Returns:
+            Whether the client is healthy.
+        """
+        if monotonic() - self._last_health_check < self.health_check_interval:
+            return True
+        try:
+            healthy: bool = client.is_ready()
+        except WeaviateBaseError:
+            healthy = False
+        self._last_health_check = monotonic()
+        return healthy
+
+    def _close_client(self) -> None:
+        """Close the current client and forget it.
+
+        Returns:
+            None.
+        """
+        if self._client is None:
+            return
+        try:
+            self._client.close()
+        finally:
+            self._client = None
+
+
+vector_db_client_manager: VectorDBClientManager = VectorDBClientManager(
+    host=configuration.VECTOR_DB.HOST,
+    api_key=configuration.VECTOR_DB.KEY,
+    cohere_key=configuration.COHERE_API_KEY,
+    pool_connections=configuration.VECTOR_DB.POOL_CONNECTIONS,
+    pool_maxsize=configuration.VECTOR_DB.POOL_MAXSIZE,
+    health_check_interval=configuration.VECTOR_DB.HEALTH_CHECK_INTERVAL,
+)
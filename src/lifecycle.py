@@ -0,0 +1,93 @@
+"""Startup and shutdown of the background services of a process."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from src.core import configuration
+from src.core.config import VectorDBBackend
+from src.database import (
+    AsyncVectorDB,
+    database_session_manager,
+    vector_db_client_manager,
+    vector_db_executor,
+)
+from src.service.cache import QUERY_CHANNEL, query_cache
+from src.service.chunk_cache import chunk_cache
+from src.service.dropbox.index_job import IndexJobService
+from src.service.dropbox.token_cache import TOKEN_CHANNEL, token_cache
+from src.service.http_client import http_client_manager
+from src.service.notification import notification_listener
+from src.service.process_pool import process_pool
+from src.service.shared_content import shared_contents
+
+
+@asynccontextmanager
+async def background_services(job_workers: int) -> AsyncIterator[None]:
+    """Run the background services of a process while in the context.
+
+    The shared connections are opened and the periodic tasks are started on
+    enter. On exit, the index job workers are stopped first, so their files
+    are not left half processed by the closed connections, then the other
+    tasks, the pools and the connections.
+
+    Arguments:
+        job_workers: The number of index job workers to run.
+
+    Yields:
+        None.
+    """
+    if configuration.VECTOR_DB.BACKEND == VectorDBBackend.WEAVIATE:
+        vector_db_client_manager.connect()
+    await AsyncVectorDB().create_shared_tenant()
+    notification_listener.subscribe(
+        TOKEN_CHANNEL, token_cache.on_notification, token_cache.clear
+    )
+    notification_listener.subscribe(
+        QUERY_CHANNEL, query_cache.on_notification, query_cache.clear
+    )
+    tasks: list[asyncio.Task[None]] = [
+        asyncio.create_task(
+            AsyncVectorDB().deactivate_idle_tenants_periodically(
+                interval=configuration.VECTOR_DB.TENANT_IDLE_CHECK_INTERVAL,
+                idle_for=configuration.VECTOR_DB.TENANT_IDLE_TIMEOUT,
+            )
+        ),
+        asyncio.create_task(
+            notification_listener.listen(
+                engine=database_session_manager.engine,
+                retry_interval=configuration.TOKEN_CACHE.LISTEN_RETRY_INTERVAL,
+            )
+        ),
+        asyncio.create_task(
+            chunk_cache.evict_periodically(
+                interval=configuration.CHUNK_CACHE.EVICT_INTERVAL,
+                max_bytes=configuration.CHUNK_CACHE.MAX_BYTES,
+            )
+        ),
+        asyncio.create_task(
+            shared_contents.collect_garbage_periodically(
+                interval=configuration.VECTOR_DB.SHARED_GC_INTERVAL,
+                grace_period=configuration.VECTOR_DB.SHARED_GC_GRACE_PERIOD,
+            )
+        ),
+    ]
+    index_job_workers: list[asyncio.Task[None]] = [
+        asyncio.create_task(
+            IndexJobService().run_jobs_periodically(
+                poll_interval=configuration.INDEX.JOB_POLL_INTERVAL
+            )
+        )
+        for _ in range(job_workers)
+    ]
+    try:
+        yield
+    finally:
+        for task_group in (index_job_workers, tasks):
+            for task in task_group:
+                task.cancel()
+            await asyncio.gather(*task_group, return_exceptions=True)
+        vector_db_executor.shutdown()
+        process_pool.shutdown()
+        await http_client_manager.close()
+        vector_db_client_manager.close()
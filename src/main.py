@@ -1,5 +1,8 @@
 """Main project file."""
 
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
+
 from fastapi import FastAPI
 from fastapi.middleware import Middleware
 
@@ -10,13 +13,24 @@ from src.api import (
     query_router,
     user_router,
 )
+from src.core import configuration
+from src.lifecycle import background_services
 from src.middleware import GenericErrorHandlerMiddleware
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncGenerator[None, None]:
+    """Open the shared connections on startup and close them on shutdown."""
+    async with background_services(job_workers=configuration.INDEX.JOB_WORKERS):
+        yield
+
+
 app: FastAPI = FastAPI(
     title="Teams Chatbot API",
     description="Teams chatbot API.",
     version="0.1.0",
     middleware=[Middleware(GenericErrorHandlerMiddleware)],
+    lifespan=lifespan,
 )
 
 app.include_router(dropbox_index_router)
@@ -10,6 +10,8 @@ from src.core import (
     ConflictError,
     InvalidInputError,
     NotFoundError,
+    ServiceUnavailableError,
+    TooManyRequestsError,
     UnprocessableEntityError,
 )
 
@@ -17,6 +19,8 @@ custom_errors: dict[Type[Exception], int] = {
     ConflictError: status.HTTP_409_CONFLICT,
     InvalidInputError: status.HTTP_400_BAD_REQUEST,
     NotFoundError: status.HTTP_404_NOT_FOUND,
+    ServiceUnavailableError: status.HTTP_503_SERVICE_UNAVAILABLE,
+    TooManyRequestsError: status.HTTP_429_TOO_MANY_REQUESTS,
     UnprocessableEntityError: status.HTTP_422_UNPROCESSABLE_ENTITY,
 }
 
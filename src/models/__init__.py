@@ -1,7 +1,22 @@
 """Database models module."""
 
+from .dropbox_cursor import DropboxCursor
 from .dropbox_token import DropboxToken
+from .index_job import IndexJob, IndexJobFile
 from .indexed_resource import IndexedResource
+from .parsed_content import ParsedContent
+from .shared_content import SharedContent
+from .tenant_usage import TenantUsage
 from .user import User
 
-__all__ = ["DropboxToken", "IndexedResource", "User"]
+__all__ = [
+    "DropboxCursor",
+    "DropboxToken",
+    "IndexJob",
+    "IndexJobFile",
+    "IndexedResource",
+    "ParsedContent",
+    "SharedContent",
+    "TenantUsage",
+    "User",
+]
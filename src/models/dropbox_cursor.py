@@ -0,0 +1,24 @@
+"""Model to store the folder listing cursors of the indexed folders."""
+
+from sqlalchemy import ForeignKey, Integer, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+from .mixin import IDMixin, TimestampMixin, text
+
+
+class DropboxCursor(Base, IDMixin, TimestampMixin):
+    """Dropbox folder listing cursor model.
+
+    The cursor of an indexed folder of a user is used to list only the
+    changes of the folder at the next indexing.
+    """
+
+    __tablename__ = "dropbox_cursors"
+    __table_args__ = (UniqueConstraint("user_id", "resource_id"),)
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id"), nullable=False, index=True
+    )
+    resource_id: Mapped[text]
+    cursor: Mapped[text]
@@ -0,0 +1,83 @@
+"""Models to store the index jobs and the progress of their files."""
+
+from datetime import datetime
+
+from sqlalchemy import BIGINT, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.schemas.index_job import IndexFileStatus, IndexJobStatus
+
+from .base import Base
+from .mixin import IDMixin, TimestampMixin, text
+
+
+class IndexJob(Base, IDMixin, TimestampMixin):
+    """Index job model.
+
+    A job lists a resource of a user in the background and queues its
+    files, which are indexed by any worker. Its counters are updated as the
+    files are processed. The listing cursor of a folder is saved once all
+    its files are indexed.
+    """
+
+    __tablename__ = "index_jobs"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id"), nullable=False, index=True
+    )
+    resource_id: Mapped[text]
+    status: Mapped[IndexJobStatus] = mapped_column(
+        Enum(IndexJobStatus, values_callable=lambda enum: [e.value for e in enum]),
+        nullable=False,
+        default=IndexJobStatus.PENDING,
+        index=True,
+    )
+    error: Mapped[str | None] = mapped_column(String, nullable=True)
+    indexed_files: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    unchanged_files: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    skipped_files: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    failed_files: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    indexed_bytes: Mapped[int] = mapped_column(BIGINT, nullable=False, default=0)
+    folder_id: Mapped[str | None] = mapped_column(String, nullable=True)
+    cursor: Mapped[str | None] = mapped_column(String, nullable=True)
+    started_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    listed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+
+class IndexJobFile(Base, IDMixin, TimestampMixin):
+    """Index job file model.
+
+    A row is a file of a job to index, claimed by a single worker at a
+    time. It keeps the metadata of the listed file and its outcome.
+    """
+
+    __tablename__ = "index_job_files"
+
+    job_id: Mapped[int] = mapped_column(
+        BIGINT,
+        ForeignKey("index_jobs.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    resource_id: Mapped[text]
+    name: Mapped[str] = mapped_column(String, nullable=False, server_default="")
+    path: Mapped[str | None] = mapped_column(String, nullable=True)
+    rev: Mapped[str | None] = mapped_column(String, nullable=True)
+    content_hash: Mapped[str | None] = mapped_column(String, nullable=True)
+    status: Mapped[IndexFileStatus] = mapped_column(
+        Enum(IndexFileStatus, values_callable=lambda enum: [e.value for e in enum]),
+        nullable=False,
+        default=IndexFileStatus.PENDING,
+        index=True,
+    )
+    error: Mapped[str | None] = mapped_column(String, nullable=True)
+    size: Mapped[int | None] = mapped_column(BIGINT, nullable=True)
@@ -1,6 +1,8 @@
 """Model to store user's indexed resources."""
 
-from sqlalchemy import ForeignKey, Integer
+from datetime import datetime
+
+from sqlalchemy import BIGINT, DateTime, ForeignKey, Integer, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
@@ -8,11 +10,29 @@ from .mixin import IDMixin, TimestampMixin, text
 
 
 class IndexedResource(Base, IDMixin, TimestampMixin):
-    """Indexed resource model."""
+    """Indexed resource model.
+
+    The revision, content hash and size of the file are those of the
+    indexed version, to detect whether the file changed since. The path is
+    used to find the indexed files of a deleted path. The last time the
+    file was seen by a whole listing of a folder finds those no longer
+    listed. The content hash also gives the user access to the shared
+    objects of the content, and the name and path of the file are those
+    shown in the results of the user.
+    """
 
     __tablename__ = "indexed_resource"
+    __table_args__ = (UniqueConstraint("user_id", "resource_id"),)
 
     resource_id: Mapped[text]
     user_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("users.id"), nullable=False, index=True
     )
+    name: Mapped[str | None] = mapped_column(String, nullable=True)
+    path: Mapped[str | None] = mapped_column(String, nullable=True, index=True)
+    rev: Mapped[str | None] = mapped_column(String, nullable=True)
+    content_hash: Mapped[str | None] = mapped_column(String, nullable=True, index=True)
+    size: Mapped[int | None] = mapped_column(BIGINT, nullable=True)
+    listed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
@@ -0,0 +1,33 @@
+"""Model to cache the chunks of the parsed files by content."""
+
+from datetime import datetime
+
+from sqlalchemy import BIGINT, DateTime, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from .base import Base
+from .mixin import IDMixin, TimestampMixin, text
+
+
+class ParsedContent(Base, IDMixin, TimestampMixin):
+    """Parsed content model.
+
+    The chunks of a file are shared by all the files of the same Dropbox
+    content hash, of any user. The version identifies the parser and the
+    chunker which produced them, so a new version parses the files again.
+    The size and the last use are kept to evict the least recently used
+    chunks beyond the size limit.
+    """
+
+    __tablename__ = "parsed_contents"
+    __table_args__ = (UniqueConstraint("content_hash", "version"),)
+
+    content_hash: Mapped[text]
+    version: Mapped[text]
+    chunks: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False)
+    size: Mapped[int] = mapped_column(BIGINT, nullable=False)
+    used_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
@@ -0,0 +1,28 @@
+"""Model to track the contents indexed once for all the users."""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from .base import Base
+from .mixin import IDMixin, TimestampMixin
+
+
+class SharedContent(Base, IDMixin, TimestampMixin):
+    """Shared content model.
+
+    The objects of a content are inserted once in the shared tenant of the
+    vector database, and every user with a file of this content hash
+    queries them. A row is only saved once the objects are inserted. The
+    last use is kept so a content no longer indexed by any user is deleted
+    only after a grace period, and not while a user is indexing it.
+    """
+
+    __tablename__ = "shared_contents"
+
+    content_hash: Mapped[str] = mapped_column(String, nullable=False, unique=True)
+    used_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
@@ -0,0 +1,28 @@
+"""Model to track the last use of the vector database tenants."""
+
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from .base import Base
+from .mixin import IDMixin, TimestampMixin
+
+
+class TenantUsage(Base, IDMixin, TimestampMixin):
+    """Tenant usage model.
+
+    The uses of a tenant by every API and worker process are recorded here,
+    so a tenant is only deactivated once no process has used it for the
+    idle timeout. A deactivated tenant is marked as inactive until it is
+    used again.
+    """
+
+    __tablename__ = "tenant_usages"
+
+    tenant: Mapped[str] = mapped_column(String, nullable=False, unique=True)
+    used_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
@@ -40,3 +40,19 @@ class DropboxFileMetadata(BaseModel):
     path: str | None = Field(default=None)
     client_modified: AwareDatetime | None = Field(default=None)
     server_modified: AwareDatetime | None = Field(default=None)
+
+
+class DropboxFolderListing(BaseModel):
+    """Dropbox folder listing model.
+
+    Attributes:
+        entries: The listed resources, or the added and changed resources
+            of a listing of changes.
+        deleted_paths: The lowercase paths of the deleted resources of a
+            listing of changes.
+        cursor: The cursor to list the changes since this listing.
+    """
+
+    entries: list[DropboxFileMetadata]
+    deleted_paths: list[str] = Field(default_factory=list)
+    cursor: str
@@ -0,0 +1,144 @@
+"""Index job schemas."""
+
+from datetime import datetime, timezone
+from enum import Enum
+
+from pydantic import AwareDatetime, BaseModel, ConfigDict, Field, computed_field
+
+
+class IndexJobStatus(str, Enum):
+    """Index job status enumeration.
+
+    Attributes:
+        PENDING: The job waits for a worker.
+        RUNNING: The job is run by a worker.
+        SUCCEEDED: The job listed and processed all the files, some of
+            which may have failed.
+        FAILED: The job stopped on an error.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class IndexFileStatus(str, Enum):
+    """Indexed file status enumeration.
+
+    Attributes:
+        PENDING: The file waits for a worker.
+        RUNNING: The file is indexed by a worker.
+        INDEXED: The file was indexed.
+        UNCHANGED: The file was skipped, it did not change since it was
+            indexed.
+        SKIPPED: The file was skipped without downloading it, its type is
+            not supported or it is too large.
+        FAILED: The file could not be indexed.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    INDEXED = "indexed"
+    UNCHANGED = "unchanged"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+
+
+class IndexJobFileSchema(BaseModel):
+    """Index job file schema.
+
+    Attributes:
+        resource_id: The ID of the file.
+        path: The path of the file.
+        status: The status of the file.
+        error: The error of a failed file, or the reason a file was skipped.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    resource_id: str
+    path: str | None = Field(default=None)
+    status: IndexFileStatus
+    error: str | None = Field(default=None)
+
+
+class IndexJobSchema(BaseModel):
+    """Index job schema.
+
+    Attributes:
+        id: The ID of the job.
+        resource_id: The ID of the resource to index.
+        status: The status of the job.
+        error: The error of a failed job.
+        indexed_files: The number of indexed files.
+        unchanged_files: The number of files skipped as unchanged.
+        skipped_files: The number of files skipped as not indexable.
+        failed_files: The number of files which could not be indexed.
+        pending_files: The number of listed files waiting to be indexed.
+        indexed_bytes: The total size of the indexed files.
+        created_at: The date and time the job was created.
+        started_at: The date and time the job started.
+        listed_at: The date and time the listing of the resource finished.
+        finished_at: The date and time the job finished.
+        failures: The failed files.
+        skipped: The files skipped as not indexable, with their reason.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    resource_id: str
+    status: IndexJobStatus
+    error: str | None = Field(default=None)
+    indexed_files: int = Field(default=0)
+    unchanged_files: int = Field(default=0)
+    skipped_files: int = Field(default=0)
+    failed_files: int = Field(default=0)
+    pending_files: int = Field(default=0)
+    indexed_bytes: int = Field(default=0)
+    created_at: AwareDatetime
+    started_at: AwareDatetime | None = Field(default=None)
+    listed_at: AwareDatetime | None = Field(default=None)
+    finished_at: AwareDatetime | None = Field(default=None)
+    failures: list[IndexJobFileSchema] = Field(default_factory=list)
+    skipped: list[IndexJobFileSchema] = Field(default_factory=list)
+
+    @computed_field
+    def files_per_second(self) -> float | None:
+        """Calculate the number of processed files per second.
+
+        Returns:
+            The throughput, or None if the job has not started.
+        """
+        elapsed: float | None = self._elapsed_seconds()
+        if not elapsed:
+            return None
+        processed: int = (
+            self.indexed_files
+            + self.unchanged_files
+            + self.skipped_files
+            + self.failed_files
+        )
+        return processed / elapsed
+
+    @computed_field
+    def bytes_per_second(self) -> float | None:
+        """Calculate the number of indexed bytes per second.
+
+        Returns:
+            The throughput, or None if the job has not started.
+        """
+        elapsed: float | None = self._elapsed_seconds()
+        return self.indexed_bytes / elapsed if elapsed else None
+
+    def _elapsed_seconds(self) -> float | None:
+        """Calculate the seconds the job has been running.
+
+        Returns:
+            The running time, or None if the job has not started.
+        """
+        if self.started_at is None:
+            return None
+        end = self.finished_at or datetime.now(tz=timezone.utc)
+        return max((end - self.started_at).total_seconds(), 0.0)
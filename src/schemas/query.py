@@ -1,17 +1,54 @@
 """Query pydantic schema."""
 
-from pydantic import BaseModel
+from enum import Enum
 
+from pydantic import BaseModel, Field
 
-class Query(BaseModel):
-    """Query schema.
+
+class SearchMode(str, Enum):
+    """Search mode enumeration.
+
+    Attributes:
+        VECTOR: Semantic search over the content vectors.
+        HYBRID: Fusion of the keyword (BM25) and the vector scores.
+        KEYWORD: Keyword (BM25) search, which needs no embedding.
+    """
+
+    VECTOR = "vector"
+    HYBRID = "hybrid"
+    KEYWORD = "keyword"
+
+
+class QueryResult(BaseModel):
+    """Query result schema.
 
     Attributes:
-        content: The content of the query.
+        content: The found chunk of the resource.
+        resource_id: The ID of the resource.
         name: The name of the resource.
         path: The path of the resource.
+        distance: The cosine distance between the chunk and the query,
+            given by the vector search.
+        score: The ranking score of the chunk, given by the keyword and
+            hybrid searches.
     """
 
-    content: list[str]
+    content: str
+    resource_id: str
     name: str
     path: str
+    distance: float | None = Field(default=None)
+    score: float | None = Field(default=None)
+
+
+class QueryResponse(BaseModel):
+    """Query response schema.
+
+    Attributes:
+        results: The found chunks, best match first.
+        next_cursor: The cursor of the next page, or None if this is the
+            last page.
+    """
+
+    results: list[QueryResult]
+    next_cursor: str | None = Field(default=None)
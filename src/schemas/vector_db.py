@@ -0,0 +1,19 @@
+"""Vector database pydantic schema."""
+
+from pydantic import BaseModel
+
+
+class VectorObject(BaseModel):
+    """Vector database object schema.
+
+    Attributes:
+        content: The chunk of the resource.
+        resource_id: The ID of the resource.
+        name: The name of the resource.
+        path: The path of the resource.
+    """
+
+    content: str
+    resource_id: str
+    name: str
+    path: str
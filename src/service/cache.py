@@ -0,0 +1,291 @@
+"""In-memory caches shared by the services."""
+
+import sys
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from threading import Lock
+from time import monotonic
+from typing import Final, Generic, TypeVar
+
+from src.core import configuration
+from src.schemas.query import QueryResult, SearchMode
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Postgres notification channel of the changes of the indexed objects. The
+# payload of a notification is the name of the tenant.
+QUERY_CHANNEL: Final[str] = "query_results"
+
+
+class LRUCache(Generic[K, V]):
+    """Least recently used cache with expiration and memory bound.
+
+    The cache is shared by all copies of the services which hold it.
+
+    Methods:
+        get: Get a value from the cache.
+        set: Add a value to the cache.
+        delete: Delete a value from the cache.
+        delete_where: Delete the values whose keys match a predicate.
+        clear: Delete all values from the cache.
+    """
+
+    def __init__(
+        self,
+        max_items: int,
+        ttl: float,
+        max_bytes: int | None = None,
+        sizeof: Callable[[V], int] = sys.getsizeof,
+    ):
+        """Initialize the cache."""
+        self.max_items: int = max_items
+        self.ttl: float = ttl
+        self.max_bytes: int | None = max_bytes
+        self.sizeof: Callable[[V], int] = sizeof
+        self.size: int = 0
+        self._items: OrderedDict[K, tuple[V, float, int]] = OrderedDict()
+        self._lock: Lock = Lock()
+
+    def __len__(self) -> int:
+        """Get the number of values in the cache."""
+        return len(self._items)
+
+    def get(self, key: K) -> V | None:
+        """Get a value from the cache.
+
+        Arguments:
+            key: The key of the value.
+
+        Returns:
+            The value, or None if it is missing or expired.
+        """
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            value, expires_at, _ = item
+            if expires_at <= monotonic():
+                self._pop(key)
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: K, value: V) -> None:
+        """Add a value to the cache.
+
+        The least recently used values are evicted until the cache fits its
+        item and memory bounds. A value larger than the memory bound is not
+        cached.
+
+        Arguments:
+            key: The key of the value.
+            value: The value.
+
+        Returns:
+            None.
+        """
+        size: int = self.sizeof(value)
+        with self._lock:
+            self._pop(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._items[key] = (value, monotonic() + self.ttl, size)
+            self.size += size
+            while len(self._items) > self.max_items or (
+                self.max_bytes is not None and self.size > self.max_bytes
+            ):
+                self._pop(next(iter(self._items)))
+
+    def delete(self, key: K) -> None:
+        """Delete a value from the cache.
+
+        Arguments:
+            key: The key of the value.
+
+        Returns:
+            None.
+        """
+        with self._lock:
+            self._pop(key)
+
+    def delete_where(self, predicate: Callable[[K], bool]) -> None:
+        """Delete the values whose keys match a predicate.
+
+        Arguments:
+            predicate: The function to select the keys to delete.
+
+        Returns:
+            None.
+        """
+        with self._lock:
+            for key in [key for key in self._items if predicate(key)]:
+                self._pop(key)
+
+    def clear(self) -> None:
+        """Delete all values from the cache.
+
+        Returns:
+            None.
+        """
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+    def _pop(self, key: K) -> None:
+        """Remove a value from the cache without locking.
+
+        Arguments:
+            key: The key of the value.
+
+        Returns:
+            None.
+        """
+        item = self._items.pop(key, None)
+        if item is not None:
+            self.size -= item[2]
+
+
+def _sizeof_query_results(results: list[QueryResult]) -> int:
+    """Estimate the memory size of query results.
+
+    Arguments:
+        results: The query results.
+
+    Returns:
+        The approximate size in bytes.
+    """
+    return sum(
+        len(result.content)
+        + len(result.resource_id)
+        + len(result.name)
+        + len(result.path)
+        for result in results
+    )
+
+
+class QueryCache(
+    LRUCache[tuple[str, str, SearchMode, float, int, int], list[QueryResult]]
+):
+    """Cache of vector database query results.
+
+    The results are keyed by the tenant, the normalized query text and the
+    search parameters, so the entries of a tenant can be invalidated when
+    its objects change. The processes notify each other of the changed
+    tenants through Postgres, so the API drops the results made stale by
+    the index workers.
+
+    Methods:
+        get_results: Get the cached results of a query.
+        set_results: Cache the results of a query.
+        invalidate: Delete the cached results of a tenant.
+        on_notification: Invalidate the results of the tenant of a
+            notification.
+    """
+
+    def __init__(self, max_items: int, ttl: float, max_bytes: int | None = None):
+        """Initialize the query cache."""
+        super().__init__(
+            max_items=max_items,
+            ttl=ttl,
+            max_bytes=max_bytes,
+            sizeof=_sizeof_query_results,
+        )
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalize the query text.
+
+        Arguments:
+            query: The query text.
+
+        Returns:
+            The query in lowercase with single spaces.
+        """
+        return " ".join(query.casefold().split())
+
+    def get_results(
+        self,
+        tenant: str,
+        query: str,
+        mode: SearchMode = SearchMode.VECTOR,
+        alpha: float = 0.5,
+        limit: int = 10,
+        offset: int = 0,
+    ) -> list[QueryResult] | None:
+        """Get the cached results of a query.
+
+        Arguments:
+            tenant: The name of the tenant.
+            query: The query text.
+            mode: The search mode.
+            alpha: The weight of the vector score in the hybrid search.
+            limit: The maximum number of results.
+            offset: The number of best results to skip.
+
+        Returns:
+            The cached results, or None if they are not cached.
+        """
+        return self.get((tenant, self.normalize(query), mode, alpha, limit, offset))
+
+    def set_results(
+        self,
+        tenant: str,
+        query: str,
+        results: list[QueryResult],
+        mode: SearchMode = SearchMode.VECTOR,
+        alpha: float = 0.5,
+        limit: int = 10,
+        offset: int = 0,
+    ) -> None:
+        """Cache the results of a query.
+
+        Arguments:
+            tenant: The name of the tenant.
+            query: The query text.
+            results: The results of the query.
+            mode: The search mode.
+            alpha: The weight of the vector score in the hybrid search.
+            limit: The maximum number of results.
+            offset: The number of best results to skip.
+
+        Returns:
+            None.
+        """
+        self.set((tenant, self.normalize(query), mode, alpha, limit, offset), results)
+
+    def invalidate(self, tenant: str) -> None:
+        """Delete the cached results of a tenant.
+
+        Arguments:
+            tenant: The name of the tenant.
+
+        Returns:
+            None.
+        """
+        self.delete_where(lambda key: key[0] == tenant)
+
+    def on_notification(self, payload: str) -> None:
+        """Invalidate the results of the tenant of a notification.
+
+        Arguments:
+            payload: The name of the tenant.
+
+        Returns:
+            None.
+        """
+        self.invalidate(tenant=payload)
+
+
+query_cache: QueryCache = QueryCache(
+    max_items=configuration.QUERY_CACHE.MAX_ITEMS,
+    ttl=configuration.QUERY_CACHE.TTL,
+    max_bytes=configuration.QUERY_CACHE.MAX_BYTES,
+)
+
+# Users are never deleted and their teams ids never change, so the cached
+# IDs only expire to bound the memory of the inactive users.
+user_id_cache: LRUCache[str, int] = LRUCache(
+    max_items=configuration.USER_ID_CACHE.MAX_ITEMS,
+    ttl=configuration.USER_ID_CACHE.TTL,
+)
@@ -0,0 +1,138 @@
+"""Cache of the chunks of the parsed files, shared by all the processes."""
+
+import asyncio
+import logging
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as psql_insert
+
+from src.core import configuration
+from src.database.session import DatabaseSessionManager, database_session_manager
+from src.models import ParsedContent
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkCache:
+    """Cache of the chunks of the parsed files by content hash.
+
+    The chunks are stored in Postgres, so a content parsed once by any
+    process of any user is not downloaded nor parsed again. Every access
+    takes its own short session. The least recently used chunks are
+    evicted beyond the size limit.
+
+    Methods:
+        get: Get the cached chunks of a content.
+        set: Cache the chunks of a content.
+        evict: Delete the least recently used chunks beyond a total size.
+        evict_periodically: Evict the chunks at every interval.
+    """
+
+    def __init__(self, session_manager: DatabaseSessionManager, enabled: bool):
+        """Initialize the chunk cache."""
+        self.session_manager: DatabaseSessionManager = session_manager
+        self.enabled: bool = enabled
+
+    async def get(self, content_hash: str, version: str) -> list[str] | None:
+        """Get the cached chunks of a content.
+
+        The chunks are marked as used by the same statement.
+
+        Arguments:
+            content_hash: The Dropbox content hash of the file.
+            version: The version of the chunks.
+
+        Returns:
+            The chunks, or None if they are not cached.
+        """
+        if not self.enabled:
+            return None
+        async with self.session_manager.get_session() as session:
+            return (
+                await session.execute(
+                    update(ParsedContent)
+                    .where(ParsedContent.content_hash == content_hash)
+                    .where(ParsedContent.version == version)
+                    .values(used_at=func.now())
+                    .returning(ParsedContent.chunks)
+                )
+            ).scalar_one_or_none()
+
+    async def set(self, content_hash: str, version: str, chunks: list[str]) -> None:
+        """Cache the chunks of a content.
+
+        The chunks cached by a concurrent parse of the same content are
+        kept.
+
+        Arguments:
+            content_hash: The Dropbox content hash of the file.
+            version: The version of the chunks.
+            chunks: The chunks of the content.
+
+        Returns:
+            None.
+        """
+        if not self.enabled:
+            return
+        async with self.session_manager.get_session() as session:
+            await session.execute(
+                psql_insert(ParsedContent)
+                .values(
+                    content_hash=content_hash,
+                    version=version,
+                    chunks=chunks,
+                    size=sum(len(chunk.encode()) for chunk in chunks),
+                )
+                .on_conflict_do_nothing(
+                    index_elements=[ParsedContent.content_hash, ParsedContent.version]
+                )
+            )
+
+    async def evict(self, max_bytes: int) -> None:
+        """Delete the least recently used chunks beyond a total size.
+
+        Arguments:
+            max_bytes: The maximum total size of the cached chunks.
+
+        Returns:
+            None.
+        """
+        ranked = select(
+            ParsedContent.id,
+            func.sum(ParsedContent.size)
+            .over(order_by=(ParsedContent.used_at.desc(), ParsedContent.id.desc()))
+            .label("total_size"),
+        ).subquery()
+        async with self.session_manager.get_session() as session:
+            await session.execute(
+                delete(ParsedContent).where(
+                    ParsedContent.id.in_(
+                        select(ranked.c.id).where(ranked.c.total_size > max_bytes)
+                    )
+                )
+            )
+
+    async def evict_periodically(self, interval: float, max_bytes: int) -> None:
+        """Evict the least recently used chunks at every interval.
+
+        Arguments:
+            interval: Seconds between two evictions.
+            max_bytes: The maximum total size of the cached chunks.
+
+        Returns:
+            None.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            if not self.enabled:
+                continue
+            try:
+                await self.evict(max_bytes=max_bytes)
+            except Exception:
+                logger.exception("Cached chunks not evicted.")
+
+
+chunk_cache: ChunkCache = ChunkCache(
+    session_manager=database_session_manager,
+    enabled=configuration.CHUNK_CACHE.ENABLED,
+)
@@ -0,0 +1,180 @@
+"""Text parsing and chunking functions run in the worker processes."""
+
+from functools import lru_cache
+from typing import Final, Iterable, Iterator
+
+from tokenizers import Tokenizer
+
+from .parser import Parser, ParserFactory
+from .parser.pdf_parser import PDFParser
+
+TOKENIZER_NAME: str = "Cohere/Cohere-embed-multilingual-v3.0"
+
+# Version of the chunks produced from a text, to increase when the chunking
+# changes.
+CHUNKER_VERSION: Final[int] = 1
+
+
+@lru_cache(maxsize=1)
+def get_tokenizer() -> Tokenizer:
+    """Get the tokenizer to chunk the texts.
+
+    The tokenizer is loaded once per process on the first use.
+
+    Returns:
+        The tokenizer.
+    """
+    return Tokenizer.from_pretrained(TOKENIZER_NAME)
+
+
+def chunk_text_with_overlap(
+    text: str, max_tokens: int = 256, overlap: int = 50
+) -> list[str]:
+    """Chunk the text with overlap.
+
+    How to improve:
+        Can be indexed by sentence while calculating token
+            so there won't be any half sentence.
+
+    Arguments:
+        text: The text to chunk.
+        max_tokens: The maximum number of tokens in a chunk.
+        overlap: The number of overlapping tokens between chunks.
+
+    Returns:
+        The list of chunks.
+    """
+    return list(
+        chunk_segments_with_overlap(
+            segments=[text], max_tokens=max_tokens, overlap=overlap
+        )
+    )
+
+
+def chunk_segments_with_overlap(
+    segments: Iterable[str], max_tokens: int = 256, overlap: int = 50
+) -> Iterator[str]:
+    """Chunk the text segments with overlap as they are produced.
+
+    The segments are tokenized one at a time, and only the tokens not yet
+    chunked are kept, so the whole text is never held in memory. The
+    chunks run across the segments, and no special token is added to the
+    segments, as they are parts of one text.
+
+    Arguments:
+        segments: The text segments, in order.
+        max_tokens: The maximum number of tokens in a chunk.
+        overlap: The number of overlapping tokens between chunks.
+
+    Yields:
+        The chunks.
+    """
+    tokenizer: Tokenizer = get_tokenizer()
+    tokens: list[int] = []
+    for segment in segments:
+        tokens.extend(tokenizer.encode(segment, add_special_tokens=False).ids)
+        while len(tokens) >= max_tokens:
+            yield tokenizer.decode(tokens[:max_tokens])
+            tokens = tokens[max_tokens - overlap :]
+    if tokens:
+        yield tokenizer.decode(tokens)
+
+
+def parse_and_chunk(content: bytes, file_extension: str) -> list[str]:
+    """Parse the content of a file and chunk its text.
+
+    Arguments:
+        content: The content of the file.
+        file_extension: The extension of the file.
+
+    Returns:
+        The list of chunks.
+
+    Raises:
+        ValueError: If the file type is not supported.
+    """
+    try:
+        parser: Parser = ParserFactory.create_parser(file_extension)
+    except ValueError as error:
+        raise ValueError(f"Unsupported file type: {file_extension}") from error
+    return list(chunk_segments_with_overlap(segments=parser.parse(content)))
+
+
+def get_chunks_version(file_extension: str) -> str:
+    """Get the version of the chunks of the files of an extension.
+
+    The version identifies the parser, the tokenizer and the chunker, so
+    the same content gives the same chunks for the same version.
+
+    Arguments:
+        file_extension: The extension of the file.
+
+    Returns:
+        The version of the chunks.
+
+    Raises:
+        ValueError: If the file type is not supported.
+    """
+    parser: Parser = ParserFactory.create_parser(file_extension)
+    return (
+        f"{type(parser).__name__}.{parser.version}:"
+        f"{TOKENIZER_NAME}:{CHUNKER_VERSION}"
+    )
+
+
+def chunk_segments(segments: list[str]) -> list[str]:
+    """Chunk the text segments parsed in other processes.
+
+    Arguments:
+        segments: The text segments, in order.
+
+    Returns:
+        The list of chunks.
+    """
+    return list(chunk_segments_with_overlap(segments=segments))
+
+
+def count_pdf_pages(path: str) -> int:
+    """Count the pages of a PDF file with the configured backend.
+
+    Arguments:
+        path: The path of the PDF file.
+
+    Returns:
+        The number of pages.
+    """
+    with open(path, "rb") as file:
+        return get_pdf_parser().count_pages(file)
+
+
+def parse_pdf_pages(path: str, start: int, stop: int) -> list[str]:
+    """Parse a range of pages of a PDF file with the configured backend.
+
+    The file is read by the worker process, so the content is not pickled
+    for every range.
+
+    Arguments:
+        path: The path of the PDF file.
+        start: The index of the first page.
+        stop: The index after the last page.
+
+    Returns:
+        The text of every page of the range.
+    """
+    with open(path, "rb") as file:
+        return list(get_pdf_parser().parse_pages(content=file, start=start, stop=stop))
+
+
+def get_pdf_parser() -> PDFParser:
+    """Get the parser of the configured PDF backend.
+
+    Returns:
+        The PDF parser.
+
+    Raises:
+        ValueError: If the registered PDF parser cannot parse page ranges.
+    """
+    parser: Parser = ParserFactory.create_parser("pdf")
+    if not isinstance(parser, PDFParser):
+        raise ValueError("The PDF parser cannot parse page ranges")
+    return parser
@@ -1,16 +1,31 @@
 """Dropbox handler service module."""
 
 from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
 from json import dumps
-from typing import Any, Final
-
-from aiohttp import ClientSession
-from pydantic import BaseModel, validate_call
-
-from src.core import InvalidInputError, configuration
-from src.schemas.dropbox import DropboxAuthToken, DropboxFileMetadata, ResourceType
+from typing import Any, AsyncIterator, Final
+
+from pydantic import BaseModel, Field, InstanceOf, validate_call
+
+from src.core import (
+    InvalidInputError,
+    ServiceUnavailableError,
+    TooManyRequestsError,
+    configuration,
+)
+from src.schemas.dropbox import (
+    DropboxAuthToken,
+    DropboxFileMetadata,
+    DropboxFolderListing,
+    ResourceType,
+)
+from src.service.http_client import HttpClientManager, http_client_manager
+from src.service.limiter import AdaptiveLimiter
 from src.service.utils import HttpResponse, send_http_request
 
+# Maximum number of entries of a folder listing page.
+LIST_FOLDER_LIMIT: Final[int] = 2000
+
 
 class DropboxHandler(BaseModel):
     """Dropbox handler operations.
@@ -21,6 +36,7 @@ class DropboxHandler(BaseModel):
         redirect_uri: The redirect URI.
         client_id: The client ID.
         client_secret: The client secret.
+        http_client: The manager of the shared HTTP client session.
 
     Methods:
         get_access_and_refresh_token: Get access and refresh token
@@ -29,12 +45,20 @@ class DropboxHandler(BaseModel):
             from a refresh token.
         get_metadata_of_resource: Get metadata of the given resource.
         get_all_resources: Get all resources of the given path.
+        list_folder: List all resources of a folder with a cursor.
+        list_folder_changes: List the changes of a folder since a cursor.
+        list_folder_pages: List the resources of a folder page by page.
+        list_folder_changes_pages: List the changes of a folder since a
+            cursor page by page.
         fetch_pdf_file_content: Fetch the content of the PDF file.
     """
 
     redirect_uri: Final[str] = configuration.DROPBOX.REDIRECT_URI
     client_id: Final[str] = configuration.DROPBOX.CLIENT_ID
     client_secret: Final[str] = configuration.DROPBOX.CLIENT_SECRET
+    http_client: InstanceOf[HttpClientManager] = Field(
+        default_factory=lambda: http_client_manager
+    )
 
     @validate_call
     async def get_access_and_refresh_token(self, code: str) -> DropboxAuthToken:
@@ -59,6 +83,7 @@ class DropboxHandler(BaseModel):
                 "client_secret": self.client_secret,
                 "redirect_uri": self.redirect_uri,
             },
+            client_session=self.http_client.get_session(),
         )
         if not response.ok:
             raise InvalidInputError("Code")
@@ -94,6 +119,7 @@ class DropboxHandler(BaseModel):
                 "client_id": self.client_id,
                 "client_secret": self.client_secret,
             },
+            client_session=self.http_client.get_session(),
         )
         if not response.ok:
             raise InvalidInputError("Refresh Token")
@@ -131,24 +157,13 @@ class DropboxHandler(BaseModel):
                 "Content-Type": "application/json",
             },
             body=dumps({"path": path}),
+            client_session=self.http_client.get_session(),
         )
 
         if not result.ok:
             raise InvalidInputError("Resource")
 
-        data: dict[str, Any] = result.data
-
-        return DropboxFileMetadata(
-            id=data["id"],
-            name=data["name"],
-            type=ResourceType(data[".tag"]),
-            rev=data.get("rev"),
-            path=data.get("path_lower"),
-            content_hash=data.get("content_hash"),
-            size=data.get("size"),
-            client_modified=data.get("client_modified"),
-            server_modified=data.get("server_modified"),
-        )
+        return self._to_metadata(result.data)
 
     @validate_call
     async def get_all_resources(
@@ -169,32 +184,295 @@ class DropboxHandler(BaseModel):
 
         Raises:
             InvalidInputError: If the path is invalid.
+            TooManyRequestsError: If the requests of the user are rate
+                limited.
         """
-        result: HttpResponse = await send_http_request(
-            "https://api.dropboxapi.com/2/files/list_folder",
-            method="POST",
-            headers={
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json",
-            },
-            body=dumps({"path": path, "recursive": recursive}),
+        listing: DropboxFolderListing = await self.list_folder(
+            access_token=access_token, path=path, recursive=recursive
+        )
+        return listing.entries
+
+    @validate_call
+    async def list_folder(
+        self,
+        access_token: str,
+        path: str = "",
+        recursive: bool = False,
+        limiter: InstanceOf[AdaptiveLimiter] | None = None,
+    ) -> DropboxFolderListing:
+        """List all resources of a folder from the Dropbox API.
+
+        Every page of the listing is fetched.
+
+        Arguments:
+            access_token: The access token of user.
+            path: Path of the folder.
+            recursive: Whether to list recursively.
+            limiter: The limiter of the requests of the user, which retries
+                the rate limited requests, if any.
+
+        Returns:
+            The resources of the folder and the cursor of the listing.
+
+        Raises:
+            InvalidInputError: If the path is invalid.
+            TooManyRequestsError: If the requests of the user are rate
+                limited.
+        """
+        return await self._merge_pages(
+            await self.list_folder_pages(
+                access_token=access_token,
+                path=path,
+                recursive=recursive,
+                limiter=limiter,
+            )
         )
 
+    @validate_call
+    async def list_folder_changes(
+        self,
+        access_token: str,
+        cursor: str,
+        limiter: InstanceOf[AdaptiveLimiter] | None = None,
+    ) -> DropboxFolderListing | None:
+        """List the changes of a folder since a cursor from the Dropbox API.
+
+        Arguments:
+            access_token: The access token of user.
+            cursor: The cursor of a previous listing.
+            limiter: The limiter of the requests of the user, which retries
+                the rate limited requests, if any.
+
+        Returns:
+            The changed and deleted resources and the new cursor, or None
+            if the cursor was reset and the folder must be listed again.
+
+        Raises:
+            InvalidInputError: If the changes could not be listed.
+            TooManyRequestsError: If the requests of the user are rate
+                limited.
+        """
+        pages: (
+            AsyncIterator[DropboxFolderListing] | None
+        ) = await self.list_folder_changes_pages(
+            access_token=access_token, cursor=cursor, limiter=limiter
+        )
+        return await self._merge_pages(pages) if pages is not None else None
+
+    @validate_call
+    async def list_folder_pages(
+        self,
+        access_token: str,
+        path: str = "",
+        recursive: bool = False,
+        limiter: InstanceOf[AdaptiveLimiter] | None = None,
+    ) -> AsyncIterator[DropboxFolderListing]:
+        """List the resources of a folder page by page.
+
+        The next page is only fetched when the previous one is consumed.
+
+        Arguments:
+            access_token: The access token of user.
+            path: Path of the folder.
+            recursive: Whether to list recursively.
+            limiter: The limiter of the requests of the user, which retries
+                the rate limited requests, if any.
+
+        Returns:
+            The iterator of the pages of the listing.
+
+        Raises:
+            InvalidInputError: If the path is invalid.
+            TooManyRequestsError: If the requests of the user are rate
+                limited.
+        """
+        result: HttpResponse = await self._request_list_folder(
+            access_token=access_token,
+            endpoint="list_folder",
+            body={"path": path, "recursive": recursive, "limit": LIST_FOLDER_LIMIT},
+            limiter=limiter,
+        )
         if not result.ok:
             raise InvalidInputError("Resource")
 
-        return [
-            DropboxFileMetadata(
-                id=r["id"],
-                name=r["name"],
-                type=ResourceType(r[".tag"]),
-                rev=r.get("rev", None),
-                path=r.get("path_lower", None),
-                content_hash=r.get("content_hash", None),
-                size=r.get("size", None),
+        return self._iter_pages(
+            access_token=access_token, data=result.data, limiter=limiter
+        )
+
+    @validate_call
+    async def list_folder_changes_pages(
+        self,
+        access_token: str,
+        cursor: str,
+        limiter: InstanceOf[AdaptiveLimiter] | None = None,
+    ) -> AsyncIterator[DropboxFolderListing] | None:
+        """List the changes of a folder since a cursor page by page.
+
+        Arguments:
+            access_token: The access token of user.
+            cursor: The cursor of a previous listing.
+            limiter: The limiter of the requests of the user, which retries
+                the rate limited requests, if any.
+
+        Returns:
+            The iterator of the pages of the changes, or None if the cursor
+            was reset and the folder must be listed again.
+
+        Raises:
+            InvalidInputError: If the changes could not be listed.
+            TooManyRequestsError: If the requests of the user are rate
+                limited.
+        """
+        result: HttpResponse = await self._request_list_folder(
+            access_token=access_token,
+            endpoint="list_folder/continue",
+            body={"cursor": cursor},
+            limiter=limiter,
+        )
+        if result.status == HTTPStatus.CONFLICT:
+            return None
+        if not result.ok:
+            raise InvalidInputError("Resource")
+
+        return self._iter_pages(
+            access_token=access_token, data=result.data, limiter=limiter
+        )
+
+    async def _iter_pages(
+        self,
+        access_token: str,
+        data: dict[str, Any],
+        limiter: AdaptiveLimiter | None,
+    ) -> AsyncIterator[DropboxFolderListing]:
+        """Iterate over the pages of a listing.
+
+        Arguments:
+            access_token: The access token of user.
+            data: The first page of the listing.
+            limiter: The limiter of the requests of the user, if any.
+
+        Yields:
+            The resources of a page and its cursor.
+
+        Raises:
+            InvalidInputError: If a page could not be fetched.
+            TooManyRequestsError: If the requests of the user are rate
+                limited.
+        """
+        while True:
+            page: DropboxFolderListing = DropboxFolderListing(
+                entries=[], cursor=data["cursor"]
+            )
+            for entry in data["entries"]:
+                if entry[".tag"] == "deleted":
+                    page.deleted_paths.append(entry["path_lower"])
+                else:
+                    page.entries.append(self._to_metadata(entry))
+            yield page
+            if not data.get("has_more"):
+                return
+
+            result: HttpResponse = await self._request_list_folder(
+                access_token=access_token,
+                endpoint="list_folder/continue",
+                body={"cursor": page.cursor},
+                limiter=limiter,
+            )
+            if not result.ok:
+                raise InvalidInputError("Resource")
+            data = result.data
+
+    @staticmethod
+    async def _merge_pages(
+        pages: AsyncIterator[DropboxFolderListing],
+    ) -> DropboxFolderListing:
+        """Merge the pages of a listing, which has at least one page.
+
+        Arguments:
+            pages: The iterator of the pages.
+
+        Returns:
+            The resources of all pages and the cursor of the last page.
+        """
+        listing: DropboxFolderListing = await anext(pages)
+        async for page in pages:
+            listing.entries.extend(page.entries)
+            listing.deleted_paths.extend(page.deleted_paths)
+            listing.cursor = page.cursor
+        return listing
+
+    async def _request_list_folder(
+        self,
+        access_token: str,
+        endpoint: str,
+        body: dict[str, Any],
+        limiter: AdaptiveLimiter | None,
+    ) -> HttpResponse:
+        """Send a request to a folder listing endpoint of the Dropbox API.
+
+        A rate limited request is retried by the limiter, like the
+        downloads, after the `Retry-After` delay of Dropbox.
+
+        Arguments:
+            access_token: The access token of user.
+            endpoint: The endpoint under `files/`.
+            body: The body of the request.
+            limiter: The limiter of the requests of the user, if any.
+
+        Returns:
+            The response.
+
+        Raises:
+            TooManyRequestsError: If the request is still rate limited after
+                the retries, or at once without a limiter.
+            ServiceUnavailableError: If the request still fails with a
+                server error after the retries, or at once without a limiter.
+        """
+
+        async def request() -> HttpResponse:
+            response: HttpResponse = await send_http_request(
+                f"https://api.dropboxapi.com/2/files/{endpoint}",
+                method="POST",
+                headers={
+                    "Authorization": f"Bearer {access_token}",
+                    "Content-Type": "application/json",
+                },
+                body=dumps(body),
+                client_session=self.http_client.get_session(),
+            )
+            self._raise_for_overload(
+                status=response.status,
+                retry_after=response.headers.get("retry-after"),
             )
-            for r in result.data["entries"]
-        ]
+            return response
+
+        if limiter is None:
+            return await request()
+        return await limiter.call(
+            request, max_retries=configuration.INDEX.DOWNLOAD_MAX_RETRIES
+        )
+
+    @staticmethod
+    def _to_metadata(data: dict[str, Any]) -> DropboxFileMetadata:
+        """Convert a metadata of the Dropbox API to a resource metadata.
+
+        Arguments:
+            data: The metadata from the Dropbox API.
+
+        Returns:
+            The resource metadata.
+        """
+        return DropboxFileMetadata(
+            id=data["id"],
+            name=data["name"],
+            type=ResourceType(data[".tag"]),
+            rev=data.get("rev"),
+            path=data.get("path_lower"),
+            content_hash=data.get("content_hash"),
+            size=data.get("size"),
+            client_modified=data.get("client_modified"),
+            server_modified=data.get("server_modified"),
+        )
 
     @validate_call
     async def fetch_pdf_file_content(self, access_token: str, path: str) -> bytes:
@@ -209,17 +487,65 @@ class DropboxHandler(BaseModel):
 
         Raises:
             InvalidInputError: If the file is not found.
+            TooManyRequestsError: If the requests of the user are rate
+                limited.
+            ServiceUnavailableError: If Dropbox fails with a server error.
         """
         headers_download = {
             "Authorization": f"Bearer {access_token}",
             "Dropbox-API-Arg": f'{{"path": "{path}"}}',
         }
 
-        async with ClientSession() as session, session.post(
+        async with self.http_client.get_session().post(
             "https://content.dropboxapi.com/2/files/download",
             headers=headers_download,
         ) as response:
+            self._raise_for_overload(
+                status=response.status,
+                retry_after=response.headers.get("Retry-After"),
+            )
             if not response.ok:
                 raise InvalidInputError("File")
             content = await response.read()
             return content
+
+    @classmethod
+    def _raise_for_overload(cls, status: int, retry_after: str | None) -> None:
+        """Raise if a response rejects a request because of overload.
+
+        Arguments:
+            status: The status of the response.
+            retry_after: The value of its Retry-After header, if any.
+
+        Returns:
+            None.
+
+        Raises:
+            TooManyRequestsError: If the request is rate limited.
+            ServiceUnavailableError: If the request failed with a server
+                error.
+        """
+        if status == HTTPStatus.TOO_MANY_REQUESTS:
+            raise TooManyRequestsError(
+                "Dropbox", retry_after=cls._parse_retry_after(retry_after)
+            )
+        if status >= HTTPStatus.INTERNAL_SERVER_ERROR:
+            raise ServiceUnavailableError(
+                "Dropbox", retry_after=cls._parse_retry_after(retry_after)
+            )
+
+    @staticmethod
+    def _parse_retry_after(value: str | None) -> float | None:
+        """Parse the seconds of a Retry-After header.
+
+        Arguments:
+            value: The value of the header.
+
+        Returns:
+            The seconds to wait, or None if the value is missing or not a
+            number of seconds.
+        """
+        try:
+            return max(float(value), 0.0) if value is not None else None
+        except ValueError:
+            return None
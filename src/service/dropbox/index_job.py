@@ -0,0 +1,754 @@
+"""Index job service module."""
+
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from pydantic import Field, InstanceOf, validate_call
+from sqlalchemy import (
+    String,
+    and_,
+    any_,
+    bindparam,
+    delete,
+    exists,
+    func,
+    insert,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core import NotFoundError, configuration
+from src.database.session import DatabaseSessionManager, database_session_manager
+from src.models import IndexJob, IndexJobFile
+from src.schemas.dropbox import DropboxFileMetadata, ResourceType
+from src.schemas.index_job import (
+    IndexFileStatus,
+    IndexJobFileSchema,
+    IndexJobSchema,
+    IndexJobStatus,
+)
+
+from ..service import Service
+from ..utils import get_user_id_from_teams_id
+from .resource_index import FileReport, ResourceIndexService
+
+logger = logging.getLogger(__name__)
+
+
+class IndexJobProgress:
+    """Progress of the job files claimed by a worker.
+
+    The outcomes of the files are kept in memory and saved together at
+    every flush, so the files are not slowed down by a database write each.
+    The files still running are touched at every flush, to show that their
+    worker is alive.
+
+    Methods:
+        reporter: Get the function reporting the files of a job.
+        record: Record the outcome of a file.
+        fail_unreported: Record the files of a job without outcome as failed.
+        flush: Save the progress of the files.
+        flush_periodically: Save the progress of the files at every
+            interval.
+    """
+
+    def __init__(
+        self, files: list[IndexJobFile], session_manager: DatabaseSessionManager
+    ):
+        """Initialize the progress of the files."""
+        self.session_manager: DatabaseSessionManager = session_manager
+        self._file_ids: dict[tuple[int, str], int] = {
+            (file.job_id, file.resource_id): file.id for file in files
+        }
+        self._running: dict[int, IndexJobFile] = {file.id: file for file in files}
+        self._outcomes: list[dict[str, Any]] = []
+        self._counters: defaultdict[int, Counter[IndexFileStatus]] = defaultdict(
+            Counter
+        )
+        self._indexed_bytes: Counter[int] = Counter()
+
+    def reporter(self, job_id: int) -> FileReport:
+        """Get the function reporting the files of a job.
+
+        Arguments:
+            job_id: The ID of the job.
+
+        Returns:
+            The function recording the outcome of a file of the job.
+        """
+
+        def report(
+            resource: DropboxFileMetadata,
+            status: IndexFileStatus,
+            error: str | None,
+        ) -> None:
+            self.record(job_id=job_id, resource=resource, status=status, error=error)
+
+        return report
+
+    def record(
+        self,
+        job_id: int,
+        resource: DropboxFileMetadata,
+        status: IndexFileStatus,
+        error: str | None,
+    ) -> None:
+        """Record the outcome of a file.
+
+        Arguments:
+            job_id: The ID of the job of the file.
+            resource: The file metadata.
+            status: The status of the file.
+            error: The error of a failed file, or the reason a file was
+                skipped.
+
+        Returns:
+            None.
+        """
+        file_id: int | None = self._file_ids.get((job_id, resource.id))
+        if file_id is None or self._running.pop(file_id, None) is None:
+            return
+        self._outcomes.append({"id": file_id, "status": status, "error": error})
+        self._counters[job_id][status] += 1
+        if status == IndexFileStatus.INDEXED:
+            self._indexed_bytes[job_id] += resource.size or 0
+
+    def fail_unreported(self, job_id: int, error: str) -> None:
+        """Record the files of a job without outcome as failed.
+
+        Arguments:
+            job_id: The ID of the job.
+            error: The error of the files.
+
+        Returns:
+            None.
+        """
+        for file in [file for file in self._running.values() if file.job_id == job_id]:
+            self.record(
+                job_id=job_id,
+                resource=to_metadata(file),
+                status=IndexFileStatus.FAILED,
+                error=error,
+            )
+
+    async def flush(self) -> None:
+        """Save the progress of the files.
+
+        The outcomes are saved with the counters of their jobs in one
+        transaction.
+
+        Returns:
+            None.
+        """
+        outcomes: list[dict[str, Any]] = self._outcomes
+        counters: dict[int, Counter[IndexFileStatus]] = dict(self._counters)
+        indexed_bytes: Counter[int] = self._indexed_bytes
+        self._outcomes = []
+        self._counters = defaultdict(Counter)
+        self._indexed_bytes = Counter()
+
+        async with self.session_manager.get_session() as session:
+            if outcomes:
+                await session.execute(update(IndexJobFile), outcomes)
+            for job_id, counter in counters.items():
+                await session.execute(
+                    update(IndexJob)
+                    .where(IndexJob.id == job_id)
+                    .values(
+                        indexed_files=IndexJob.indexed_files
+                        + counter[IndexFileStatus.INDEXED],
+                        unchanged_files=IndexJob.unchanged_files
+                        + counter[IndexFileStatus.UNCHANGED],
+                        skipped_files=IndexJob.skipped_files
+                        + counter[IndexFileStatus.SKIPPED],
+                        failed_files=IndexJob.failed_files
+                        + counter[IndexFileStatus.FAILED],
+                        indexed_bytes=IndexJob.indexed_bytes + indexed_bytes[job_id],
+                        updated_at=func.now(),
+                    )
+                )
+            if self._running:
+                await session.execute(
+                    update(IndexJobFile)
+                    .where(IndexJobFile.id.in_(self._running))
+                    .values(updated_at=func.now())
+                )
+
+    async def flush_periodically(self, interval: float) -> None:
+        """Save the progress of the files at every interval.
+
+        Arguments:
+            interval: Seconds between two saves.
+
+        Returns:
+            None.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Progress of index job files not saved.")
+
+
+def to_metadata(file: IndexJobFile) -> DropboxFileMetadata:
+    """Convert a job file to the metadata of the listed file.
+
+    Arguments:
+        file: The job file.
+
+    Returns:
+        The file metadata.
+    """
+    return DropboxFileMetadata(
+        id=file.resource_id,
+        name=file.name,
+        type=ResourceType.FILE,
+        path=file.path,
+        rev=file.rev,
+        content_hash=file.content_hash,
+        size=file.size,
+    )
+
+
+class IndexJobService(Service):
+    """Index job operations.
+
+    The index requests are saved as jobs and run in the background by the
+    workers. A worker claims a pending job to list its resource and queues
+    its files while listing. The queued files are claimed in batches by
+    any worker, so the files of a job are indexed by all the workers.
+    The rows are claimed with `FOR UPDATE SKIP LOCKED`, so the workers
+    never wait for each other nor claim the same work.
+
+    Attributes:
+        resource_index_service: The service indexing the resources.
+        session_manager: The manager of the sessions of the workers.
+
+    Methods:
+        create_job: Create an index job for a resource of a user.
+        get_job: Get an index job of a user.
+        list_next_job: Claim the next pending index job and queue its files.
+        index_next_files: Claim and index the next batch of queued files.
+        run_jobs_periodically: Run the pending index jobs as they come.
+    """
+
+    resource_index_service: ResourceIndexService = Field(
+        default_factory=ResourceIndexService
+    )
+    session_manager: InstanceOf[DatabaseSessionManager] = Field(
+        default_factory=lambda: database_session_manager
+    )
+
+    @validate_call
+    async def create_job(
+        self,
+        user_teams_id: str,
+        session: InstanceOf[AsyncSession],
+        resource_id: str,
+    ) -> IndexJobSchema:
+        """Create an index job for a resource of a user.
+
+        Arguments:
+            user_teams_id: The teams id of the user.
+            session: Database session.
+            resource_id: The ID of the resource to index.
+
+        Returns:
+            The pending job.
+
+        Raises:
+            NotFoundError: If the user is not found.
+        """
+        user_id: int = await get_user_id_from_teams_id(
+            teams_id=user_teams_id, session=session
+        )
+        job: IndexJob = IndexJob(  # type: ignore
+            user_id=user_id,
+            resource_id=resource_id,
+            status=IndexJobStatus.PENDING,
+        )
+        session.add(job)
+        await session.flush()
+        await session.refresh(job)
+        return IndexJobSchema.model_validate(job)
+
+    @validate_call
+    async def get_job(
+        self,
+        user_teams_id: str,
+        session: InstanceOf[AsyncSession],
+        job_id: int,
+    ) -> IndexJobSchema:
+        """Get an index job of a user.
+
+        Arguments:
+            user_teams_id: The teams id of the user.
+            session: Database session.
+            job_id: The ID of the job.
+
+        Returns:
+            The job with its progress, failed and skipped files.
+
+        Raises:
+            NotFoundError: If the user or the job is not found.
+        """
+        user_id: int = await get_user_id_from_teams_id(
+            teams_id=user_teams_id, session=session
+        )
+        job: IndexJob | None = (
+            await session.execute(
+                select(IndexJob)
+                .filter(IndexJob.id == job_id)
+                .filter(IndexJob.user_id == user_id)
+            )
+        ).scalar_one_or_none()
+        if job is None:
+            raise NotFoundError("Index job")
+
+        pending_files: int = (
+            await session.execute(
+                select(func.count(IndexJobFile.id))
+                .filter(IndexJobFile.job_id == job_id)
+                .filter(
+                    IndexJobFile.status.in_(
+                        [IndexFileStatus.PENDING, IndexFileStatus.RUNNING]
+                    )
+                )
+            )
+        ).scalar_one()
+        reported_files: list[IndexJobFileSchema] = [
+            IndexJobFileSchema.model_validate(file)
+            for file in (
+                await session.execute(
+                    select(IndexJobFile)
+                    .filter(IndexJobFile.job_id == job_id)
+                    .filter(
+                        IndexJobFile.status.in_(
+                            [IndexFileStatus.FAILED, IndexFileStatus.SKIPPED]
+                        )
+                    )
+                    .order_by(IndexJobFile.id)
+                )
+            ).scalars()
+        ]
+        job_schema: IndexJobSchema = IndexJobSchema.model_validate(job)
+        job_schema.pending_files = pending_files
+        job_schema.failures = [
+            file for file in reported_files if file.status == IndexFileStatus.FAILED
+        ]
+        job_schema.skipped = [
+            file for file in reported_files if file.status == IndexFileStatus.SKIPPED
+        ]
+        return job_schema
+
+    async def list_next_job(self) -> bool:
+        """Claim the next pending index job and queue its files.
+
+        The files of every listing page are queued as soon as the page is
+        fetched. A job which stops on an error is marked as failed and its
+        queued files are dropped.
+
+        Returns:
+            Whether a job was claimed.
+        """
+        job: IndexJob | None = await self._claim_job()
+        if job is None:
+            return False
+
+        try:
+            metadata, pages = await self.resource_index_service.list_resource(
+                user_id=job.user_id, resource_id=job.resource_id
+            )
+            cursor: str | None = None
+            async for page in pages:
+                await self._queue_files(
+                    job_id=job.id,
+                    resources=[
+                        entry
+                        for entry in page.entries
+                        if entry.type == ResourceType.FILE
+                    ],
+                )
+                cursor = page.cursor
+        except Exception as error:
+            logger.exception("Index job %s failed.", job.id)
+            async with self.session_manager.get_session() as session:
+                await session.execute(
+                    delete(IndexJobFile)
+                    .where(IndexJobFile.job_id == job.id)
+                    .where(IndexJobFile.status == IndexFileStatus.PENDING)
+                )
+                await session.execute(
+                    update(IndexJob)
+                    .where(IndexJob.id == job.id)
+                    .values(
+                        status=IndexJobStatus.FAILED,
+                        error=str(error),
+                        finished_at=func.now(),
+                    )
+                )
+            return True
+
+        is_folder: bool = metadata.type == ResourceType.FOLDER
+        async with self.session_manager.get_session() as session:
+            await session.execute(
+                update(IndexJob)
+                .where(IndexJob.id == job.id)
+                .values(
+                    listed_at=func.now(),
+                    folder_id=metadata.id if is_folder else None,
+                    cursor=cursor if is_folder else None,
+                )
+            )
+        await self._finish_job_if_done(job_id=job.id)
+        return True
+
+    async def index_next_files(self) -> bool:
+        """Claim and index the next batch of queued files.
+
+        A running file without progress for `JOB_STALE_AFTER` seconds is
+        considered abandoned by its worker and is claimed again. The files
+        of the different jobs of the batch are indexed concurrently.
+
+        Returns:
+            Whether files were claimed.
+        """
+        files: list[IndexJobFile] = await self._claim_files()
+        if not files:
+            return False
+
+        files_by_job: defaultdict[int, list[IndexJobFile]] = defaultdict(list)
+        for file in files:
+            files_by_job[file.job_id].append(file)
+        user_ids: dict[int, int] = await self._get_user_ids(job_ids=list(files_by_job))
+
+        progress: IndexJobProgress = IndexJobProgress(
+            files=files, session_manager=self.session_manager
+        )
+        progress_saving = asyncio.create_task(
+            progress.flush_periodically(
+                interval=configuration.INDEX.JOB_PROGRESS_INTERVAL
+            )
+        )
+        try:
+            await asyncio.gather(
+                *[
+                    self._index_job_files(
+                        job_id=job_id,
+                        user_id=user_ids[job_id],
+                        files=job_files,
+                        progress=progress,
+                    )
+                    for job_id, job_files in files_by_job.items()
+                ]
+            )
+        finally:
+            progress_saving.cancel()
+            with suppress(asyncio.CancelledError):
+                await progress_saving
+        await progress.flush()
+
+        for job_id in files_by_job:
+            await self._finish_job_if_done(job_id=job_id)
+        return True
+
+    async def run_jobs_periodically(self, poll_interval: float) -> None:
+        """Run the pending index jobs as they come.
+
+        The jobs are listed and the queued files are indexed concurrently,
+        so the files of a job are indexed while its listing goes on.
+
+        Arguments:
+            poll_interval: Seconds between two checks when there is no
+                pending work.
+
+        Returns:
+            None.
+        """
+        await asyncio.gather(
+            self._run_periodically(self.list_next_job, poll_interval=poll_interval),
+            self._run_periodically(self.index_next_files, poll_interval=poll_interval),
+        )
+
+    @staticmethod
+    async def _run_periodically(
+        step: Callable[[], Awaitable[bool]], poll_interval: float
+    ) -> None:
+        """Run a step of the workers as long as it finds work.
+
+        Arguments:
+            step: The step, returning whether it found work.
+            poll_interval: Seconds between two runs which found no work.
+
+        Returns:
+            None.
+        """
+        while True:
+            try:
+                found_work: bool = await step()
+            except Exception:
+                logger.exception("Index job step could not be run.")
+                found_work = False
+            if not found_work:
+                await asyncio.sleep(poll_interval)
+
+    async def _claim_job(self) -> IndexJob | None:
+        """Claim the oldest pending or abandoned index job to list.
+
+        The job row is locked while it is claimed, and the rows locked by
+        other workers are skipped, so a job is claimed by a single worker.
+        The listing of an abandoned job starts over, but its files are
+        kept, since other workers may still be indexing them. Only its files
+        whose own claim is stale are queued again, and its counters are
+        recomputed from the processed files, as the live workers add their
+        files to the counters once they are done.
+
+        Returns:
+            The claimed job, or None if there is no job to list.
+        """
+        stale_before: datetime = datetime.now(tz=timezone.utc) - timedelta(
+            seconds=configuration.INDEX.JOB_STALE_AFTER
+        )
+        async with self.session_manager.get_session() as session:
+            job: IndexJob | None = (
+                await session.execute(
+                    select(IndexJob)
+                    .filter(
+                        or_(
+                            IndexJob.status == IndexJobStatus.PENDING,
+                            and_(
+                                IndexJob.status == IndexJobStatus.RUNNING,
+                                IndexJob.listed_at.is_(None),
+                                IndexJob.updated_at < stale_before,
+                            ),
+                        )
+                    )
+                    .order_by(IndexJob.created_at)
+                    .limit(1)
+                    .with_for_update(skip_locked=True)
+                )
+            ).scalar_one_or_none()
+            if job is None:
+                return None
+
+            await session.execute(
+                update(IndexJobFile)
+                .where(IndexJobFile.job_id == job.id)
+                .where(IndexJobFile.status == IndexFileStatus.RUNNING)
+                .where(IndexJobFile.updated_at < stale_before)
+                .values(status=IndexFileStatus.PENDING)
+            )
+            file_counts: Counter[IndexFileStatus] = Counter()
+            indexed_bytes: int = 0
+            for status, count, size in await session.execute(
+                select(
+                    IndexJobFile.status,
+                    func.count(IndexJobFile.id),
+                    func.sum(IndexJobFile.size),
+                )
+                .where(IndexJobFile.job_id == job.id)
+                .group_by(IndexJobFile.status)
+            ):
+                file_counts[status] = count
+                if status == IndexFileStatus.INDEXED:
+                    indexed_bytes = size or 0
+            job.status = IndexJobStatus.RUNNING
+            job.error = None
+            job.started_at = datetime.now(tz=timezone.utc)
+            job.finished_at = None
+            job.indexed_files = file_counts[IndexFileStatus.INDEXED]
+            job.unchanged_files = file_counts[IndexFileStatus.UNCHANGED]
+            job.skipped_files = file_counts[IndexFileStatus.SKIPPED]
+            job.failed_files = file_counts[IndexFileStatus.FAILED]
+            job.indexed_bytes = indexed_bytes
+        return job
+
+    async def _claim_files(self) -> list[IndexJobFile]:
+        """Claim the oldest batch of queued or abandoned files.
+
+        Returns:
+            The claimed files, at most `JOB_FILE_BATCH_SIZE`.
+        """
+        stale_before: datetime = datetime.now(tz=timezone.utc) - timedelta(
+            seconds=configuration.INDEX.JOB_STALE_AFTER
+        )
+        async with self.session_manager.get_session() as session:
+            files: list[IndexJobFile] = list(
+                (
+                    await session.execute(
+                        select(IndexJobFile)
+                        .filter(
+                            or_(
+                                IndexJobFile.status == IndexFileStatus.PENDING,
+                                and_(
+                                    IndexJobFile.status == IndexFileStatus.RUNNING,
+                                    IndexJobFile.updated_at < stale_before,
+                                ),
+                            )
+                        )
+                        .order_by(IndexJobFile.id)
+                        .limit(configuration.INDEX.JOB_FILE_BATCH_SIZE)
+                        .with_for_update(skip_locked=True)
+                    )
+                ).scalars()
+            )
+            for file in files:
+                file.status = IndexFileStatus.RUNNING
+        return files
+
+    async def _get_user_ids(self, job_ids: list[int]) -> dict[int, int]:
+        """Get the users of index jobs.
+
+        Arguments:
+            job_ids: The IDs of the jobs.
+
+        Returns:
+            The IDs of the users by job ID.
+        """
+        async with self.session_manager.get_session() as session:
+            rows = await session.execute(
+                select(IndexJob.id, IndexJob.user_id).filter(IndexJob.id.in_(job_ids))
+            )
+            return {job_id: user_id for job_id, user_id in rows}
+
+    async def _queue_files(
+        self, job_id: int, resources: list[DropboxFileMetadata]
+    ) -> None:
+        """Queue listed files of a job to index.
+
+        The files are committed at once, so the workers can claim them while
+        the listing goes on. The files already queued by an abandoned
+        listing of the job are not queued again.
+
+        Arguments:
+            job_id: The ID of the job.
+            resources: The metadata of the files.
+
+        Returns:
+            None.
+        """
+        async with self.session_manager.get_session() as session:
+            if resources:
+                queued_ids: set[str] = set(
+                    (
+                        await session.execute(
+                            select(IndexJobFile.resource_id)
+                            .where(IndexJobFile.job_id == job_id)
+                            .where(
+                                IndexJobFile.resource_id
+                                == any_(
+                                    bindparam(
+                                        "resource_ids",
+                                        [resource.id for resource in resources],
+                                        type_=ARRAY(String),
+                                    )
+                                )
+                            )
+                        )
+                    ).scalars()
+                )
+                resources = [
+                    resource for resource in resources if resource.id not in queued_ids
+                ]
+            if resources:
+                await session.execute(
+                    insert(IndexJobFile),
+                    [
+                        {
+                            "job_id": job_id,
+                            "resource_id": resource.id,
+                            "name": resource.name,
+                            "path": resource.path,
+                            "rev": resource.rev,
+                            "content_hash": resource.content_hash,
+                            "size": resource.size,
+                            "status": IndexFileStatus.PENDING,
+                        }
+                        for resource in resources
+                    ],
+                )
+            await session.execute(
+                update(IndexJob)
+                .where(IndexJob.id == job_id)
+                .values(updated_at=func.now())
+            )
+
+    async def _index_job_files(
+        self,
+        job_id: int,
+        user_id: int,
+        files: list[IndexJobFile],
+        progress: IndexJobProgress,
+    ) -> None:
+        """Index the claimed files of a job.
+
+        If the files cannot be indexed at all, they are recorded as failed.
+
+        Arguments:
+            job_id: The ID of the job.
+            user_id: The ID of the user of the job.
+            files: The claimed files of the job.
+            progress: The progress of the claimed files.
+
+        Returns:
+            None.
+        """
+        try:
+            await self.resource_index_service.index_files(
+                user_id=user_id,
+                resources=[to_metadata(file) for file in files],
+                report=progress.reporter(job_id=job_id),
+            )
+        except Exception as error:
+            logger.exception("Files of index job %s could not be indexed.", job_id)
+            progress.fail_unreported(job_id=job_id, error=str(error))
+
+    async def _finish_job_if_done(self, job_id: int) -> None:
+        """Mark an index job as succeeded if all its files are processed.
+
+        The job is only updated while it is running, so a single worker
+        finishes it. The listing cursor of a folder is saved only if none
+        of its files failed, so the failed files are listed again at the
+        next indexing. The skipped files do not prevent it, they would be
+        skipped again.
+
+        Arguments:
+            job_id: The ID of the job.
+
+        Returns:
+            None.
+        """
+        async with self.session_manager.get_session() as session:
+            job: IndexJob | None = (
+                await session.execute(
+                    update(IndexJob)
+                    .where(IndexJob.id == job_id)
+                    .where(IndexJob.status == IndexJobStatus.RUNNING)
+                    .where(IndexJob.listed_at.is_not(None))
+                    .where(
+                        ~exists().where(
+                            IndexJobFile.job_id == job_id,
+                            IndexJobFile.status.in_(
+                                [IndexFileStatus.PENDING, IndexFileStatus.RUNNING]
+                            ),
+                        )
+                    )
+                    .values(status=IndexJobStatus.SUCCEEDED, finished_at=func.now())
+                    .returning(IndexJob)
+                )
+            ).scalar_one_or_none()
+            if job and job.folder_id and job.cursor and not job.failed_files:
+                await self.resource_index_service.save_cursor(
+                    user_id=job.user_id,
+                    resource_id=job.folder_id,
+                    cursor=job.cursor,
+                    session=session,
+                )
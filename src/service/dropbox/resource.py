@@ -1,6 +1,5 @@
 """Dropbox resource service module."""
 
-from aiohttp import ClientSession
 from pydantic import InstanceOf, validate_call
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -134,7 +133,7 @@ class DropboxResourceService(DropboxService):
         }
 
         # Validate whether the resource ID is file or folder.
-        async with ClientSession() as client_session, client_session.post(
+        async with self.dropbox_handler.http_client.get_session().post(
             "https://content.dropboxapi.com/2/files/download",
             headers=headers,
         ) as resp_download:
@@ -1,60 +1,125 @@
 """File index service module."""
 
 import asyncio
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import AsyncIterator, Callable
 
-from pydantic import InstanceOf, validate_call
-from sqlalchemy import select
+from pydantic import Field, InstanceOf, validate_call
+from sqlalchemy import String, any_, bindparam, func, or_, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as psql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from tokenizers import Tokenizer
 
-from src.core import NotFoundError
-from src.models.indexed_resource import IndexedResource
-from src.schemas.dropbox import DropboxFileMetadata, ResourceType
+from src.core import NotFoundError, configuration
+from src.database.base_vector_db import SHARED_TENANT
+from src.database.batch_writer import VectorBatchWriter
+from src.database.session import DatabaseSessionManager, database_session_manager
+from src.models import DropboxCursor, IndexedResource
+from src.schemas.dropbox import (
+    DropboxFileMetadata,
+    DropboxFolderListing,
+    ResourceType,
+)
+from src.schemas.index_job import IndexFileStatus
 
-from ..parser import Parser, ParserFactory
-from ..utils import get_user_id_from_teams_id
+from ..cache import QUERY_CHANNEL, QueryCache, query_cache
+from ..chunk_cache import ChunkCache, chunk_cache
+from ..chunker import (
+    chunk_segments,
+    count_pdf_pages,
+    get_chunks_version,
+    parse_and_chunk,
+    parse_pdf_pages,
+)
+from ..limiter import AdaptiveLimiter, LimiterRegistry, download_limiters
+from ..parser import ParserFactory
+from ..process_pool import ProcessPool, process_pool
+from ..shared_content import SharedContents, shared_contents
+from ..task_group import BoundedTaskGroup
 from .service import DropboxService
 
+FileReport = Callable[[DropboxFileMetadata, IndexFileStatus, str | None], None]
+
 
 class ResourceIndexService(DropboxService):
     """File index operations.
 
     This class is responsible for indexing the files of the Dropbox API.
+    The listing of a resource and the indexing of its files are separate
+    steps, so the files can be indexed by other workers while the listing
+    goes on.
+
+    The operations take short-lived sessions of their own, so no database
+    connection is held while the files are downloaded and parsed.
+
+    The objects of the files with a content hash are inserted once for all
+    the users in the shared tenant, the users only keep a reference to the
+    content hash in their indexed files.
+
+    Attributes:
+        process_pool: The pool of processes parsing and chunking the files.
+        chunk_cache: The cache of the chunks of the parsed files by content
+            hash.
+        shared_contents: The contents whose objects are shared by the users.
+        query_cache: The cache of the query results, invalidated in every
+            process when the indexed files of a user change.
+        download_limiters: The limiters of the concurrent downloads of the
+            users.
+        session_manager: The manager of the database sessions.
 
     Methods:
-        index_resource: Index the resource of a user.
+        list_resource: List the files of a resource of a user to index.
+        index_files: Index files of a user.
+        save_cursor: Save the folder listing cursor of an indexed folder.
     """
 
-    tokenizer: InstanceOf[Tokenizer] = Tokenizer.from_pretrained(
-        "Cohere/Cohere-embed-multilingual-v3.0"
+    process_pool: InstanceOf[ProcessPool] = Field(default_factory=lambda: process_pool)
+    chunk_cache: InstanceOf[ChunkCache] = Field(default_factory=lambda: chunk_cache)
+    shared_contents: InstanceOf[SharedContents] = Field(
+        default_factory=lambda: shared_contents
+    )
+    query_cache: InstanceOf[QueryCache] = Field(default_factory=lambda: query_cache)
+    download_limiters: InstanceOf[LimiterRegistry] = Field(
+        default_factory=lambda: download_limiters
+    )
+    session_manager: InstanceOf[DatabaseSessionManager] = Field(
+        default_factory=lambda: database_session_manager
     )
 
     @validate_call
-    async def index_resource(
+    async def list_resource(
         self,
-        user_teams_id: str,
-        session: InstanceOf[AsyncSession],
+        user_id: int,
         resource_id: str,
-    ) -> None:
-        """Index resource of a user.
+    ) -> tuple[DropboxFileMetadata, AsyncIterator[DropboxFolderListing]]:
+        """List the files of a resource of a user to index.
+
+        A folder is listed in full at its first indexing. Later indexings
+        only list the changes since the cursor of the previous one. The
+        indexed files which were deleted since are removed as the pages are
+        iterated over, each page in its own transaction.
 
         Arguments:
-            user_teams_id: The teams id of the user.
-            session: Database session.
+            user_id: The ID of the user.
             resource_id: The ID of the resource.
 
         Returns:
-            None.
+            The metadata of the resource and the pages of its listing. The
+            cursor of the last page is the one to save once the files are
+            indexed.
 
         Raises:
             NotFoundError: If the resources to index is not found.
         """
-        user_id: int = await get_user_id_from_teams_id(
-            teams_id=user_teams_id, session=session
-        )
-        access_token: str = await self._get_access_token(
-            user_id=user_id, session=session
-        )
+        async with self.session_manager.get_session() as session:
+            access_token: str = await self._get_access_token(
+                user_id=user_id, session=session
+            )
 
         metadata: DropboxFileMetadata = (
             await self.dropbox_handler.get_metadata_of_resource(
@@ -62,139 +127,905 @@ class ResourceIndexService(DropboxService):
             )
         )
 
-        resources: list[DropboxFileMetadata] = []
-
-        if metadata.type == ResourceType.FILE:
-            resources.append(metadata)
-        else:
-            all_resources_from_api: list[
-                DropboxFileMetadata
-            ] = await self.dropbox_handler.get_all_resources(
-                access_token=access_token, path=resource_id, recursive=True
+        pages: AsyncIterator[DropboxFolderListing] = (
+            self._iter_folder_pages(
+                user_id=user_id,
+                access_token=access_token,
+                folder=metadata,
             )
-            for resource in all_resources_from_api:
-                if resource.type == ResourceType.FILE:
-                    resources.append(resource)
+            if metadata.type == ResourceType.FOLDER
+            else self._iter_file_page(metadata)
+        )
+        return metadata, self._remove_deleted_while_iterating(
+            user_id=user_id, pages=pages
+        )
+
+    @validate_call
+    async def index_files(
+        self,
+        user_id: int,
+        resources: list[DropboxFileMetadata],
+        report: FileReport | None = None,
+    ) -> None:
+        """Index files of a user.
+
+        The files are planned before any download: the files without a
+        parser for their type or larger than `MAX_FILE_SIZE` are reported
+        as skipped with their reason.
+
+        At most `MAX_FILES_IN_FLIGHT` files are processed at a time, and
+        their downloads, parsing and inserts have their own limits. The
+        download concurrency of the user adapts to the rate limits and the
+        server errors of Dropbox, across the index jobs of the process. The
+        outcome of every file is passed to the report function, the
+        failures of the files do not stop the indexing.
+
+        The contents of the files with a content hash are inserted in the
+        shared tenant, each once per index job and only if no user indexed
+        them before.
+
+        The indexed versions of the files are selected with one query, and
+        the new versions are saved with one upsert once the files are done,
+        along with the new name and path of the unchanged files which were
+        moved or renamed. Both run in short sessions of their own, and the
+        saved files are reported only once their new versions are
+        committed. If the save fails, the saved files are reported as
+        failed. The cached query
+        results of the user are invalidated in every process on commit.
 
+        Arguments:
+            user_id: The ID of the user.
+            resources: The metadata of the files.
+            report: The function called with the metadata, the status and
+                the error of every file.
+
+        Returns:
+            None.
+
+        Raises:
+            NotFoundError: If the Dropbox tokens of the user are not found.
+            SQLAlchemyError: If the indexed files could not be saved.
+        """
+        resources, skipped_files = self._plan_files(
+            resources=resources, max_size=configuration.INDEX.MAX_FILE_SIZE
+        )
+        if report is not None:
+            for resource, reason in skipped_files:
+                report(resource, IndexFileStatus.SKIPPED, reason)
         if not resources:
-            raise NotFoundError("Resources to index")
+            return
+
+        async with self.session_manager.get_session() as session:
+            access_token: str = await self._get_access_token(
+                user_id=user_id, session=session
+            )
+            indexed_resources: dict[
+                str, IndexedResource
+            ] = await self._get_indexed_resources(
+                user_id=user_id,
+                resource_ids=[resource.id for resource in resources],
+                session=session,
+            )
+        tenant: str = f"user_{user_id}"
+        download_limiter: AdaptiveLimiter = self.download_limiters.get(user_id)
+        indexed_files: list[DropboxFileMetadata] = []
+        moved_files: list[DropboxFileMetadata] = []
+        shared_indexings: dict[str, asyncio.Future[None]] = {}
 
-        await asyncio.gather(
-            *[
-                self._index_file(
+        async with VectorBatchWriter(
+            vector_db=self.vector_db,
+            tenant=tenant,
+            batch_size=configuration.VECTOR_DB.BATCH_SIZE,
+            flush_interval=configuration.VECTOR_DB.BATCH_FLUSH_INTERVAL,
+        ) as batch_writer, VectorBatchWriter(
+            vector_db=self.vector_db,
+            tenant=SHARED_TENANT,
+            batch_size=configuration.VECTOR_DB.BATCH_SIZE,
+            flush_interval=configuration.VECTOR_DB.BATCH_FLUSH_INTERVAL,
+        ) as shared_batch_writer, BoundedTaskGroup(
+            limit=configuration.INDEX.MAX_FILES_IN_FLIGHT
+        ) as task_group:
+            for resource in resources:
+                await task_group.spawn(
+                    self._index_and_report_file(
+                        access_token=access_token,
+                        resource=resource,
+                        indexed_resource=indexed_resources.get(resource.id),
+                        batch_writer=batch_writer,
+                        shared_batch_writer=shared_batch_writer,
+                        shared_indexings=shared_indexings,
+                        download_limiter=download_limiter,
+                        report=report,
+                        indexed_files=indexed_files,
+                        moved_files=moved_files,
+                    )
+                )
+        try:
+            async with self.session_manager.get_session() as session:
+                await self._save_indexed_resources(
                     user_id=user_id,
-                    access_token=access_token,
-                    resource=resource,
+                    resources=[*indexed_files, *moved_files],
                     session=session,
                 )
-                for resource in resources
-            ],
-            return_exceptions=True,
+                await self._notify_query_change(tenant=tenant, session=session)
+        except Exception as error:
+            if report is not None:
+                for resource in [*indexed_files, *moved_files]:
+                    report(resource, IndexFileStatus.FAILED, str(error))
+            raise
+        self.query_cache.invalidate(tenant=tenant)
+        if report is not None:
+            for resource in indexed_files:
+                report(resource, IndexFileStatus.INDEXED, None)
+            for resource in moved_files:
+                report(resource, IndexFileStatus.UNCHANGED, None)
+
+    async def _remove_deleted_while_iterating(
+        self,
+        user_id: int,
+        pages: AsyncIterator[DropboxFolderListing],
+    ) -> AsyncIterator[DropboxFolderListing]:
+        """Remove the indexed files of the deleted paths of every page.
+
+        The removals of a page are committed before the page is yielded, and
+        the cached query results of the user are then invalidated in every
+        process.
+
+        Arguments:
+            user_id: The ID of the user.
+            pages: The pages of the listing.
+
+        Yields:
+            The pages, after their deleted paths are removed.
+        """
+        tenant: str = f"user_{user_id}"
+        async for page in pages:
+            if page.deleted_paths:
+                async with self.session_manager.get_session() as session:
+                    await self._remove_deleted_resources(
+                        user_id=user_id,
+                        tenant=tenant,
+                        paths=page.deleted_paths,
+                        session=session,
+                    )
+                    await self._notify_query_change(tenant=tenant, session=session)
+                self.query_cache.invalidate(tenant=tenant)
+            yield page
+
+    @staticmethod
+    async def _iter_file_page(
+        resource: DropboxFileMetadata,
+    ) -> AsyncIterator[DropboxFolderListing]:
+        """Iterate over a single page listing one file.
+
+        Arguments:
+            resource: The file metadata.
+
+        Yields:
+            The page of the file.
+        """
+        yield DropboxFolderListing(entries=[resource], cursor="")
+
+    async def _iter_folder_pages(
+        self,
+        user_id: int,
+        access_token: str,
+        folder: DropboxFileMetadata,
+    ) -> AsyncIterator[DropboxFolderListing]:
+        """Iterate over the pages of the resources of a folder to index.
+
+        The changes since the saved cursor are listed if there is one and it
+        is still valid, else the whole folder is listed. During a whole
+        listing, the indexed files of every page are marked as listed, one
+        array parameter per page. Afterwards, the indexed files of the
+        folder which were not marked since the listing started are yielded
+        as deleted paths of a last page, so no page needs to be kept. The
+        files first indexed during the listing are not deleted.
+
+        Arguments:
+            user_id: The ID of the user.
+            access_token: The access token of the user.
+            folder: The folder metadata.
+
+        Yields:
+            The pages of the listing.
+
+        Raises:
+            NotFoundError: If the whole folder is listed and has no files.
+        """
+        async with self.session_manager.get_session() as session:
+            dropbox_cursor: DropboxCursor | None = (
+                await session.execute(
+                    select(DropboxCursor)
+                    .filter(DropboxCursor.user_id == user_id)
+                    .filter(DropboxCursor.resource_id == folder.id)
+                )
+            ).scalar_one_or_none()
+            listing_started_at: datetime = (
+                await session.execute(select(func.now()))
+            ).scalar_one()
+
+        if dropbox_cursor:
+            changes: (
+                AsyncIterator[DropboxFolderListing] | None
+            ) = await self.dropbox_handler.list_folder_changes_pages(
+                access_token=access_token,
+                cursor=dropbox_cursor.cursor,
+                limiter=self.download_limiters.get(user_id),
+            )
+            if changes is not None:
+                async for page in changes:
+                    yield page
+                return
+
+        has_files: bool = False
+        cursor: str = ""
+        async for page in await self.dropbox_handler.list_folder_pages(
+            access_token=access_token,
+            path=folder.id,
+            recursive=True,
+            limiter=self.download_limiters.get(user_id),
+        ):
+            listed_ids: list[str] = [
+                entry.id for entry in page.entries if entry.type == ResourceType.FILE
+            ]
+            if listed_ids:
+                has_files = True
+                async with self.session_manager.get_session() as session:
+                    await session.execute(
+                        update(IndexedResource)
+                        .filter(IndexedResource.user_id == user_id)
+                        .filter(
+                            IndexedResource.resource_id
+                            == any_(
+                                bindparam(
+                                    "resource_ids", listed_ids, type_=ARRAY(String)
+                                )
+                            )
+                        )
+                        .values(listed_at=func.now())
+                    )
+            cursor = page.cursor
+            yield page
+        if not has_files:
+            raise NotFoundError("Resources to index")
+
+        async with self.session_manager.get_session() as session:
+            missing_paths: list[str] = list(
+                (
+                    await session.execute(
+                        select(IndexedResource.path)
+                        .filter(IndexedResource.user_id == user_id)
+                        .filter(
+                            IndexedResource.path.startswith(
+                                f"{folder.path}/", autoescape=True
+                            )
+                        )
+                        .filter(IndexedResource.created_at < listing_started_at)
+                        .filter(
+                            or_(
+                                IndexedResource.listed_at.is_(None),
+                                IndexedResource.listed_at < listing_started_at,
+                            )
+                        )
+                    )
+                ).scalars()
+            )
+        yield DropboxFolderListing(
+            entries=[], deleted_paths=missing_paths, cursor=cursor
         )
 
     @validate_call
-    async def _index_file(
+    async def _remove_deleted_resources(
         self,
         user_id: int,
-        access_token: str,
-        resource: DropboxFileMetadata,
+        tenant: str,
+        paths: list[str],
         session: InstanceOf[AsyncSession],
     ) -> None:
-        """Index a file for a user.
+        """Remove the indexed files of deleted paths.
+
+        The indexed files under a deleted folder are removed too.
 
         Arguments:
             user_id: The ID of the user.
-            access_token: The access token of the user.
-            resource: The resource metadata.
+            tenant: The name of the tenant.
+            paths: The lowercase deleted paths.
             session: Database session.
 
         Returns:
             None.
-
-        Raises:
-            NotFoundError: If the resource is not found.
-            ValueError: If the file type is not supported.
         """
-        indexed_resource = (
+        if not paths:
+            return
+        deleted_resources = (
             await session.execute(
                 select(IndexedResource)
                 .filter(IndexedResource.user_id == user_id)
-                .filter(IndexedResource.resource_id == resource.id)
+                .filter(
+                    or_(
+                        IndexedResource.path.in_(paths),
+                        *[
+                            IndexedResource.path.startswith(f"{path}/", autoescape=True)
+                            for path in paths
+                        ],
+                    )
+                )
+            )
+        ).scalars()
+        for indexed_resource in deleted_resources:
+            await self.vector_db.delete_resource_objects(
+                tenant=tenant, resource_id=indexed_resource.resource_id
             )
-        ).fetchone()
+            await session.delete(indexed_resource)
 
-        if indexed_resource:
-            return
+    @staticmethod
+    async def _notify_query_change(tenant: str, session: AsyncSession) -> None:
+        """Notify the processes of a change of the objects of a tenant.
 
-        content: str = await self._fetch_and_parse_content(
-            access_token=access_token, resource=resource
+        The notification is delivered on commit, so the processes drop the
+        cached results of the tenant once the change is visible.
+
+        Arguments:
+            tenant: The name of the tenant.
+            session: Database session.
+
+        Returns:
+            None.
+        """
+        await session.execute(select(func.pg_notify(QUERY_CHANNEL, tenant)))
+
+    @validate_call
+    async def save_cursor(
+        self,
+        user_id: int,
+        resource_id: str,
+        cursor: str,
+        session: InstanceOf[AsyncSession],
+    ) -> None:
+        """Save the folder listing cursor of an indexed folder.
+
+        Arguments:
+            user_id: The ID of the user.
+            resource_id: The ID of the folder.
+            cursor: The cursor of the listing.
+            session: Database session.
+
+        Returns:
+            None.
+        """
+        await session.execute(
+            psql_insert(DropboxCursor)
+            .values(user_id=user_id, resource_id=resource_id, cursor=cursor)
+            .on_conflict_do_update(
+                index_elements=[DropboxCursor.user_id, DropboxCursor.resource_id],
+                set_={"cursor": cursor, "updated_at": func.now()},
+            )
         )
 
-        chunks: list[str] = self.chunk_text_with_overlap(text=content)
+    async def _index_and_report_file(
+        self,
+        access_token: str,
+        resource: DropboxFileMetadata,
+        indexed_resource: IndexedResource | None,
+        batch_writer: VectorBatchWriter,
+        shared_batch_writer: VectorBatchWriter,
+        shared_indexings: dict[str, asyncio.Future[None]],
+        download_limiter: AdaptiveLimiter,
+        report: FileReport | None,
+        indexed_files: list[DropboxFileMetadata],
+        moved_files: list[DropboxFileMetadata],
+    ) -> None:
+        """Index a file for a user and report its outcome.
 
-        self.vector_db.batch_insert_objects(
-            collection_name=f"user_{user_id}",
-            chunks=chunks,
+        An indexed file, or an unchanged file which was moved or renamed, is
+        only collected, it is reported once its new version is saved.
+
+        Arguments:
+            access_token: The access token of the user.
+            resource: The resource metadata.
+            indexed_resource: The indexed version of the file, if any.
+            batch_writer: The batch writer of the index job.
+            shared_batch_writer: The batch writer of the shared tenant.
+            shared_indexings: The indexings of the shared contents of the
+                index job by content hash.
+            download_limiter: The limiter of the concurrent downloads of the
+                user.
+            report: The function called with the outcome of the file.
+            indexed_files: The list collecting the indexed files.
+            moved_files: The list collecting the unchanged files whose name
+                or path changed.
+
+        Returns:
+            None.
+
+        Raises:
+            Exception: The error of a failed file, after it is reported.
+        """
+        try:
+            file_status: IndexFileStatus = await self._index_file(
+                access_token=access_token,
+                resource=resource,
+                indexed_resource=indexed_resource,
+                batch_writer=batch_writer,
+                shared_batch_writer=shared_batch_writer,
+                shared_indexings=shared_indexings,
+                download_limiter=download_limiter,
+            )
+        except Exception as error:
+            if report is not None:
+                report(resource, IndexFileStatus.FAILED, str(error))
+            raise
+        if file_status == IndexFileStatus.INDEXED:
+            indexed_files.append(resource)
+        elif indexed_resource and self._is_moved(
+            indexed_resource=indexed_resource, resource=resource
+        ):
+            moved_files.append(resource)
+        elif report is not None:
+            report(resource, file_status, None)
+
+    @validate_call
+    async def _index_file(
+        self,
+        access_token: str,
+        resource: DropboxFileMetadata,
+        indexed_resource: InstanceOf[IndexedResource] | None,
+        batch_writer: InstanceOf[VectorBatchWriter],
+        shared_batch_writer: InstanceOf[VectorBatchWriter],
+        shared_indexings: InstanceOf[dict],
+        download_limiter: InstanceOf[AdaptiveLimiter],
+    ) -> IndexFileStatus:
+        """Index a file for a user.
+
+        An indexed file is skipped without downloading it if it has not
+        changed since. A file with a content hash is indexed in the shared
+        tenant, unless its content is already indexed there for any user.
+        A file without one is indexed in the tenant of the user, and a
+        content parsed before is not downloaded, its cached chunks are
+        inserted. The old objects of a changed file in the tenant of the
+        user are removed. The caller saves the new version of the file once
+        this returns, so it is marked as indexed only after its objects are
+        inserted.
+
+        Arguments:
+            access_token: The access token of the user.
+            resource: The resource metadata.
+            indexed_resource: The indexed version of the file, if any.
+            batch_writer: The batch writer of the index job.
+            shared_batch_writer: The batch writer of the shared tenant.
+            shared_indexings: The indexings of the shared contents of the
+                index job by content hash.
+            download_limiter: The limiter of the concurrent downloads of the
+                user.
+
+        Returns:
+            Whether the file was indexed or skipped as unchanged.
+
+        Raises:
+            NotFoundError: If the resource is not found.
+            ValueError: If the file type is not supported.
+            RuntimeError: If some objects of the file could not be inserted.
+            TooManyRequestsError: If the download is still rate limited after
+                the retries.
+            ServiceUnavailableError: If the download still fails with a
+                server error after the retries.
+        """
+        if indexed_resource and self._is_unchanged(
+            indexed_resource=indexed_resource, resource=resource
+        ):
+            return IndexFileStatus.UNCHANGED
+
+        if resource.content_hash:
+            await self._index_shared_content(
+                access_token=access_token,
+                resource=resource,
+                shared_batch_writer=shared_batch_writer,
+                shared_indexings=shared_indexings,
+                download_limiter=download_limiter,
+            )
+            if indexed_resource:
+                await self.vector_db.delete_resource_objects(
+                    tenant=batch_writer.tenant, resource_id=resource.id
+                )
+            return IndexFileStatus.INDEXED
+
+        chunks: list[str] = await self._get_chunks(
+            access_token=access_token,
             resource=resource,
+            download_limiter=download_limiter,
         )
 
-        session.add(
-            IndexedResource(  # type: ignore
-                user_id=user_id,
-                resource_id=resource.id,
+        if indexed_resource:
+            await self.vector_db.delete_resource_objects(
+                tenant=batch_writer.tenant, resource_id=resource.id
+            )
+        await batch_writer.write(chunks=chunks, resource=resource)
+        return IndexFileStatus.INDEXED
+
+    async def _index_shared_content(
+        self,
+        access_token: str,
+        resource: DropboxFileMetadata,
+        shared_batch_writer: VectorBatchWriter,
+        shared_indexings: dict[str, asyncio.Future[None]],
+        download_limiter: AdaptiveLimiter,
+    ) -> None:
+        """Index the content of a file in the shared tenant once.
+
+        The files of an index job with the same content wait for a single
+        indexing of it.
+
+        Arguments:
+            access_token: The access token of the user.
+            resource: The resource metadata, with a content hash.
+            shared_batch_writer: The batch writer of the shared tenant.
+            shared_indexings: The indexings of the shared contents of the
+                index job by content hash.
+            download_limiter: The limiter of the concurrent downloads of the
+                user.
+
+        Returns:
+            None.
+
+        Raises:
+            NotFoundError: If the resource is not found.
+            ValueError: If the file type is not supported.
+            RuntimeError: If some objects of the content could not be
+                inserted.
+            TooManyRequestsError: If the download is still rate limited after
+                the retries.
+            ServiceUnavailableError: If the download still fails with a
+                server error after the retries.
+        """
+        content_hash: str = resource.content_hash
+        indexing: asyncio.Future[None] | None = shared_indexings.get(content_hash)
+        if indexing is None:
+            indexing = asyncio.ensure_future(
+                self._insert_shared_content(
+                    access_token=access_token,
+                    resource=resource,
+                    shared_batch_writer=shared_batch_writer,
+                    download_limiter=download_limiter,
+                )
             )
+            shared_indexings[content_hash] = indexing
+        await asyncio.shield(indexing)
+
+    async def _insert_shared_content(
+        self,
+        access_token: str,
+        resource: DropboxFileMetadata,
+        shared_batch_writer: VectorBatchWriter,
+        download_limiter: AdaptiveLimiter,
+    ) -> None:
+        """Insert the objects of a content in the shared tenant if missing.
+
+        A content already inserted for any user is neither downloaded nor
+        embedded again. The objects of a content have the content hash as
+        their resource ID, and no name nor path since they are those of the
+        file of every user. Concurrent inserts of the same content by other
+        processes insert the same objects, as their UUIDs are derived from
+        the content.
+
+        Arguments:
+            access_token: The access token of the user.
+            resource: The resource metadata, with a content hash.
+            shared_batch_writer: The batch writer of the shared tenant.
+            download_limiter: The limiter of the concurrent downloads of the
+                user.
+
+        Returns:
+            None.
+        """
+        content_hash: str = resource.content_hash
+        if await self.shared_contents.touch(content_hash=content_hash):
+            return
+
+        chunks: list[str] = await self._get_chunks(
+            access_token=access_token,
+            resource=resource,
+            download_limiter=download_limiter,
+        )
+        await shared_batch_writer.write(
+            chunks=chunks,
+            resource=resource.model_copy(
+                update={"id": content_hash, "name": "", "path": ""}
+            ),
         )
+        await self.shared_contents.save(content_hash=content_hash)
 
-    @validate_call
-    async def _fetch_and_parse_content(
-        self, access_token: str, resource: DropboxFileMetadata
-    ) -> str:
-        """Fetch and parse the content of a file.
+    async def _get_chunks(
+        self,
+        access_token: str,
+        resource: DropboxFileMetadata,
+        download_limiter: AdaptiveLimiter,
+    ) -> list[str]:
+        """Get the chunks of a file, from the cache or by parsing it.
+
+        The chunks are cached by the content hash of the file and the
+        version of the parser and the chunker, so a content already parsed
+        for any user is neither downloaded nor parsed again. A file without
+        a content hash is always parsed.
 
         Arguments:
             access_token: The access token of the user.
             resource: The resource metadata.
+            download_limiter: The limiter of the concurrent downloads of the
+                user.
+
+        Returns:
+            The list of chunks.
+
+        Raises:
+            NotFoundError: If the resource is not found.
+            ValueError: If the file type is not supported.
+            TooManyRequestsError: If the download is still rate limited after
+                the retries.
+            ServiceUnavailableError: If the download still fails with a
+                server error after the retries.
+        """
+        file_extension: str = self._get_file_extension(resource)
+        version: str = get_chunks_version(file_extension)
+        if resource.content_hash:
+            cached_chunks: list[str] | None = await self.chunk_cache.get(
+                content_hash=resource.content_hash, version=version
+            )
+            if cached_chunks is not None:
+                return cached_chunks
+
+        content: bytes = await download_limiter.call(
+            partial(
+                self.dropbox_handler.fetch_pdf_file_content,
+                access_token=access_token,
+                path=resource.id,
+            ),
+            max_retries=configuration.INDEX.DOWNLOAD_MAX_RETRIES,
+        )
+        chunks: list[str] = await self._parse_and_chunk(
+            content=content, file_extension=file_extension
+        )
+        if resource.content_hash:
+            await self.chunk_cache.set(
+                content_hash=resource.content_hash, version=version, chunks=chunks
+            )
+        return chunks
+
+    async def _parse_and_chunk(self, content: bytes, file_extension: str) -> list[str]:
+        """Parse and chunk the content of a file in the worker processes.
+
+        The page ranges of a PDF file of at least `PDF_PARALLEL_MIN_SIZE`
+        bytes are parsed in parallel, `PDF_PAGES_PER_TASK` pages per worker
+        process, and their pages are chunked together afterwards. The
+        content is written once to a temporary file read by the worker
+        processes, instead of being pickled for every range. The other files
+        are parsed and chunked by a single worker process.
+
+        Arguments:
+            content: The content of the file.
+            file_extension: The lowercase extension of the file.
 
         Returns:
-            The content of the file.
+            The list of chunks.
 
         Raises:
             ValueError: If the file type is not supported.
         """
-        content: bytes = await self.dropbox_handler.fetch_pdf_file_content(
-            access_token=access_token, path=resource.id
+        if (
+            file_extension != "pdf"
+            or len(content) < configuration.INDEX.PDF_PARALLEL_MIN_SIZE
+        ):
+            return await self.process_pool.run(
+                parse_and_chunk, content=content, file_extension=file_extension
+            )
+
+        pages_per_task: int = configuration.INDEX.PDF_PAGES_PER_TASK
+        async with self._temporary_file(content=content) as path:
+            page_count: int = await self.process_pool.run(count_pdf_pages, path=path)
+            page_ranges: list[list[str]] = await asyncio.gather(
+                *(
+                    self.process_pool.run(
+                        parse_pdf_pages,
+                        path=path,
+                        start=start,
+                        stop=min(start + pages_per_task, page_count),
+                    )
+                    for start in range(0, page_count, pages_per_task)
+                )
+            )
+        return await self.process_pool.run(
+            chunk_segments, segments=[page for pages in page_ranges for page in pages]
         )
-        file_extension: str = resource.name.split(".")[-1]
+
+    @staticmethod
+    @asynccontextmanager
+    async def _temporary_file(content: bytes) -> AsyncIterator[str]:
+        """Write a content to a temporary file deleted on exit.
+
+        Arguments:
+            content: The content of the file.
+
+        Yields:
+            The path of the file.
+        """
+        descriptor, path = tempfile.mkstemp(suffix=".pdf")
+        os.close(descriptor)
         try:
-            parser: Parser = ParserFactory.create_parser(file_extension)
-            return parser.parse(content)
-        except ValueError as error:
-            raise ValueError(f"Unsupported file type: {file_extension}") from error
+            await asyncio.to_thread(Path(path).write_bytes, content)
+            yield path
+        finally:
+            os.remove(path)
 
     @validate_call
-    def chunk_text_with_overlap(
-        self, text: str, max_tokens: int = 256, overlap: int = 50
-    ) -> list[str]:
-        """Chunk the text with overlap.
+    async def _get_indexed_resources(
+        self,
+        user_id: int,
+        resource_ids: list[str],
+        session: InstanceOf[AsyncSession],
+    ) -> dict[str, IndexedResource]:
+        """Get the indexed versions of files of a user.
 
-        How to improve:
-            Can be indexed by sentence while calculating token
-                so there won't be any half sentence.
+        The IDs are bound as a single array parameter, so the query is the
+        same for any number of files.
 
         Arguments:
-            text: The text to chunk.
-            max_tokens: The maximum number of tokens in a chunk.
-            overlap: The number of overlapping tokens between chunks.
+            user_id: The ID of the user.
+            resource_ids: The IDs of the files.
+            session: Database session.
 
         Returns:
-            The list of chunks.
+            The indexed versions by resource ID, of the indexed files only.
         """
-        tokens = self.tokenizer.encode(text).ids
-        chunks: list[str] = []
-        i: int = 0
-        while i < len(tokens):
-            chunk_tokens = tokens[i : i + max_tokens]
-            chunk_text = self.tokenizer.decode(chunk_tokens)
-            chunks.append(chunk_text)
-            i += max_tokens - overlap
-        return chunks
+        if not resource_ids:
+            return {}
+        indexed_resources = (
+            await session.execute(
+                select(IndexedResource)
+                .filter(IndexedResource.user_id == user_id)
+                .filter(
+                    IndexedResource.resource_id
+                    == any_(
+                        bindparam("resource_ids", resource_ids, type_=ARRAY(String))
+                    )
+                )
+            )
+        ).scalars()
+        return {
+            indexed_resource.resource_id: indexed_resource
+            for indexed_resource in indexed_resources
+        }
+
+    @validate_call
+    async def _save_indexed_resources(
+        self,
+        user_id: int,
+        resources: list[DropboxFileMetadata],
+        session: InstanceOf[AsyncSession],
+    ) -> None:
+        """Save the indexed versions of files of a user.
+
+        The new files are inserted and the versions of the reindexed ones
+        are updated by one statement.
+
+        Arguments:
+            user_id: The ID of the user.
+            resources: The metadata of the indexed files.
+            session: Database session.
+
+        Returns:
+            None.
+        """
+        if not resources:
+            return
+        statement = psql_insert(IndexedResource).values(
+            [
+                {
+                    "user_id": user_id,
+                    "resource_id": resource.id,
+                    "name": resource.name,
+                    "path": resource.path,
+                    "rev": resource.rev,
+                    "content_hash": resource.content_hash,
+                    "size": resource.size,
+                }
+                for resource in resources
+            ]
+        )
+        await session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[IndexedResource.user_id, IndexedResource.resource_id],
+                set_={
+                    "name": statement.excluded.name,
+                    "path": statement.excluded.path,
+                    "rev": statement.excluded.rev,
+                    "content_hash": statement.excluded.content_hash,
+                    "size": statement.excluded.size,
+                    "updated_at": func.now(),
+                },
+            )
+        )
+
+    @classmethod
+    def _plan_files(
+        cls, resources: list[DropboxFileMetadata], max_size: int
+    ) -> tuple[list[DropboxFileMetadata], list[tuple[DropboxFileMetadata, str]]]:
+        """Split files into the ones to index and the ones to skip.
+
+        A file is skipped if no parser supports its type or if it is larger
+        than the maximum size. A file of unknown size is kept.
+
+        Arguments:
+            resources: The metadata of the files.
+            max_size: The maximum size in bytes of a file to index.
+
+        Returns:
+            The files to index, and the skipped files with their reason.
+        """
+        files_to_index: list[DropboxFileMetadata] = []
+        skipped_files: list[tuple[DropboxFileMetadata, str]] = []
+        for resource in resources:
+            file_extension: str = cls._get_file_extension(resource)
+            if not ParserFactory.is_supported(file_extension):
+                skipped_files.append(
+                    (resource, f"Unsupported file type: {file_extension or 'none'}")
+                )
+            elif resource.size is not None and resource.size > max_size:
+                skipped_files.append(
+                    (resource, f"File larger than {max_size} bytes: {resource.size}")
+                )
+            else:
+                files_to_index.append(resource)
+        return files_to_index, skipped_files
+
+    @staticmethod
+    def _get_file_extension(resource: DropboxFileMetadata) -> str:
+        """Get the lowercase extension of a file.
+
+        Arguments:
+            resource: The file metadata.
+
+        Returns:
+            The extension without the dot, empty if the name has none.
+        """
+        _, dot, file_extension = resource.name.rpartition(".")
+        return file_extension.lower() if dot else ""
+
+    @staticmethod
+    def _is_unchanged(
+        indexed_resource: IndexedResource, resource: DropboxFileMetadata
+    ) -> bool:
+        """Check whether a file has not changed since it was indexed.
+
+        The content hash is compared if both are known, else the revision.
+        A file indexed without either is always considered changed.
+
+        Arguments:
+            indexed_resource: The indexed version of the file.
+            resource: The current metadata of the file.
+
+        Returns:
+            Whether the file has not changed.
+        """
+        if indexed_resource.content_hash and resource.content_hash:
+            return indexed_resource.content_hash == resource.content_hash
+        if indexed_resource.rev and resource.rev:
+            return indexed_resource.rev == resource.rev
+        return False
+
+    @staticmethod
+    def _is_moved(
+        indexed_resource: IndexedResource, resource: DropboxFileMetadata
+    ) -> bool:
+        """Check whether a file was moved or renamed since it was indexed.
+
+        Arguments:
+            indexed_resource: The indexed version of the file.
+            resource: The current metadata of the file.
+
+        Returns:
+            Whether the name or the path of the file changed.
+        """
+        return (indexed_resource.name, indexed_resource.path) != (
+            resource.name,
+            resource.path,
+        )
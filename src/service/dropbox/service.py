@@ -1,18 +1,25 @@
 """Dropbox common service."""
 
 from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Final
 
-from pydantic import InstanceOf, validate_call
+from pydantic import Field, InstanceOf, validate_call
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core import NotFoundError
+from src.database.session import database_session_manager
 from src.models.dropbox_token import DropboxToken
 from src.schemas.dropbox import DropboxAuthToken
 from src.service.service import Service
 from src.service.utils import add_tokens_to_db, get_user_id_from_teams_id
 
 from .handler import DropboxHandler
+from .token_cache import TokenCache, token_cache
+
+# Access tokens expiring within the margin are refreshed before use.
+REFRESH_MARGIN: Final[timedelta] = timedelta(minutes=5)
 
 
 class DropboxService(Service):
@@ -20,13 +27,15 @@ class DropboxService(Service):
 
     Attributes:
         dropbox_handler: Dropbox handler instance.
+        token_cache: The cache of the Dropbox tokens of the users.
 
     Methods:
         get_access_token_from_teams_id: Get the access token of a
             user from the teams id.
     """
 
-    dropbox_handler: DropboxHandler = DropboxHandler()
+    dropbox_handler: DropboxHandler = Field(default_factory=DropboxHandler)
+    token_cache: InstanceOf[TokenCache] = Field(default_factory=lambda: token_cache)
 
     @validate_call
     async def get_access_token_from_teams_id(
@@ -58,8 +67,10 @@ class DropboxService(Service):
     ) -> str:
         """Get the access token of a user.
 
-        Firstly, get the Dropbox tokens of the user. If the access token is
-        expired,generate a new one from the refresh token.
+        Firstly, get the Dropbox tokens of the user from the cache, or from
+        the database on a miss. If the access token is about to expire,
+        generate a new one from the refresh token. A single refresh of the
+        user runs at a time in the process.
 
         Arguments:
             user_id: User's ID.
@@ -71,21 +82,54 @@ class DropboxService(Service):
         Raises:
             NotFoundError: If the Dropbox tokens are not found.
         """
-        tokens: DropboxAuthToken = await self._get_tokens_of_user_from_db(
-            user_id=user_id, session=session
-        )
-
-        # 10 Minute buffer to avoid token expiration.
-        if tokens.expires_at - datetime.now(tz=timezone.utc) < timedelta(minutes=5):
-            tokens = (
-                await self.dropbox_handler.generate_access_token_from_refresh_token(
-                    refresh_token=tokens.refresh_token
-                )
+        tokens: DropboxAuthToken | None = self.token_cache.get(user_id)
+        if tokens is None:
+            tokens = await self._get_tokens_of_user_from_db(
+                user_id=user_id, session=session
+            )
+            self.token_cache.set(user_id, tokens)
+
+        valid_after: datetime = datetime.now(tz=timezone.utc) + REFRESH_MARGIN
+        if tokens.expires_at < valid_after:
+            tokens = await self.token_cache.refresh(
+                user_id=user_id,
+                refresh=partial(
+                    self._refresh_tokens,
+                    user_id=user_id,
+                    refresh_token=tokens.refresh_token,
+                ),
+                valid_after=valid_after,
             )
-            await add_tokens_to_db(user_id=user_id, tokens=tokens, session=session)
 
         return tokens.access_token
 
+    async def _refresh_tokens(
+        self, user_id: int, refresh_token: str
+    ) -> DropboxAuthToken:
+        """Generate new tokens from a refresh token and save them.
+
+        The tokens are saved in their own transaction, so the refresh does
+        not depend on the session of the request which started it.
+
+        Arguments:
+            user_id: User's ID.
+            refresh_token: The refresh token.
+
+        Returns:
+            The new tokens.
+
+        Raises:
+            InvalidInputError: If the refresh token is invalid.
+        """
+        tokens: DropboxAuthToken = (
+            await self.dropbox_handler.generate_access_token_from_refresh_token(
+                refresh_token=refresh_token
+            )
+        )
+        async with database_session_manager.get_session() as session:
+            await add_tokens_to_db(user_id=user_id, tokens=tokens, session=session)
+        return tokens
+
     @validate_call
     async def _get_tokens_of_user_from_db(
         self, user_id: int, session: InstanceOf[AsyncSession]
@@ -0,0 +1,156 @@
+"""Per process cache of the Dropbox tokens of the users."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from typing import Final
+
+from src.core import configuration
+from src.schemas.dropbox import DropboxAuthToken
+
+from ..cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Postgres notification channel of the changes of the Dropbox tokens. The
+# payload of a notification is the ID of the user.
+TOKEN_CHANNEL: Final[str] = "dropbox_tokens"
+
+
+class TokenCache:
+    """Cache of the Dropbox tokens of the users.
+
+    A single refresh of the tokens of a user runs at a time in the process,
+    the concurrent callers wait for its result. The processes notify each
+    other of the changed tokens through Postgres, so a process drops the
+    tokens refreshed or replaced by another one.
+
+    Methods:
+        get: Get the cached tokens of a user.
+        set: Cache the tokens of a user.
+        invalidate: Delete the cached tokens of a user.
+        clear: Delete all cached tokens.
+        refresh: Refresh the tokens of a user once for all the callers.
+        on_notification: Invalidate the tokens of the user of a notification.
+    """
+
+    def __init__(self, max_items: int, ttl: float):
+        """Initialize the token cache."""
+        self._tokens: LRUCache[int, DropboxAuthToken] = LRUCache(
+            max_items=max_items, ttl=ttl
+        )
+        self._refreshes: dict[int, asyncio.Future[DropboxAuthToken]] = {}
+
+    def get(self, user_id: int) -> DropboxAuthToken | None:
+        """Get the cached tokens of a user.
+
+        Arguments:
+            user_id: The ID of the user.
+
+        Returns:
+            The tokens, or None if they are not cached.
+        """
+        return self._tokens.get(user_id)
+
+    def set(self, user_id: int, tokens: DropboxAuthToken) -> None:
+        """Cache the tokens of a user.
+
+        Arguments:
+            user_id: The ID of the user.
+            tokens: The tokens of the user.
+
+        Returns:
+            None.
+        """
+        self._tokens.set(user_id, tokens)
+
+    def invalidate(self, user_id: int) -> None:
+        """Delete the cached tokens of a user.
+
+        Arguments:
+            user_id: The ID of the user.
+
+        Returns:
+            None.
+        """
+        self._tokens.delete(user_id)
+
+    def clear(self) -> None:
+        """Delete all cached tokens.
+
+        Returns:
+            None.
+        """
+        self._tokens.clear()
+
+    async def refresh(
+        self,
+        user_id: int,
+        refresh: Callable[[], Awaitable[DropboxAuthToken]],
+        valid_after: datetime,
+    ) -> DropboxAuthToken:
+        """Refresh the tokens of a user once for all the callers.
+
+        A caller arriving while a refresh of the user runs waits for it. A
+        caller arriving after it finished gets the refreshed tokens from
+        the cache, if they are valid long enough.
+
+        Arguments:
+            user_id: The ID of the user.
+            refresh: The function refreshing and saving the tokens.
+            valid_after: The time after which the tokens must expire.
+
+        Returns:
+            The refreshed tokens.
+
+        Raises:
+            Exception: The error of the refresh, raised to all its callers.
+        """
+        cached: DropboxAuthToken | None = self.get(user_id)
+        if cached is not None and cached.expires_at > valid_after:
+            return cached
+
+        flight: asyncio.Future[DropboxAuthToken] | None = self._refreshes.get(user_id)
+        if flight is None:
+            flight = asyncio.ensure_future(self._refresh(user_id, refresh))
+            self._refreshes[user_id] = flight
+            flight.add_done_callback(lambda _: self._refreshes.pop(user_id, None))
+        # The refresh goes on for the other callers if this one is cancelled.
+        return await asyncio.shield(flight)
+
+    async def _refresh(
+        self, user_id: int, refresh: Callable[[], Awaitable[DropboxAuthToken]]
+    ) -> DropboxAuthToken:
+        """Refresh the tokens of a user and cache them.
+
+        Arguments:
+            user_id: The ID of the user.
+            refresh: The function refreshing and saving the tokens.
+
+        Returns:
+            The refreshed tokens.
+        """
+        tokens: DropboxAuthToken = await refresh()
+        self.set(user_id, tokens)
+        return tokens
+
+    def on_notification(self, payload: str) -> None:
+        """Invalidate the tokens of the user of a notification.
+
+        Arguments:
+            payload: The ID of the user.
+
+        Returns:
+            None.
+        """
+        try:
+            self.invalidate(int(payload))
+        except ValueError:
+            logger.warning("Invalid token change notification: %s", payload)
+
+
+token_cache: TokenCache = TokenCache(
+    max_items=configuration.TOKEN_CACHE.MAX_ITEMS,
+    ttl=configuration.TOKEN_CACHE.TTL,
+)
@@ -0,0 +1,89 @@
+"""Shared client of the outbound HTTP requests."""
+
+import asyncio
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+from src.core import configuration
+
+
+class HttpClientManager:
+    """Outbound HTTP client manager.
+
+    The manager owns one long-lived client session whose connection pool
+    is shared by every outbound request, so the DNS lookups, the TCP
+    connections and the TLS handshakes are reused between the requests. It
+    is closed by the application lifespan.
+
+    Methods:
+        get_session: Get the shared client session.
+        close: Close the shared client session.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        limit_per_host: int,
+        keepalive_timeout: float,
+        dns_cache_ttl: int,
+        connect_timeout: float,
+        read_timeout: float,
+    ):
+        """Initialize the HTTP client manager."""
+        self.limit: int = limit
+        self.limit_per_host: int = limit_per_host
+        self.keepalive_timeout: float = keepalive_timeout
+        self.dns_cache_ttl: int = dns_cache_ttl
+        self.connect_timeout: float = connect_timeout
+        self.read_timeout: float = read_timeout
+        self._session: ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def get_session(self) -> ClientSession:
+        """Get the shared client session.
+
+        The session is created on the first use, and again if it was closed
+        or belongs to another event loop.
+
+        Returns:
+            The client session.
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = ClientSession(
+                connector=TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=self.dns_cache_ttl,
+                    use_dns_cache=True,
+                ),
+                timeout=ClientTimeout(
+                    total=None,
+                    sock_connect=self.connect_timeout,
+                    sock_read=self.read_timeout,
+                ),
+            )
+            self._loop = loop
+        return self._session
+
+    async def close(self) -> None:
+        """Close the shared client session.
+
+        Returns:
+            None.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+http_client_manager: HttpClientManager = HttpClientManager(
+    limit=configuration.HTTP_CLIENT.LIMIT,
+    limit_per_host=configuration.HTTP_CLIENT.LIMIT_PER_HOST,
+    keepalive_timeout=configuration.HTTP_CLIENT.KEEPALIVE_TIMEOUT,
+    dns_cache_ttl=configuration.HTTP_CLIENT.DNS_CACHE_TTL,
+    connect_timeout=configuration.HTTP_CLIENT.CONNECT_TIMEOUT,
+    read_timeout=configuration.HTTP_CLIENT.READ_TIMEOUT,
+)
@@ -0,0 +1,208 @@
+"""Adaptive concurrency limiter for the calls to rate limited services."""
+
+import asyncio
+from collections.abc import Hashable
+from contextlib import suppress
+from time import monotonic
+from typing import Awaitable, Callable, Final, TypeVar
+
+from src.core import ServiceUnavailableError, TooManyRequestsError, configuration
+
+from .cache import LRUCache
+
+T = TypeVar("T")
+
+# Minimum seconds between two decreases of the limit, so a burst of rejected
+# calls started under the same limit decreases it only once.
+DECREASE_COOLDOWN: Final[float] = 1.0
+
+
+class AdaptiveLimiter:
+    """Concurrency limiter with additive increase, multiplicative decrease.
+
+    The limit grows by one call for every `limit` successful calls. It is
+    multiplied by the decrease factor when a call is rejected by the rate
+    limit of the service or fails with a server error, which are the
+    signals of its overload. The duration of a call is not one, since it
+    grows with the size of the transferred content. A rejected call is
+    retried after the `Retry-After` delay of the service, and no call is
+    started before that delay passes.
+
+    Attributes:
+        limit: The current number of calls allowed at a time.
+        minimum: The lowest limit.
+        maximum: The highest limit.
+        decrease_factor: The factor of a decrease of the limit.
+        default_retry_after: The seconds to wait after a rejection without
+            a `Retry-After` delay.
+
+    Methods:
+        call: Call a function within the limit.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        decrease_factor: float = 0.5,
+        default_retry_after: float = 1.0,
+    ):
+        """Initialize the limiter."""
+        self.limit: float = float(min(max(initial, minimum), maximum))
+        self.minimum: int = minimum
+        self.maximum: int = maximum
+        self.decrease_factor: float = decrease_factor
+        self.default_retry_after: float = default_retry_after
+        self._in_flight: int = 0
+        self._paused_until: float = 0.0
+        self._last_decrease: float = float("-inf")
+        self._condition: asyncio.Condition = asyncio.Condition()
+
+    async def call(self, func: Callable[[], Awaitable[T]], max_retries: int = 3) -> T:
+        """Call a function within the limit.
+
+        Arguments:
+            func: The function which starts the call.
+            max_retries: The maximum number of retries of a rejected call.
+
+        Returns:
+            The result of the call.
+
+        Raises:
+            TooManyRequestsError: If the call is still rejected after the
+                retries.
+            ServiceUnavailableError: If the call still fails with a server
+                error after the retries.
+        """
+        retries: int = 0
+        while True:
+            await self._acquire()
+            try:
+                result: T = await func()
+            except (TooManyRequestsError, ServiceUnavailableError) as error:
+                self._decrease()
+                self._pause(
+                    error.retry_after
+                    if error.retry_after is not None
+                    else self.default_retry_after
+                )
+                if retries == max_retries:
+                    raise
+                retries += 1
+                continue
+            finally:
+                await self._release()
+
+            self._increase()
+            return result
+
+    async def _acquire(self) -> None:
+        """Wait until a call can be started and count it.
+
+        Returns:
+            None.
+        """
+        async with self._condition:
+            while True:
+                delay: float = self._paused_until - monotonic()
+                if delay > 0:
+                    with suppress(TimeoutError):
+                        await asyncio.wait_for(self._condition.wait(), delay)
+                    continue
+                if self._in_flight < int(self.limit):
+                    break
+                await self._condition.wait()
+            self._in_flight += 1
+
+    async def _release(self) -> None:
+        """Uncount a finished call and wake up the waiting calls.
+
+        Returns:
+            None.
+        """
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _increase(self) -> None:
+        """Increase the limit additively.
+
+        Returns:
+            None.
+        """
+        self.limit = min(self.limit + 1 / self.limit, float(self.maximum))
+
+    def _decrease(self) -> None:
+        """Decrease the limit multiplicatively, at most once per cooldown.
+
+        Returns:
+            None.
+        """
+        now: float = monotonic()
+        if now - self._last_decrease < DECREASE_COOLDOWN:
+            return
+        self._last_decrease = now
+        self.limit = max(self.limit * self.decrease_factor, float(self.minimum))
+
+    def _pause(self, seconds: float) -> None:
+        """Start no call until the given seconds pass.
+
+        Arguments:
+            seconds: The seconds to wait.
+
+        Returns:
+            None.
+        """
+        self._paused_until = max(self._paused_until, monotonic() + seconds)
+
+
+class LimiterRegistry:
+    """Limiters of the calls of a process by key, such as a user.
+
+    The calls of every index job of a key share one limiter, so its limit
+    and its `Retry-After` pauses outlast the jobs. The limiter of a key
+    unused for the idle timeout starts again from the initial limit.
+
+    Methods:
+        get: Get the limiter of a key.
+    """
+
+    def __init__(
+        self,
+        max_items: int,
+        idle_timeout: float,
+        factory: Callable[[], AdaptiveLimiter],
+    ):
+        """Initialize the registry."""
+        self.factory: Callable[[], AdaptiveLimiter] = factory
+        self._limiters: LRUCache[Hashable, AdaptiveLimiter] = LRUCache(
+            max_items=max_items, ttl=idle_timeout
+        )
+
+    def get(self, key: Hashable) -> AdaptiveLimiter:
+        """Get the limiter of a key, created on first use.
+
+        Arguments:
+            key: The key of the limited calls.
+
+        Returns:
+            The limiter.
+        """
+        limiter: AdaptiveLimiter | None = self._limiters.get(key)
+        if limiter is None:
+            limiter = self.factory()
+        # Setting it again restarts its idle timeout.
+        self._limiters.set(key, limiter)
+        return limiter
+
+
+download_limiters: LimiterRegistry = LimiterRegistry(
+    max_items=configuration.INDEX.DOWNLOAD_LIMITER_MAX_USERS,
+    idle_timeout=configuration.INDEX.DOWNLOAD_LIMITER_IDLE_TIMEOUT,
+    factory=lambda: AdaptiveLimiter(
+        initial=configuration.INDEX.DOWNLOAD_INITIAL_CONCURRENCY,
+        minimum=1,
+        maximum=configuration.INDEX.DOWNLOAD_CONCURRENCY,
+    ),
+)
@@ -0,0 +1,130 @@
+"""Listener of the Postgres notifications invalidating the process caches."""
+
+import asyncio
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationListener:
+    """Listener of the Postgres notifications of the changes of any process.
+
+    The caches of a process subscribe to the channels of their changes. A
+    single connection listens to all the channels, and the caches are
+    reset whenever the listening starts, since the notifications sent
+    while it was stopped are lost.
+
+    Methods:
+        subscribe: Call functions on the notifications of a channel.
+        listen: Dispatch the notifications until the task is cancelled.
+    """
+
+    def __init__(self):
+        """Initialize the listener."""
+        self._subscriptions: dict[
+            str, tuple[Callable[[str], None], Callable[[], None]]
+        ] = {}
+
+    def subscribe(
+        self,
+        channel: str,
+        on_notification: Callable[[str], None],
+        on_reset: Callable[[], None],
+    ) -> None:
+        """Call functions on the notifications of a channel.
+
+        Arguments:
+            channel: The notification channel.
+            on_notification: The function called with the payload of every
+                notification.
+            on_reset: The function called when notifications may have been
+                missed.
+
+        Returns:
+            None.
+        """
+        self._subscriptions[channel] = (on_notification, on_reset)
+
+    async def listen(self, engine: AsyncEngine, retry_interval: float) -> None:
+        """Dispatch the notifications until the task is cancelled.
+
+        Arguments:
+            engine: The database engine.
+            retry_interval: Seconds to wait before listening again after the
+                connection is lost.
+
+        Returns:
+            None.
+        """
+        while True:
+            try:
+                await self._listen_until_lost(engine)
+                logger.warning("Notification listener connection lost.")
+            except Exception:
+                logger.exception("Notifications could not be listened to.")
+            self._reset()
+            await asyncio.sleep(retry_interval)
+
+    async def _listen_until_lost(self, engine: AsyncEngine) -> None:
+        """Dispatch the notifications until the connection is lost.
+
+        Arguments:
+            engine: The database engine.
+
+        Returns:
+            None.
+        """
+        async with engine.connect() as connection:
+            raw_connection = await connection.get_raw_connection()
+            driver_connection: Any = raw_connection.driver_connection
+            lost: asyncio.Event = asyncio.Event()
+            driver_connection.add_termination_listener(lambda _: lost.set())
+            for channel in self._subscriptions:
+                await driver_connection.add_listener(channel, self._on_notification)
+            self._reset()
+            try:
+                await lost.wait()
+            finally:
+                if not driver_connection.is_closed():
+                    for channel in self._subscriptions:
+                        await driver_connection.remove_listener(
+                            channel, self._on_notification
+                        )
+
+    def _reset(self) -> None:
+        """Reset the subscribers which may have missed notifications.
+
+        Returns:
+            None.
+        """
+        for _, on_reset in self._subscriptions.values():
+            on_reset()
+
+    def _on_notification(
+        self, connection: Any, pid: int, channel: str, payload: str
+    ) -> None:
+        """Pass a notification to the subscriber of its channel.
+
+        Arguments:
+            connection: The listening connection.
+            pid: The ID of the notifying Postgres backend.
+            channel: The notification channel.
+            payload: The payload of the notification.
+
+        Returns:
+            None.
+        """
+        subscription = self._subscriptions.get(channel)
+        if subscription is None:
+            return
+        try:
+            subscription[0](payload)
+        except Exception:
+            logger.exception("Invalid %s notification: %s", channel, payload)
+
+
+notification_listener: NotificationListener = NotificationListener()
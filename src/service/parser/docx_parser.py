@@ -0,0 +1,64 @@
+"""DOCX parser module."""
+
+from io import BytesIO
+from typing import Final, Iterator
+from zipfile import ZipFile
+
+from defusedxml.ElementTree import iterparse
+
+from .parser import Parser
+
+WORD_NAMESPACE: Final[str] = (
+    "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+)
+
+
+class DocxParser(Parser):
+    """DOCX parser class.
+
+    This class is responsible for parsing the DOCX file content. The XML of
+    the document body is read incrementally from the archive, so only the
+    current paragraph is kept in memory. The XML comes from the files of
+    the users, so it is parsed without expanding entities or fetching
+    external resources.
+
+    Methods:
+        parse: Parse the DOCX file content.
+    """
+
+    extensions = ("docx",)
+
+    def parse(self, content: bytes) -> Iterator[str]:
+        """Parse the DOCX file content.
+
+        Arguments:
+            content: The content of the DOCX file.
+
+        Yields:
+            The text of every non-empty paragraph, ending with a newline.
+
+        Raises:
+            ValueError: If the content is not a DOCX document.
+        """
+        try:
+            archive = ZipFile(BytesIO(content))
+            document = archive.open("word/document.xml")
+        except Exception as error:
+            raise ValueError("Invalid DOCX document") from error
+
+        with archive, document:
+            texts: list[str] = []
+            for event, element in iterparse(document, events=("start", "end")):
+                if event == "start":
+                    continue
+                if element.tag == f"{WORD_NAMESPACE}t":
+                    texts.append(element.text or "")
+                elif element.tag == f"{WORD_NAMESPACE}tab":
+                    texts.append("\t")
+                elif element.tag in (f"{WORD_NAMESPACE}br", f"{WORD_NAMESPACE}cr"):
+                    texts.append("\n")
+                elif element.tag == f"{WORD_NAMESPACE}p":
+                    if texts:
+                        yield "".join(texts) + "\n"
+                    texts = []
+                    element.clear()
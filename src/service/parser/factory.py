@@ -3,25 +3,55 @@
 from functools import lru_cache
 from typing import Type
 
+from src.core import configuration
+from src.core.config import PDFBackend
+
+from .docx_parser import DocxParser
+from .html_parser import HTMLParser
 from .parser import Parser
-from .pdf_parser import PDFParser
+from .pdf_parser import PdfiumParser, PDFParser
+from .text_parser import MarkdownParser, TextParser
+
+file_extension_to_parser: dict[str, Type[Parser]] = {}
 
-file_extension_to_parser: dict[str, Type[Parser]] = {
-    "pdf": PDFParser,
+backend_to_pdf_parser: dict[PDFBackend, Type[PDFParser]] = {
+    PDFBackend.PYPDF2: PDFParser,
+    PDFBackend.PDFIUM: PdfiumParser,
 }
 
 
 class ParserFactory:
     """Parser factory class.
 
-    This class is responsible for creating parser objects.
+    This class is responsible for creating parser objects. The parsers
+    are registered for the extensions they declare.
 
     Methods:
+        register: Register a parser for its extensions.
         create_parser: Create a parser object.
+        is_supported: Check whether a file extension has a parser.
     """
 
     @staticmethod
-    @lru_cache(maxsize=1)
+    def register(parser: Type[Parser]) -> Type[Parser]:
+        """Register a parser for its extensions.
+
+        A parser registered later replaces the previous parser of an
+        extension. Can be used as a class decorator.
+
+        Arguments:
+            parser: The parser class.
+
+        Returns:
+            The parser class.
+        """
+        for file_extension in parser.extensions:
+            file_extension_to_parser[file_extension] = parser
+        ParserFactory.create_parser.cache_clear()
+        return parser
+
+    @staticmethod
+    @lru_cache
     def create_parser(file_extension: str) -> Parser:
         """Create a parser object.
 
@@ -35,3 +65,26 @@ class ParserFactory:
             return file_extension_to_parser[file_extension]()
         except KeyError as error:
             raise ValueError("Unsupported file extension") from error
+
+    @staticmethod
+    def is_supported(file_extension: str) -> bool:
+        """Check whether a file extension has a parser.
+
+        Arguments:
+            file_extension: The extension of the file.
+
+        Returns:
+            Whether the files of the extension can be parsed.
+        """
+        return file_extension in file_extension_to_parser
+
+
+parsers: tuple[Type[Parser], ...] = (
+    backend_to_pdf_parser[configuration.INDEX.PDF_BACKEND],
+    DocxParser,
+    TextParser,
+    MarkdownParser,
+    HTMLParser,
+)
+for parser in parsers:
+    ParserFactory.register(parser)
@@ -0,0 +1,94 @@
+"""HTML parser module."""
+
+from codecs import getincrementaldecoder
+from html.parser import HTMLParser as HTMLTokenizer
+from typing import Final, Iterator
+
+from .parser import Parser
+
+# Number of bytes of the content fed to the tokenizer at a time.
+FEED_SIZE: Final[int] = 64 * 1024
+
+# The head itself is not skipped, since its end tag is optional and the
+# body would be skipped too. Its only text is in these tags.
+SKIPPED_TAGS: Final[frozenset[str]] = frozenset(
+    {"script", "style", "noscript", "template", "title"}
+)
+BLOCK_TAGS: Final[frozenset[str]] = frozenset(
+    {
+        "address", "article", "aside", "blockquote", "br", "dd", "div", "dl",
+        "dt", "figcaption", "footer", "h1", "h2", "h3", "h4", "h5", "h6",
+        "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section",
+        "table", "td", "th", "tr", "ul",
+    }
+)  # fmt: skip
+
+
+class _TextExtractor(HTMLTokenizer):
+    """HTML tokenizer collecting the visible text of the fed markup."""
+
+    def __init__(self):
+        """Initialize the text extractor."""
+        super().__init__(convert_charrefs=True)
+        self.texts: list[str] = []
+        self._skipped_depth: int = 0
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        """Skip the content of the invisible tags."""
+        if tag in SKIPPED_TAGS:
+            self._skipped_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.texts.append("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        """Break the text at the end of the block tags."""
+        if tag in SKIPPED_TAGS:
+            self._skipped_depth = max(self._skipped_depth - 1, 0)
+        elif tag in BLOCK_TAGS:
+            self.texts.append("\n")
+
+    def handle_data(self, data: str) -> None:
+        """Collect the visible text."""
+        if not self._skipped_depth:
+            self.texts.append(data)
+
+    def pop_text(self) -> str:
+        """Get and forget the text collected so far."""
+        text: str = "".join(self.texts)
+        self.texts = []
+        return text
+
+
+class HTMLParser(Parser):
+    """HTML parser class.
+
+    This class is responsible for parsing the HTML file content. The
+    content is fed to the tokenizer in blocks, and the visible text of
+    every block is produced as soon as it is tokenized.
+
+    Methods:
+        parse: Parse the HTML file content.
+    """
+
+    extensions = ("html", "htm")
+
+    def parse(self, content: bytes) -> Iterator[str]:
+        """Parse the HTML file content.
+
+        Arguments:
+            content: The content of the HTML file, decoded as UTF-8.
+
+        Yields:
+            The visible text of every block of the content.
+        """
+        decoder = getincrementaldecoder("utf-8")(errors="replace")
+        extractor = _TextExtractor()
+        view = memoryview(content)
+        for start in range(0, len(view), FEED_SIZE):
+            extractor.feed(decoder.decode(view[start : start + FEED_SIZE]))
+            if text := extractor.pop_text():
+                yield text
+        extractor.feed(decoder.decode(b"", final=True))
+        extractor.close()
+        if text := extractor.pop_text():
+            yield text
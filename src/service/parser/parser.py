@@ -1,24 +1,35 @@
 """Parser base class service."""
 
 from abc import ABC, abstractmethod
+from typing import ClassVar, Iterator
 
 
 class Parser(ABC):
     """Parser base class.
 
-    This class is responsible for parsing the file content.
+    This class is responsible for parsing the file content. The text is
+    produced segment by segment, a page or a section at a time, so the
+    whole text of a document is never held in memory.
+
+    Attributes:
+        extensions: The lowercase file extensions handled by the parser.
+        version: The version of the output of the parser, to increase when
+            the parser produces a different text for the same file.
 
     Methods:
         parse: Parse the file content.
     """
 
+    extensions: ClassVar[tuple[str, ...]] = ()
+    version: ClassVar[int] = 1
+
     @abstractmethod
-    def parse(self, content: bytes) -> str:
+    def parse(self, content: bytes) -> Iterator[str]:
         """Parse the file content.
 
         Arguments:
             content: The content of the file to parse.
 
-        Returns:
-            The parsed content.
+        Yields:
+            The text segments of the file, in order.
         """
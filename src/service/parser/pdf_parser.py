@@ -1,6 +1,7 @@
 """PDF parser module."""
 
 from io import BytesIO
+from typing import BinaryIO, Iterator
 
 from PyPDF2 import PdfReader
 
@@ -10,26 +11,124 @@ from .parser import Parser
 class PDFParser(Parser):
     """PDF parser class.
 
-    This class is responsible for parsing the PDF file content.
+    This class is responsible for parsing the PDF file content with
+    PyPDF2. The pages can be parsed by ranges, so the ranges of a large
+    file can be parsed in parallel. The ranges can be read from an open
+    file, so the content is not copied to every worker process.
 
     Methods:
         parse: Parse the PDF file content.
+        count_pages: Count the pages of the PDF file content.
+        parse_pages: Parse a range of pages of the PDF file content.
     """
 
-    def parse(self, content: bytes) -> str:
+    extensions = ("pdf",)
+
+    def parse(self, content: bytes) -> Iterator[str]:
         """Parse the PDF file content.
 
         Arguments:
             content: The content of the PDF file.
 
+        Yields:
+            The text of every page.
+        """
+        yield from self.parse_pages(content=content, start=0, stop=None)
+
+    def count_pages(self, content: bytes | BinaryIO) -> int:
+        """Count the pages of the PDF file content.
+
+        Arguments:
+            content: The content of the PDF file, or the open file.
+
         Returns:
-            The parsed content.
+            The number of pages.
+        """
+        return len(PdfReader(_as_stream(content)).pages)
+
+    def parse_pages(
+        self, content: bytes | BinaryIO, start: int, stop: int | None
+    ) -> Iterator[str]:
+        """Parse a range of pages of the PDF file content.
+
+        Arguments:
+            content: The content of the PDF file, or the open file.
+            start: The index of the first page.
+            stop: The index after the last page, or None for the last page.
+
+        Yields:
+            The text of every page of the range.
         """
-        bytes_data = BytesIO(content)
-        text = ""
-        reader = PdfReader(bytes_data)
-        for num in range(len(reader.pages)):
-            page = reader.pages[num]
-            page_text = page.extract_text()
-            text += page_text
-        return text
+        pages = PdfReader(_as_stream(content)).pages
+        for index in range(start, len(pages) if stop is None else stop):
+            yield pages[index].extract_text()
+
+
+class PdfiumParser(PDFParser):
+    """PDF parser class using PDFium.
+
+    This class is responsible for parsing the PDF file content with
+    pypdfium2, the bindings of the PDFium C library. It needs the `pdfium`
+    extra.
+
+    Methods:
+        count_pages: Count the pages of the PDF file content.
+        parse_pages: Parse a range of pages of the PDF file content.
+    """
+
+    def count_pages(self, content: bytes | BinaryIO) -> int:
+        """Count the pages of the PDF file content.
+
+        Arguments:
+            content: The content of the PDF file, or the open file.
+
+        Returns:
+            The number of pages.
+        """
+        import pypdfium2
+
+        document = pypdfium2.PdfDocument(content)
+        try:
+            return len(document)
+        finally:
+            document.close()
+
+    def parse_pages(
+        self, content: bytes | BinaryIO, start: int, stop: int | None
+    ) -> Iterator[str]:
+        """Parse a range of pages of the PDF file content.
+
+        Arguments:
+            content: The content of the PDF file, or the open file.
+            start: The index of the first page.
+            stop: The index after the last page, or None for the last page.
+
+        Yields:
+            The text of every page of the range.
+        """
+        import pypdfium2
+
+        document = pypdfium2.PdfDocument(content)
+        try:
+            for index in range(start, len(document) if stop is None else stop):
+                page = document[index]
+                text_page = page.get_textpage()
+                try:
+                    yield text_page.get_text_range()
+                finally:
+                    text_page.close()
+                    page.close()
+        finally:
+            document.close()
+
+
+def _as_stream(content: bytes | BinaryIO) -> BinaryIO:
+    """Get a stream of a PDF file content.
+
+    Arguments:
+        content: The content of the PDF file, or the open file.
+
+    Returns:
+        The stream of the content.
+    """
+    return BytesIO(content) if isinstance(content, bytes) else content
@@ -0,0 +1,88 @@
+"""Plain text and Markdown parsers module."""
+
+import re
+from io import BytesIO, TextIOWrapper
+from typing import Final, Iterator
+
+from .parser import Parser
+
+# Number of characters of a plain text segment.
+SEGMENT_SIZE: Final[int] = 64 * 1024
+
+MARKDOWN_HEADING: Final[re.Pattern[str]] = re.compile(r"^ {0,3}#{1,6}(\s|$)")
+
+
+def read_lines(content: bytes) -> TextIOWrapper:
+    """Read the lines of a UTF-8 text, replacing the invalid bytes.
+
+    Arguments:
+        content: The content of the file.
+
+    Returns:
+        The text stream of the content.
+    """
+    return TextIOWrapper(BytesIO(content), encoding="utf-8", errors="replace")
+
+
+class TextParser(Parser):
+    """Plain text parser class.
+
+    This class is responsible for parsing the plain text file content.
+
+    Methods:
+        parse: Parse the plain text file content.
+    """
+
+    extensions = ("txt",)
+
+    def parse(self, content: bytes) -> Iterator[str]:
+        """Parse the plain text file content.
+
+        Arguments:
+            content: The content of the text file.
+
+        Yields:
+            Segments of at most `SEGMENT_SIZE` characters.
+        """
+        with read_lines(content) as stream:
+            while segment := stream.read(SEGMENT_SIZE):
+                yield segment
+
+
+class MarkdownParser(Parser):
+    """Markdown parser class.
+
+    This class is responsible for parsing the Markdown file content. The
+    markup is kept, it is part of the text for the embeddings.
+
+    Methods:
+        parse: Parse the Markdown file content.
+    """
+
+    extensions = ("md", "markdown")
+
+    def parse(self, content: bytes) -> Iterator[str]:
+        """Parse the Markdown file content.
+
+        A segment is a section starting at a heading. A section longer than
+        `SEGMENT_SIZE` characters is split at its lines.
+
+        Arguments:
+            content: The content of the Markdown file.
+
+        Yields:
+            The sections of the file.
+        """
+        section: list[str] = []
+        size: int = 0
+        with read_lines(content) as stream:
+            for line in stream:
+                if section and (
+                    MARKDOWN_HEADING.match(line) or size + len(line) > SEGMENT_SIZE
+                ):
+                    yield "".join(section)
+                    section, size = [], 0
+                section.append(line)
+                size += len(line)
+        if section:
+            yield "".join(section)
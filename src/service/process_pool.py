@@ -0,0 +1,83 @@
+"""Process pool for the CPU bound stages of indexing."""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from threading import Lock
+from typing import Any, Callable, TypeVar
+
+from src.core import configuration
+
+T = TypeVar("T")
+
+
+class ProcessPool:
+    """Bounded process pool shared by the services.
+
+    The workers are started on the first use. At most `max_pending` tasks
+    are submitted at a time, the others wait for a free slot, so the queue
+    of the pool and the file contents held for it stay bounded.
+
+    Methods:
+        run: Run a function in a worker process.
+        shutdown: Stop the worker processes.
+    """
+
+    def __init__(self, max_workers: int | None, max_pending: int):
+        """Initialize the process pool."""
+        self.max_workers: int | None = max_workers
+        self.max_pending: int = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(max_pending)
+        self._lock: Lock = Lock()
+
+    async def run(self, func: Callable[..., T], **kwargs: Any) -> T:
+        """Run a function in a worker process.
+
+        Arguments:
+            func: The function to run, which must be picklable.
+            kwargs: The keyword arguments of the function.
+
+        Returns:
+            The result of the function.
+        """
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(), partial(func, **kwargs)
+            )
+
+    def shutdown(self) -> None:
+        """Stop the worker processes.
+
+        Returns:
+            None.
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Get the executor, starting it if needed.
+
+        The workers are spawned rather than forked, because the application
+        process runs threads.
+
+        Returns:
+            The executor.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+
+process_pool: ProcessPool = ProcessPool(
+    max_workers=configuration.INDEX.PARSE_WORKERS,
+    max_pending=configuration.INDEX.PARSE_QUEUE_SIZE,
+)
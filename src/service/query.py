@@ -1,43 +1,379 @@
 """Query service module."""
 
-from pydantic import InstanceOf, validate_call
+import asyncio
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from posixpath import basename
+from typing import Annotated, Final
+
+from pydantic import Field, InstanceOf, validate_call
+from sqlalchemy import String, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.schemas.query import Query
+from src.core import InvalidInputError, configuration
+from src.database.base_vector_db import SHARED_TENANT
+from src.models import IndexedResource
+from src.schemas.query import QueryResponse, QueryResult, SearchMode
 
+from .cache import QueryCache, query_cache
 from .service import Service
 from .utils import get_user_id_from_teams_id
 
+# Distance from which the keyword fallback hits of a vector search are
+# ranked, after the relevant vector hits, which are closer.
+KEYWORD_FALLBACK_DISTANCE: Final[float] = 1.0
+# Constant of the reciprocal rank fusion of the results of the tenants.
+RANK_FUSION_K: Final[int] = 60
+
 
 class QueryService(Service):
-    """Query operations."""
+    """Query operations.
+
+    Attributes:
+        query_cache: The cache of the query results.
+
+    Methods:
+        query: Query the resources of a user.
+    """
+
+    query_cache: InstanceOf[QueryCache] = Field(default_factory=lambda: query_cache)
 
     @validate_call
     async def query(
-        self, user_teams_id: str, query: str, session: InstanceOf[AsyncSession]
-    ) -> str:
+        self,
+        user_teams_id: str,
+        query: str,
+        session: InstanceOf[AsyncSession],
+        mode: SearchMode = SearchMode.VECTOR,
+        alpha: Annotated[float, Field(ge=0, le=1)] = 0.5,
+        limit: Annotated[int, Field(gt=0)] = 10,
+        cursor: str | None = None,
+    ) -> QueryResponse:
         """Query the resources of a user.
 
+        One more result than the limit is fetched to know whether there is
+        a next page. The tenant of the user and the shared objects of the
+        contents of the user are searched together.
+
         Arguments:
             user_teams_id: The teams id of the user.
             query: The query to search.
             session: Database session.
+            mode: The search mode.
+            alpha: The weight of the vector score in the hybrid search,
+                where 0 is pure keyword and 1 is pure vector search.
+            limit: The maximum number of results in a page.
+            cursor: The cursor of the page, or None for the first page.
+
+        Returns:
+            The found chunks of the page and the cursor of the next page.
+
+        Raises:
+            InvalidInputError: If the cursor is invalid or too far.
+            NotFoundError: If the user is not found.
         """
+        offset: int = self._decode_cursor(cursor) if cursor else 0
         user_id: int = await get_user_id_from_teams_id(
             teams_id=user_teams_id, session=session
         )
 
-        query_result: dict[str, Query] = self.vector_db.query(
-            collection_name=f"user_{user_id}", query=query
+        tenant: str = f"user_{user_id}"
+        results: list[QueryResult] | None = self.query_cache.get_results(
+            tenant=tenant,
+            query=query,
+            mode=mode,
+            alpha=alpha,
+            limit=limit + 1,
+            offset=offset,
+        )
+        if results is None:
+            results = await self._query_with_shared_contents(
+                user_id=user_id,
+                tenant=tenant,
+                query=query,
+                session=session,
+                mode=mode,
+                alpha=alpha,
+                limit=limit + 1,
+                offset=offset,
+            )
+            self.query_cache.set_results(
+                tenant=tenant,
+                query=query,
+                results=results,
+                mode=mode,
+                alpha=alpha,
+                limit=limit + 1,
+                offset=offset,
+            )
+
+        return QueryResponse(
+            results=results[:limit],
+            next_cursor=(
+                self._encode_cursor(offset + limit) if len(results) > limit else None
+            ),
+        )
+
+    async def _query_with_shared_contents(
+        self,
+        user_id: int,
+        tenant: str,
+        query: str,
+        session: AsyncSession,
+        mode: SearchMode,
+        alpha: float,
+        limit: int,
+        offset: int,
+    ) -> list[QueryResult]:
+        """Query the tenant of a user and the shared objects of its contents.
+
+        The best `offset + limit` results of both tenants are merged by
+        distance for the vector search and by the rank in their tenant
+        otherwise, since the keyword scores depend on the objects of the
+        tenant. Neither depends on the number of fetched results, so the
+        pages of a query follow the same order. A chunk found in both
+        tenants, from a file indexed before the contents were shared, is
+        kept once.
+
+        Arguments:
+            user_id: The ID of the user.
+            tenant: The name of the tenant of the user.
+            query: The query to search.
+            session: Database session.
+            mode: The search mode.
+            alpha: The weight of the vector score in the hybrid search.
+            limit: The maximum number of results.
+            offset: The number of best results to skip.
+
+        Returns:
+            The found chunks, best match first.
+        """
+        user_results, shared_results = await asyncio.gather(
+            self.vector_db.query(
+                tenant=tenant,
+                query=query,
+                mode=mode,
+                alpha=alpha,
+                limit=offset + limit,
+                offset=0,
+            ),
+            self._query_shared_contents(
+                user_id=user_id,
+                query=query,
+                session=session,
+                mode=mode,
+                alpha=alpha,
+                limit=offset + limit,
+            ),
+        )
+
+        ranked_results: list[tuple[float, QueryResult]] = [
+            *self._rank(results=user_results, mode=mode),
+            *self._rank(results=shared_results, mode=mode),
+        ]
+        ranked_results.sort(key=lambda ranked_result: ranked_result[0])
+
+        found: set[tuple[str, str]] = set()
+        unique_results: list[QueryResult] = []
+        for _, result in ranked_results:
+            if (result.resource_id, result.content) not in found:
+                found.add((result.resource_id, result.content))
+                unique_results.append(result)
+        return unique_results[offset : offset + limit]
+
+    async def _query_shared_contents(
+        self,
+        user_id: int,
+        query: str,
+        session: AsyncSession,
+        mode: SearchMode,
+        alpha: float,
+        limit: int,
+    ) -> list[QueryResult]:
+        """Query the shared objects of the contents of a user.
+
+        At most `SHARED_FILTER_MAX_CONTENTS` content hashes of the user are
+        loaded to filter the search. For a user with more contents, more
+        results of all the users are searched instead and those of the
+        other users are dropped, so neither the filter nor the loaded rows
+        grow with the library. The shared results are given the ID, name and
+        path of the file of the user.
+
+        Arguments:
+            user_id: The ID of the user.
+            query: The query to search.
+            session: Database session.
+            mode: The search mode.
+            alpha: The weight of the vector score in the hybrid search.
+            limit: The maximum number of results.
+
+        Returns:
+            The found chunks of the contents of the user, best match first.
+        """
+        max_contents: int = configuration.VECTOR_DB.SHARED_FILTER_MAX_CONTENTS
+        content_hashes: list[str] = list(
+            (
+                await session.execute(
+                    select(IndexedResource.content_hash)
+                    .filter(IndexedResource.user_id == user_id)
+                    .filter(IndexedResource.content_hash.is_not(None))
+                    .distinct()
+                    .limit(max_contents + 1)
+                )
+            ).scalars()
+        )
+        if not content_hashes:
+            return []
+
+        if len(content_hashes) <= max_contents:
+            shared_results: list[QueryResult] = await self.vector_db.query(
+                tenant=SHARED_TENANT,
+                query=query,
+                mode=mode,
+                alpha=alpha,
+                limit=limit,
+                offset=0,
+                resource_ids=content_hashes,
+            )
+        else:
+            shared_results = await self.vector_db.query(
+                tenant=SHARED_TENANT,
+                query=query,
+                mode=mode,
+                alpha=alpha,
+                limit=limit * configuration.VECTOR_DB.SHARED_OVERFETCH_FACTOR,
+                offset=0,
+            )
+        if not shared_results:
+            return []
+
+        files: dict[str, tuple[str, str, str]] = await self._get_files_by_content(
+            user_id=user_id,
+            content_hashes=list({result.resource_id for result in shared_results}),
+            session=session,
         )
+        results_of_user: list[QueryResult] = []
+        for result in shared_results:
+            if result.resource_id not in files:
+                continue
+            resource_id, name, path = files[result.resource_id]
+            results_of_user.append(
+                result.model_copy(
+                    update={"resource_id": resource_id, "name": name, "path": path}
+                )
+            )
+        return results_of_user[:limit]
+
+    @staticmethod
+    def _rank(
+        results: list[QueryResult], mode: SearchMode
+    ) -> list[tuple[float, QueryResult]]:
+        """Give the results of a tenant keys comparable across tenants.
 
-        if not query_result:
-            return "No results found."
+        The key of a vector search result is its distance. The key of a
+        keyword or hybrid search result is its reciprocal rank fusion
+        score, negated so the best result comes first. The hits of a
+        vector search which fell back to the keyword search have no
+        distance, they are given one from `KEYWORD_FALLBACK_DISTANCE` by
+        their rank, so they rank after the vector hits.
 
-        result: str = "Here are the results of your query:\n"
-        for value in query_result.values():
-            result = f"FROM: {value.path}\n"
-            for v in value.content:
-                result += f"{v}\n"
+        Arguments:
+            results: The results of a tenant, best match first.
+            mode: The search mode.
+
+        Returns:
+            The key and the result of every result, lowest key first.
+        """
+        ranked_results: list[tuple[float, QueryResult]] = []
+        for rank, result in enumerate(results, start=1):
+            if mode != SearchMode.VECTOR:
+                ranked_results.append((-1.0 / (RANK_FUSION_K + rank), result))
+            elif result.distance is not None:
+                ranked_results.append((result.distance, result))
+            else:
+                distance: float = KEYWORD_FALLBACK_DISTANCE + rank / (
+                    RANK_FUSION_K + rank
+                )
+                ranked_results.append(
+                    (distance, result.model_copy(update={"distance": distance}))
+                )
+        return ranked_results
+
+    @staticmethod
+    async def _get_files_by_content(
+        user_id: int, content_hashes: list[str], session: AsyncSession
+    ) -> dict[str, tuple[str, str, str]]:
+        """Get the indexed files of a user with some content hashes.
 
-        return result
+        A content of several files of the user is found as its first file.
+        The hashes are bound as a single array parameter, so the query is
+        the same for any number of hashes.
+
+        Arguments:
+            user_id: The ID of the user.
+            content_hashes: The content hashes.
+            session: Database session.
+
+        Returns:
+            The ID, name and path of a file of every content hash of the
+            user.
+        """
+        files: dict[str, tuple[str, str, str]] = {}
+        for content_hash, resource_id, name, path in await session.execute(
+            select(
+                IndexedResource.content_hash,
+                IndexedResource.resource_id,
+                IndexedResource.name,
+                IndexedResource.path,
+            )
+            .filter(IndexedResource.user_id == user_id)
+            .filter(
+                IndexedResource.content_hash
+                == any_(
+                    bindparam("content_hashes", content_hashes, type_=ARRAY(String))
+                )
+            )
+            .order_by(IndexedResource.resource_id)
+        ):
+            path = path or ""
+            files.setdefault(content_hash, (resource_id, name or basename(path), path))
+        return files
+
+    @staticmethod
+    def _encode_cursor(offset: int) -> str:
+        """Encode the position of a page as an opaque cursor.
+
+        Arguments:
+            offset: The number of results before the page.
+
+        Returns:
+            The cursor.
+        """
+        return urlsafe_b64encode(json.dumps({"offset": offset}).encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> int:
+        """Decode the position of a page from a cursor.
+
+        Arguments:
+            cursor: The cursor.
+
+        Returns:
+            The number of results before the page.
+
+        Raises:
+            InvalidInputError: If the cursor is invalid or too far.
+        """
+        try:
+            offset = json.loads(urlsafe_b64decode(cursor.encode()))["offset"]
+        except (binascii.Error, ValueError, TypeError, KeyError) as error:
+            raise InvalidInputError("Cursor") from error
+        if (
+            not isinstance(offset, int)
+            or offset < 0
+            or offset > configuration.VECTOR_DB.QUERY_MAX_OFFSET
+        ):
+            raise InvalidInputError("Cursor")
+        return offset
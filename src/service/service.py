@@ -1,7 +1,8 @@
 """Shared service module for other services."""
 
-from database import VectorDB
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from src.database import AsyncVectorDB
 
 
 class Service(BaseModel):
@@ -11,4 +12,4 @@ class Service(BaseModel):
         vector_db: The vector database operations.
     """
 
-    vector_db: VectorDB = VectorDB()
+    vector_db: AsyncVectorDB = Field(default_factory=AsyncVectorDB)
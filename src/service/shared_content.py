@@ -0,0 +1,156 @@
+"""Contents indexed once in the vector database for all the users."""
+
+import asyncio
+import logging
+from datetime import timedelta
+
+from sqlalchemy import exists, func, select, update
+from sqlalchemy.dialects.postgresql import insert as psql_insert
+
+from src.database import AsyncVectorDB
+from src.database.base_vector_db import SHARED_TENANT
+from src.database.session import DatabaseSessionManager, database_session_manager
+from src.models import IndexedResource, SharedContent
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of contents deleted in one transaction by a collection.
+GC_BATCH_SIZE: int = 100
+
+
+class SharedContents:
+    """Contents whose objects are shared by the users in the vector database.
+
+    The objects of a content hash are inserted once in the shared tenant,
+    whichever user indexes it first, so the embedding cost and the size of
+    the vector database grow with the unique contents instead of with the
+    copies of the users. The users query the shared objects of the content
+    hashes of their indexed files only.
+
+    A content no longer indexed by any user is deleted by the garbage
+    collection, once it has not been used for a grace period.
+
+    Methods:
+        touch: Mark a content as used if its objects are inserted.
+        save: Record that the objects of a content are inserted.
+        collect_garbage: Delete the contents no longer indexed by any user.
+        collect_garbage_periodically: Collect the garbage at every interval.
+    """
+
+    def __init__(
+        self, session_manager: DatabaseSessionManager, vector_db: AsyncVectorDB
+    ):
+        """Initialize the shared contents."""
+        self.session_manager: DatabaseSessionManager = session_manager
+        self.vector_db: AsyncVectorDB = vector_db
+
+    async def touch(self, content_hash: str) -> bool:
+        """Mark a content as used if its objects are inserted.
+
+        A content marked as used is not collected before the grace period,
+        so its objects can be relied on while the file is indexed.
+
+        Arguments:
+            content_hash: The Dropbox content hash of the file.
+
+        Returns:
+            Whether the objects of the content are inserted.
+        """
+        async with self.session_manager.get_session() as session:
+            return (
+                await session.execute(
+                    update(SharedContent)
+                    .where(SharedContent.content_hash == content_hash)
+                    .values(used_at=func.now())
+                    .returning(SharedContent.id)
+                )
+            ).scalar_one_or_none() is not None
+
+    async def save(self, content_hash: str) -> None:
+        """Record that the objects of a content are inserted.
+
+        Arguments:
+            content_hash: The Dropbox content hash of the file.
+
+        Returns:
+            None.
+        """
+        async with self.session_manager.get_session() as session:
+            await session.execute(
+                psql_insert(SharedContent)
+                .values(content_hash=content_hash)
+                .on_conflict_do_update(
+                    index_elements=[SharedContent.content_hash],
+                    set_={"used_at": func.now()},
+                )
+            )
+
+    async def collect_garbage(self, grace_period: float) -> int:
+        """Delete the contents no longer indexed by any user.
+
+        The rows of a batch stay locked until their objects are deleted, so
+        a concurrent indexing of the same content waits and inserts its
+        objects again afterwards.
+
+        Arguments:
+            grace_period: Seconds since the last use of a content before it
+                can be deleted.
+
+        Returns:
+            The number of deleted contents.
+        """
+        deleted: int = 0
+        while True:
+            async with self.session_manager.get_session() as session:
+                unused_contents: list[SharedContent] = list(
+                    (
+                        await session.execute(
+                            select(SharedContent)
+                            .filter(
+                                SharedContent.used_at
+                                < func.now() - timedelta(seconds=grace_period)
+                            )
+                            .filter(
+                                ~exists().where(
+                                    IndexedResource.content_hash
+                                    == SharedContent.content_hash
+                                )
+                            )
+                            .limit(GC_BATCH_SIZE)
+                            .with_for_update(skip_locked=True)
+                        )
+                    ).scalars()
+                )
+                for shared_content in unused_contents:
+                    await self.vector_db.delete_resource_objects(
+                        tenant=SHARED_TENANT, resource_id=shared_content.content_hash
+                    )
+                    await session.delete(shared_content)
+            deleted += len(unused_contents)
+            if len(unused_contents) < GC_BATCH_SIZE:
+                return deleted
+
+    async def collect_garbage_periodically(
+        self, interval: float, grace_period: float
+    ) -> None:
+        """Delete the contents no longer indexed by any user at every interval.
+
+        Arguments:
+            interval: Seconds between two collections.
+            grace_period: Seconds since the last use of a content before it
+                can be deleted.
+
+        Returns:
+            None.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.collect_garbage(grace_period=grace_period)
+            except Exception:
+                logger.exception("Unused shared contents not deleted.")
+
+
+shared_contents: SharedContents = SharedContents(
+    session_manager=database_session_manager, vector_db=AsyncVectorDB()
+)
@@ -0,0 +1,87 @@
+"""Task group with a bounded number of running tasks."""
+
+import asyncio
+import logging
+from types import TracebackType
+from typing import Any, Coroutine
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedTaskGroup:
+    """Task group with a bounded number of running tasks.
+
+    Spawning a task waits while the group is full, so a producer feeding
+    the group is slowed down to the pace of its tasks. The failures of the
+    tasks are logged and counted instead of being raised.
+
+    Usage:
+        async with BoundedTaskGroup(limit=10) as task_group:
+            for item in items:
+                await task_group.spawn(process(item))
+
+    Attributes:
+        failed: The number of failed tasks.
+
+    Methods:
+        spawn: Start a task once the group has room for it.
+    """
+
+    def __init__(self, limit: int):
+        """Initialize the task group."""
+        self.limit: int = limit
+        self.failed: int = 0
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(limit)
+        self._tasks: set[asyncio.Task[Any]] = set()
+
+    async def __aenter__(self) -> "BoundedTaskGroup":
+        """Open the task group."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Wait for the tasks, cancelling them if the producer failed."""
+        if exc is not None:
+            for task in self._tasks:
+                task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def spawn(self, coroutine: Coroutine[Any, Any, Any]) -> None:
+        """Start a task once the group has room for it.
+
+        Arguments:
+            coroutine: The coroutine of the task.
+
+        Returns:
+            None.
+        """
+        try:
+            await self._semaphore.acquire()
+        except BaseException:
+            coroutine.close()
+            raise
+        task: asyncio.Task[Any] = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task[Any]) -> None:
+        """Release the slot of a finished task and record its failure.
+
+        Arguments:
+            task: The finished task.
+
+        Returns:
+            None.
+        """
+        self._tasks.discard(task)
+        self._semaphore.release()
+        if task.cancelled():
+            return
+        error: BaseException | None = task.exception()
+        if error is not None:
+            self.failed += 1
+            logger.warning("Task failed: %s", error, exc_info=error)
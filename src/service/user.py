@@ -42,4 +42,4 @@ class UserService(Service):
             raise ConflictError("User") from e
 
         # This should be created in async way by using message queue.
-        self.vector_db.create_collection(collection_name=f"user_{new_user.id}")
+        await self.vector_db.create_tenant(tenant=f"user_{new_user.id}")
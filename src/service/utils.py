@@ -3,9 +3,9 @@
 from typing import Any
 
 from aiohttp import ClientSession
-from pydantic import BaseModel, InstanceOf
+from pydantic import BaseModel, Field, InstanceOf
 from schemas.dropbox import DropboxAuthToken
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.dialects.postgresql import insert as psql_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -13,6 +13,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.core import NotFoundError
 from src.models import DropboxToken, User
 
+from .cache import user_id_cache
+from .dropbox.token_cache import TOKEN_CHANNEL
+from .http_client import http_client_manager
+
 
 class HttpResponse(BaseModel):
     """Model for HTTP response.
@@ -21,11 +25,13 @@ class HttpResponse(BaseModel):
         data: The response data.
         status: The response status.
         ok: The response status.
+        headers: The response headers, by lowercase name.
     """
 
     data: dict[str, Any]
     status: int
     ok: bool
+    headers: dict[str, str] = Field(default_factory=dict)
 
 
 async def send_http_request(
@@ -33,6 +39,7 @@ async def send_http_request(
     method: str = "get",
     headers: dict[str, str] | None = None,
     body: Any | None = None,
+    client_session: ClientSession | None = None,
 ) -> HttpResponse:  # pragma: no cover
     """Send request to the specified url.
 
@@ -41,39 +48,50 @@ async def send_http_request(
         method: Method of the request.
         headers: Headers of the request.
         body: Body of the request.
+        client_session: The client session to send the request with,
+            the shared one by default.
 
     Returns:
         The dictionary that includes the response and the status.
     """
-    raw_request_func_params: dict[str, str] = {
+    raw_request_func_params: dict[str, Any] = {
         "method": method,
         "url": url,
+        "headers": headers if headers else None,
     }
 
-    request_func_params: dict[str, str] = (
+    request_func_params: dict[str, Any] = (
         {**raw_request_func_params, "data": body} if body else raw_request_func_params
     )
 
-    async with ClientSession(
-        headers=headers if headers else None
-    ) as session, session.request(**request_func_params) as response:
+    if client_session is None:
+        client_session = http_client_manager.get_session()
+
+    async with client_session.request(**request_func_params) as response:
+        response_headers: dict[str, str] = {
+            name.lower(): value for name, value in response.headers.items()
+        }
         if not response.ok:
             return HttpResponse(
                 data={},
                 status=response.status,
                 ok=False,
+                headers=response_headers,
             )
         response_json: dict[str, Any] = await response.json()
         return HttpResponse(
             data=response_json,
             status=response.status,
             ok=response.ok,
+            headers=response_headers,
         )
 
 
 async def get_user_id_from_teams_id(teams_id: str, session: AsyncSession) -> int:
     """Get the user id from the microsoft teams id.
 
+    The IDs are cached, only the ID column is selected on a miss.
+
     Arguments:
         teams_id: The teams id of the user.
         session: The database session.
@@ -84,11 +102,18 @@ async def get_user_id_from_teams_id(teams_id: str, session: AsyncSession) -> int
     Raises:
         NotFoundError: If the user is not found.
     """
-    user = (await session.execute(select(User).filter_by(teams_id=teams_id))).fetchone()
-    if not user:
+    user_id: int | None = user_id_cache.get(teams_id)
+    if user_id is not None:
+        return user_id
+
+    user_id = (
+        await session.execute(select(User.id).filter_by(teams_id=teams_id))
+    ).scalar_one_or_none()
+    if user_id is None:
         raise NotFoundError("User")
 
-    return user[0].id
+    user_id_cache.set(teams_id, user_id)
+    return user_id
 
 
 async def add_tokens_to_db(
@@ -98,6 +123,8 @@ async def add_tokens_to_db(
 ) -> None:
     """Insert or override the access and refresh tokens to the database.
 
+    The processes caching the tokens are notified of the change.
+
     Arguments:
         user_id: The user id.
         tokens: The access and refresh tokens.
@@ -129,3 +156,6 @@ async def add_tokens_to_db(
         )
     except IntegrityError as error:
         raise NotFoundError("User") from error
+
+    # Delivered on commit, so the other processes drop their cached tokens.
+    await session.execute(select(func.pg_notify(TOKEN_CHANNEL, str(user_id))))
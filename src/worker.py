@@ -0,0 +1,50 @@
+"""Index job worker entry point.
+
+The worker runs the index jobs queued by the API, without serving HTTP
+requests. Any number of workers can run next to each other on one or more
+nodes, since the jobs and their files are claimed with row locks.
+
+Usage:
+    python -m src.worker
+"""
+
+import asyncio
+import logging
+import signal
+
+from src.core import configuration
+from src.lifecycle import background_services
+
+logger = logging.getLogger(__name__)
+
+
+async def run_worker() -> None:
+    """Run the index jobs until the process is interrupted or terminated.
+
+    Returns:
+        None.
+    """
+    stopping: asyncio.Event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for stop_signal in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(stop_signal, stopping.set)
+    async with background_services(job_workers=max(configuration.INDEX.JOB_WORKERS, 1)):
+        logger.info("Index job worker started.")
+        try:
+            await stopping.wait()
+        finally:
+            logger.info("Index job worker stopping.")
+
+
+def main() -> None:
+    """Run the index job worker.
+
+    Returns:
+        None.
+    """
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_worker())
+
+
+if __name__ == "__main__":
+    main()
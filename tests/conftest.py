@@ -7,9 +7,19 @@ from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.main import app
+from src.service.cache import user_id_cache
 from .database import session_manager
 
 
+@pytest.fixture(autouse=True)
+def clear_user_id_cache():
+    # The cache is global to the process, so the IDs cached by a test must
+    # not be seen by the next ones.
+    user_id_cache.clear()
+    yield
+    user_id_cache.clear()
+
+
 @pytest.fixture(scope="function")
 async def db_session() -> AsyncGenerator[AsyncSession, None]:
     async with session_manager.get_session() as session:
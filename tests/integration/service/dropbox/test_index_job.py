@@ -0,0 +1,161 @@
+"""Integration tests for the claims of the index jobs and their files."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from src.core import configuration
+from src.database.session import database_session_manager
+from src.models import IndexJob, IndexJobFile
+from src.schemas.index_job import IndexFileStatus, IndexJobStatus
+from src.service.dropbox.index_job import IndexJobService
+
+USER_ID: int = 2
+
+
+@pytest.fixture
+async def pending_jobs():
+    # The claims run in their own committed transactions, so the jobs are
+    # committed too and deleted after the test.
+    async with database_session_manager.get_session() as session:
+        jobs = [
+            IndexJob(user_id=USER_ID, resource_id=f"id:{index}") for index in range(2)
+        ]
+        session.add_all(jobs)
+    yield jobs
+    async with database_session_manager.get_session() as session:
+        await session.execute(delete(IndexJob).where(IndexJob.user_id == USER_ID))
+
+
+@pytest.fixture
+async def pending_files(pending_jobs):
+    async with database_session_manager.get_session() as session:
+        files = [
+            IndexJobFile(job_id=pending_jobs[0].id, resource_id=f"id:file{index}")
+            for index in range(5)
+        ]
+        session.add_all(files)
+    return files
+
+
+@pytest.fixture
+def index_job_service():
+    return IndexJobService(session_manager=database_session_manager)
+
+
+class TestClaimJob:
+    async def test_should_skip_job_locked_by_other_worker(
+        self, pending_jobs, index_job_service
+    ):
+        async with database_session_manager.get_session() as session:
+            await session.execute(
+                select(IndexJob)
+                .where(IndexJob.id == pending_jobs[0].id)
+                .with_for_update()
+            )
+
+            job = await index_job_service._claim_job()
+
+        assert job.id == pending_jobs[1].id
+        assert job.status == IndexJobStatus.RUNNING
+
+    async def test_should_claim_each_job_once_concurrently(
+        self, pending_jobs, index_job_service
+    ):
+        jobs = await asyncio.gather(*(index_job_service._claim_job() for _ in range(4)))
+
+        claimed_ids = [job.id for job in jobs if job is not None]
+        assert sorted(claimed_ids) == sorted(job.id for job in pending_jobs)
+        async with database_session_manager.get_session() as session:
+            statuses = (
+                await session.execute(
+                    select(IndexJob.status).where(IndexJob.user_id == USER_ID)
+                )
+            ).scalars()
+            assert set(statuses) == {IndexJobStatus.RUNNING}
+
+    async def test_should_keep_live_files_of_reclaimed_job(
+        self, pending_files, index_job_service
+    ):
+        job_id = pending_files[0].job_id
+        long_ago = datetime.now(tz=timezone.utc) - timedelta(days=1)
+        live, stale, indexed = (
+            pending_files[0].id,
+            pending_files[1].id,
+            pending_files[2].id,
+        )
+        async with database_session_manager.get_session() as session:
+            await session.execute(
+                update(IndexJobFile)
+                .where(IndexJobFile.id == live)
+                .values(status=IndexFileStatus.RUNNING)
+            )
+            await session.execute(
+                update(IndexJobFile)
+                .where(IndexJobFile.id == stale)
+                .values(status=IndexFileStatus.RUNNING, updated_at=long_ago)
+            )
+            await session.execute(
+                update(IndexJobFile)
+                .where(IndexJobFile.id == indexed)
+                .values(status=IndexFileStatus.INDEXED)
+            )
+            await session.execute(
+                update(IndexJob)
+                .where(IndexJob.user_id == USER_ID)
+                .where(IndexJob.id != job_id)
+                .values(status=IndexJobStatus.SUCCEEDED)
+            )
+            await session.execute(
+                update(IndexJob)
+                .where(IndexJob.id == job_id)
+                .values(
+                    status=IndexJobStatus.RUNNING,
+                    indexed_files=4,
+                    updated_at=long_ago,
+                )
+            )
+
+        job = await index_job_service._claim_job()
+
+        assert job.id == job_id
+        assert job.indexed_files == 1
+        async with database_session_manager.get_session() as session:
+            statuses = dict(
+                (
+                    await session.execute(
+                        select(IndexJobFile.id, IndexJobFile.status).where(
+                            IndexJobFile.job_id == job_id
+                        )
+                    )
+                ).all()
+            )
+        assert statuses[live] == IndexFileStatus.RUNNING
+        assert statuses[stale] == IndexFileStatus.PENDING
+        assert statuses[indexed] == IndexFileStatus.INDEXED
+        assert len(statuses) == len(pending_files)
+
+
+class TestClaimFiles:
+    async def test_should_claim_each_file_once_concurrently(
+        self, mocker, pending_files, index_job_service
+    ):
+        mocker.patch.object(configuration.INDEX, "JOB_FILE_BATCH_SIZE", 2)
+
+        batches = await asyncio.gather(
+            *(index_job_service._claim_files() for _ in range(4))
+        )
+
+        claimed_ids = [file.id for batch in batches for file in batch]
+        assert sorted(claimed_ids) == sorted(file.id for file in pending_files)
+        async with database_session_manager.get_session() as session:
+            statuses = (
+                await session.execute(
+                    select(IndexJobFile.status).where(
+                        IndexJobFile.job_id == pending_files[0].job_id
+                    )
+                )
+            ).scalars()
+            assert set(statuses) == {IndexFileStatus.RUNNING}
@@ -0,0 +1,56 @@
+"""Integration tests for the cache of the chunks of the parsed files."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import delete, select
+
+from src.database.session import database_session_manager
+from src.models import ParsedContent
+from src.service.chunk_cache import ChunkCache
+
+CONTENT_HASH: str = "integration-test-hash"
+
+
+@pytest.fixture
+async def chunk_cache():
+    # The cache commits its own transactions, so its rows are deleted after
+    # the test.
+    yield ChunkCache(session_manager=database_session_manager, enabled=True)
+    async with database_session_manager.get_session() as session:
+        await session.execute(
+            delete(ParsedContent).where(ParsedContent.content_hash == CONTENT_HASH)
+        )
+
+
+class TestChunkCache:
+    async def test_should_keep_one_row_on_concurrent_set(self, chunk_cache):
+        await asyncio.gather(
+            chunk_cache.set(content_hash=CONTENT_HASH, version="v1", chunks=["a"]),
+            chunk_cache.set(content_hash=CONTENT_HASH, version="v1", chunks=["b"]),
+        )
+        await chunk_cache.set(content_hash=CONTENT_HASH, version="v1", chunks=["c"])
+
+        async with database_session_manager.get_session() as session:
+            rows = list(
+                (
+                    await session.execute(
+                        select(ParsedContent).where(
+                            ParsedContent.content_hash == CONTENT_HASH
+                        )
+                    )
+                ).scalars()
+            )
+        assert len(rows) == 1
+        assert rows[0].chunks in (["a"], ["b"])
+        assert (
+            await chunk_cache.get(content_hash=CONTENT_HASH, version="v1")
+            == rows[0].chunks
+        )
+
+    async def test_should_keep_one_row_per_version(self, chunk_cache):
+        await chunk_cache.set(content_hash=CONTENT_HASH, version="v1", chunks=["a"])
+        await chunk_cache.set(content_hash=CONTENT_HASH, version="v2", chunks=["b"])
+
+        assert await chunk_cache.get(content_hash=CONTENT_HASH, version="v1") == ["a"]
+        assert await chunk_cache.get(content_hash=CONTENT_HASH, version="v2") == ["b"]
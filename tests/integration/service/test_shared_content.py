@@ -0,0 +1,82 @@
+"""Integration tests for the garbage collection of the shared contents."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, select
+
+from src.database import AsyncVectorDB
+from src.database.base_vector_db import SHARED_TENANT
+from src.database.session import database_session_manager
+from src.models import IndexedResource, SharedContent
+from src.service.shared_content import SharedContents
+
+from tests import mock_async_func_generator
+
+USER_ID: int = 1
+REFERENCED_HASH: str = "integration-test-referenced"
+UNREFERENCED_HASH: str = "integration-test-unreferenced"
+RECENT_HASH: str = "integration-test-recent"
+CONTENT_HASHES: list[str] = [REFERENCED_HASH, UNREFERENCED_HASH, RECENT_HASH]
+
+
+@pytest.fixture
+async def shared_content_rows():
+    # The collection commits its own transactions, so the rows are committed
+    # too and deleted after the test.
+    used_long_ago = datetime.now(tz=timezone.utc) - timedelta(days=2)
+    async with database_session_manager.get_session() as session:
+        session.add_all(
+            [
+                SharedContent(content_hash=REFERENCED_HASH, used_at=used_long_ago),
+                SharedContent(content_hash=UNREFERENCED_HASH, used_at=used_long_ago),
+                SharedContent(content_hash=RECENT_HASH),
+                IndexedResource(
+                    user_id=USER_ID,
+                    resource_id="id:integration-test",
+                    content_hash=REFERENCED_HASH,
+                ),
+            ]
+        )
+    yield
+    async with database_session_manager.get_session() as session:
+        await session.execute(
+            delete(IndexedResource).where(
+                IndexedResource.content_hash.in_(CONTENT_HASHES)
+            )
+        )
+        await session.execute(
+            delete(SharedContent).where(SharedContent.content_hash.in_(CONTENT_HASHES))
+        )
+
+
+class TestCollectGarbage:
+    async def test_should_delete_only_unreferenced_contents(
+        self, mocker, shared_content_rows
+    ):
+        delete_resource_objects = mocker.patch.object(
+            AsyncVectorDB,
+            "delete_resource_objects",
+            side_effect=mock_async_func_generator(None),
+        )
+        shared_contents = SharedContents(
+            session_manager=database_session_manager, vector_db=AsyncVectorDB()
+        )
+
+        deleted = await shared_contents.collect_garbage(grace_period=86400)
+
+        assert deleted == 1
+        delete_resource_objects.assert_called_once_with(
+            tenant=SHARED_TENANT, resource_id=UNREFERENCED_HASH
+        )
+        async with database_session_manager.get_session() as session:
+            remaining = set(
+                (
+                    await session.execute(
+                        select(SharedContent.content_hash).where(
+                            SharedContent.content_hash.in_(CONTENT_HASHES)
+                        )
+                    )
+                ).scalars()
+            )
+        assert remaining == {REFERENCED_HASH, RECENT_HASH}
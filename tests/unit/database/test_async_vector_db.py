@@ -0,0 +1,137 @@
+"""Unit tests for asynchronous vector database operations."""
+
+import threading
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import AsyncVectorDB, VectorDB
+from src.database.async_vector_db import CreatedTenants, TenantActivity
+from src.database.base_vector_db import SHARED_TENANT
+from src.database.session import DatabaseSessionManager
+from src.models import TenantUsage
+from src.schemas.query import QueryResult
+
+
+class MockVectorDB(VectorDB):
+    def query(self, tenant: str, query: str, **kwargs) -> list[QueryResult]:
+        return [
+            QueryResult(
+                content=threading.current_thread().name,
+                resource_id="resource-id",
+                name=tenant,
+                path=query,
+            )
+        ]
+
+
+@pytest.fixture
+def session(mocker):
+    session = mocker.MagicMock(spec=AsyncSession)
+    session.execute = mocker.AsyncMock(return_value=mocker.MagicMock())
+    return session
+
+
+@pytest.fixture
+def async_vector_db(mocker, session):
+    session_manager = mocker.MagicMock(spec=DatabaseSessionManager)
+
+    @asynccontextmanager
+    async def get_session():
+        yield session
+
+    session_manager.get_session = get_session
+    return AsyncVectorDB(
+        vector_db=MockVectorDB(),
+        tenant_activity=TenantActivity(),
+        created_tenants=CreatedTenants(),
+        session_manager=session_manager,
+    )
+
+
+def compile_statement(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TestQuery:
+    async def test_should_run_in_thread_pool(self, async_vector_db):
+        result = await async_vector_db.query(tenant="user_1", query="query")
+
+        assert result[0].name == "user_1"
+        assert result[0].path == "query"
+        assert result[0].content.startswith("vector-db")
+
+
+class TestCreateSharedTenant:
+    async def test_should_log_failure_and_create_on_first_use(
+        self, mocker, async_vector_db
+    ):
+        create_tenant = mocker.patch.object(
+            MockVectorDB,
+            "create_tenant",
+            autospec=True,
+            side_effect=[ConnectionError("weaviate down"), None],
+        )
+
+        assert await async_vector_db.create_shared_tenant() is False
+        await async_vector_db.query(tenant=SHARED_TENANT, query="query")
+        await async_vector_db.query(tenant=SHARED_TENANT, query="query")
+        await async_vector_db.query(tenant="user_1", query="query")
+
+        assert create_tenant.call_count == 2
+        assert SHARED_TENANT in async_vector_db.created_tenants
+
+    async def test_should_not_create_again_on_use(self, mocker, async_vector_db):
+        create_tenant = mocker.patch.object(
+            MockVectorDB, "create_tenant", autospec=True
+        )
+        mocker.patch.object(
+            MockVectorDB, "batch_insert_objects", autospec=True, return_value={}
+        )
+
+        assert await async_vector_db.create_shared_tenant() is True
+        await async_vector_db.batch_insert_objects(tenant=SHARED_TENANT, objects=[])
+
+        create_tenant.assert_called_once_with(mocker.ANY, tenant=SHARED_TENANT)
+
+
+class TestDeactivateIdleTenants:
+    async def test_should_record_used_tenants(self, session, async_vector_db):
+        session.execute.return_value.scalars.return_value = []
+        await async_vector_db.query(tenant="user_1", query="query")
+
+        assert await async_vector_db.deactivate_idle_tenants(idle_for=100) == []
+
+        record, select_idle = session.execute.call_args_list
+        assert "ON CONFLICT (tenant) DO UPDATE" in compile_statement(record.args[0])
+        assert record.args[0].compile().params["tenant_m0"] == "user_1"
+        statement = compile_statement(select_idle.args[0])
+        assert "tenant_usages.tenant != %(tenant_1)s" in statement
+        assert "FOR UPDATE SKIP LOCKED" in statement
+
+    async def test_should_deactivate_idle_tenants(
+        self, mocker, session, async_vector_db
+    ):
+        idle_tenant = TenantUsage(tenant="user_1", is_active=True)
+        session.execute.return_value.scalars.return_value = [idle_tenant]
+        deactivate_tenant = mocker.patch.object(
+            MockVectorDB, "deactivate_tenant", autospec=True
+        )
+
+        result = await async_vector_db.deactivate_idle_tenants(idle_for=100)
+
+        assert result == ["user_1"]
+        deactivate_tenant.assert_called_once_with(mocker.ANY, tenant="user_1")
+        assert idle_tenant.is_active is False
+        session.execute.assert_called_once()
+
+    async def test_should_keep_usages_not_recorded(self, session, async_vector_db):
+        session.execute.side_effect = ConnectionError("database down")
+        await async_vector_db.query(tenant="user_1", query="query")
+
+        with pytest.raises(ConnectionError):
+            await async_vector_db.record_tenant_usages()
+
+        assert async_vector_db.tenant_activity.pop_used() == ["user_1"]
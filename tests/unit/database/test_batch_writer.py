@@ -0,0 +1,82 @@
+"""Unit tests for buffered vector database writes."""
+
+import asyncio
+
+import pytest
+
+from src.database import AsyncVectorDB, VectorDB
+from src.database.async_vector_db import TenantActivity
+from src.database.batch_writer import VectorBatchWriter
+from src.schemas.dropbox import DropboxFileMetadata, ResourceType
+from src.schemas.vector_db import VectorObject
+
+
+class MockVectorDB(VectorDB):
+    def batch_insert_objects(
+        self, tenant: str, objects: list[VectorObject]
+    ) -> dict[str, str]:
+        batches.append([obj.content for obj in objects])
+        return {"id:bad": "invalid object"}
+
+
+batches: list[list[str]] = []
+
+
+def resource(resource_id: str) -> DropboxFileMetadata:
+    return DropboxFileMetadata(
+        id=resource_id,
+        name=f"{resource_id}.pdf",
+        type=ResourceType.FILE,
+        path=f"/{resource_id}.pdf",
+    )
+
+
+@pytest.fixture
+def async_vector_db():
+    batches.clear()
+    return AsyncVectorDB(vector_db=MockVectorDB(), tenant_activity=TenantActivity())
+
+
+class TestVectorBatchWriter:
+    async def test_should_flush_at_batch_size(self, async_vector_db):
+        async with VectorBatchWriter(
+            vector_db=async_vector_db,
+            tenant="user_1",
+            batch_size=3,
+            flush_interval=0.01,
+        ) as writer:
+            await asyncio.gather(
+                writer.write(chunks=["a", "b"], resource=resource("id:1")),
+                writer.write(chunks=["c"], resource=resource("id:2")),
+                writer.write(chunks=["d"], resource=resource("id:3")),
+            )
+
+        assert batches == [["a", "b", "c"], ["d"]]
+
+    async def test_should_flush_at_interval(self, async_vector_db):
+        async with VectorBatchWriter(
+            vector_db=async_vector_db,
+            tenant="user_1",
+            batch_size=100,
+            flush_interval=0.01,
+        ) as writer:
+            await writer.write(chunks=["a"], resource=resource("id:1"))
+
+            assert batches == [["a"]]
+
+    async def test_should_report_failures_to_their_file(self, async_vector_db):
+        async with VectorBatchWriter(
+            vector_db=async_vector_db,
+            tenant="user_1",
+            batch_size=2,
+            flush_interval=60,
+        ) as writer:
+            result = await asyncio.gather(
+                writer.write(chunks=["a"], resource=resource("id:1")),
+                writer.write(chunks=["b"], resource=resource("id:bad")),
+                return_exceptions=True,
+            )
+
+        assert result[0] is None
+        assert isinstance(result[1], RuntimeError)
+        assert "invalid object" in str(result[1])
@@ -0,0 +1,221 @@
+"""Unit tests for in-process vector database operations."""
+
+import numpy as np
+import pytest
+
+from src.core import NotFoundError
+from src.database.embedder import HashEmbedder
+from src.database.local_vector_db import LocalVectorDB, LocalVectorStore
+from src.schemas.query import SearchMode
+from src.schemas.vector_db import VectorObject
+
+
+@pytest.fixture
+def local_vector_db(tmp_path):
+    return LocalVectorDB(store=LocalVectorStore(path=str(tmp_path)))
+
+
+def objects(resource_id: str, chunks: list[str]) -> list[VectorObject]:
+    return [
+        VectorObject(
+            content=chunk,
+            resource_id=resource_id,
+            name=f"{resource_id}.pdf",
+            path=f"/{resource_id}.pdf",
+        )
+        for chunk in chunks
+    ]
+
+
+class TestHashEmbedder:
+    def test_should_be_deterministic_and_normalized(self):
+        embedder = HashEmbedder(dimensions=64)
+        first, second, empty = embedder.embed(["Invoice 42", "invoice 42", ""])
+
+        assert np.array_equal(first, second)
+        assert np.isclose(np.linalg.norm(first), 1)
+        assert not empty.any()
+
+
+class TestQuery:
+    def test_ok(self, local_vector_db):
+        local_vector_db.create_tenant(tenant="user_1")
+        local_vector_db.batch_insert_objects(
+            tenant="user_1",
+            objects=objects(
+                "id:1", ["quarterly revenue report", "holiday travel policy"]
+            ),
+        )
+        local_vector_db.batch_insert_objects(
+            tenant="user_1",
+            objects=objects("id:2", ["quarterly revenue growth"]),
+        )
+
+        result = local_vector_db.query(
+            tenant="user_1", query="quarterly revenue report"
+        )
+
+        assert [item.resource_id for item in result] == ["id:1", "id:2"]
+        assert result[0].content == "quarterly revenue report"
+        assert result[0].name == "id:1.pdf"
+        assert result[0].path == "/id:1.pdf"
+        assert result[0].distance < result[1].distance
+
+    def test_should_paginate(self, local_vector_db):
+        local_vector_db.create_tenant(tenant="user_1")
+        local_vector_db.batch_insert_objects(
+            tenant="user_1",
+            objects=objects(
+                "id:1",
+                [
+                    "quarterly revenue",
+                    "quarterly revenue report summary",
+                    "quarterly revenue report",
+                ],
+            ),
+        )
+        query = "quarterly revenue report"
+
+        first = local_vector_db.query(tenant="user_1", query=query, limit=2)
+        second = local_vector_db.query(tenant="user_1", query=query, limit=2, offset=2)
+
+        assert [item.content for item in first + second] == [
+            "quarterly revenue report",
+            "quarterly revenue report summary",
+            "quarterly revenue",
+        ]
+
+    def test_should_filter_resources(self, local_vector_db):
+        local_vector_db.create_tenant(tenant="shared")
+        local_vector_db.batch_insert_objects(
+            tenant="shared", objects=objects("hash:1", ["quarterly revenue report"])
+        )
+        local_vector_db.batch_insert_objects(
+            tenant="shared", objects=objects("hash:2", ["quarterly revenue report"])
+        )
+
+        result = local_vector_db.query(
+            tenant="shared", query="quarterly revenue report", resource_ids=["hash:2"]
+        )
+
+        assert [item.resource_id for item in result] == ["hash:2"]
+        assert (
+            local_vector_db.query(
+                tenant="shared", query="quarterly revenue report", resource_ids=[]
+            )
+            == []
+        )
+
+    def test_should_return_empty_result(self, local_vector_db):
+        local_vector_db.create_tenant(tenant="user_1")
+
+        assert local_vector_db.query(tenant="user_1", query="query") == []
+
+    def test_should_raise_not_found_error(self, local_vector_db):
+        with pytest.raises(NotFoundError):
+            local_vector_db.query(tenant="user_2", query="query")
+
+
+class TestBatchInsertObjects:
+    def test_should_not_duplicate_repeated_inserts(self, local_vector_db):
+        local_vector_db.create_tenant(tenant="user_1")
+        local_vector_db.batch_insert_objects(
+            tenant="user_1",
+            objects=objects("id:1", ["revenue report", "travel policy"]),
+        )
+        local_vector_db.query(tenant="user_1", query="revenue report")
+
+        local_vector_db.batch_insert_objects(
+            tenant="user_1",
+            objects=objects("id:1", ["revenue report", "revenue report"]),
+        )
+        local_vector_db.batch_insert_objects(
+            tenant="user_1", objects=objects("id:2", ["revenue report"])
+        )
+        result = local_vector_db.query(
+            tenant="user_1", query="revenue report", mode=SearchMode.KEYWORD
+        )
+
+        assert sorted((item.resource_id, item.content) for item in result) == [
+            ("id:1", "revenue report"),
+            ("id:2", "revenue report"),
+        ]
+        assert len(local_vector_db.store.score(collection_name="user_1")[0]) == 3
+
+    def test_should_replace_properties_of_repeated_object(self, local_vector_db):
+        local_vector_db.create_tenant(tenant="user_1")
+        [old] = objects("id:1", ["revenue report"])
+        local_vector_db.batch_insert_objects(tenant="user_1", objects=[old])
+
+        new = old.model_copy(update={"name": "new.pdf", "path": "/new.pdf"})
+        local_vector_db.batch_insert_objects(tenant="user_1", objects=[new])
+        result = local_vector_db.query(tenant="user_1", query="revenue report")
+
+        assert [(item.name, item.path) for item in result] == [("new.pdf", "/new.pdf")]
+
+
+class TestDeleteResourceObjects:
+    def test_ok(self, local_vector_db):
+        local_vector_db.create_tenant(tenant="user_1")
+        local_vector_db.batch_insert_objects(
+            tenant="user_1", objects=objects("id:1", ["old revenue report"])
+        )
+        local_vector_db.batch_insert_objects(
+            tenant="user_1", objects=objects("id:2", ["revenue report"])
+        )
+        local_vector_db.query(tenant="user_1", query="revenue report")
+
+        local_vector_db.delete_resource_objects(tenant="user_1", resource_id="id:1")
+        local_vector_db.batch_insert_objects(
+            tenant="user_1", objects=objects("id:1", ["new revenue report"])
+        )
+        result = local_vector_db.query(
+            tenant="user_1", query="revenue report", mode=SearchMode.KEYWORD
+        )
+
+        assert sorted(item.content for item in result) == [
+            "new revenue report",
+            "revenue report",
+        ]
+
+
+class TestQueryModes:
+    @pytest.fixture
+    def local_vector_db(self, local_vector_db):
+        local_vector_db.create_tenant(tenant="user_1")
+        local_vector_db.batch_insert_objects(
+            tenant="user_1",
+            objects=objects(
+                "id:1", ["invoice INV-2041 was paid", "our travel policy for employees"]
+            ),
+        )
+        local_vector_db.batch_insert_objects(
+            tenant="user_1",
+            objects=objects("id:2", ["employees may book economy travel"]),
+        )
+        return local_vector_db
+
+    def test_keyword(self, local_vector_db):
+        result = local_vector_db.query(
+            tenant="user_1", query="INV-2041", mode=SearchMode.KEYWORD
+        )
+
+        assert [item.resource_id for item in result] == ["id:1"]
+        assert result[0].content == "invoice INV-2041 was paid"
+        assert result[0].score > 0
+
+    def test_keyword_should_rank_by_bm25(self, local_vector_db):
+        result = local_vector_db.query(
+            tenant="user_1", query="travel employees book", mode=SearchMode.KEYWORD
+        )
+
+        assert [item.resource_id for item in result] == ["id:2", "id:1"]
+
+    def test_hybrid(self, local_vector_db):
+        result = local_vector_db.query(
+            tenant="user_1", query="2041", mode=SearchMode.HYBRID, alpha=0.25
+        )
+
+        assert [item.resource_id for item in result] == ["id:1"]
+        assert result[0].content == "invoice INV-2041 was paid"
+        assert result[0].score > 0
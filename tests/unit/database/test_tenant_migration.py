@@ -0,0 +1,127 @@
+"""Unit tests for the migration of the user collections to tenants."""
+
+import sys
+from contextlib import contextmanager
+
+import pytest
+
+from src.database import tenant_migration
+from src.database.vector_db import VectorDB
+
+
+@pytest.fixture
+def source_objects(mocker):
+    return [
+        mocker.MagicMock(properties={"text": text}, uuid=uuid, vector=[0.1 * uuid])
+        for uuid, text in enumerate(["a", "b"])
+    ]
+
+
+@pytest.fixture
+def client(mocker, source_objects):
+    client = mocker.MagicMock()
+    client.collections.get.return_value.iterator.return_value = source_objects
+    client.collections.list_all.return_value = {
+        "user_1": mocker.MagicMock(),
+        "user_admin": mocker.MagicMock(),
+        "Resource": mocker.MagicMock(),
+    }
+    return client
+
+
+@pytest.fixture
+def collection(mocker):
+    collection = mocker.MagicMock()
+    collection.tenants.exists.return_value = False
+    collection.with_tenant.return_value.batch.failed_objects = []
+    return collection
+
+
+@pytest.fixture
+def vector_db(mocker, client, collection):
+    @contextmanager
+    def connect():
+        yield client
+
+    mocker.patch.object(VectorDB, "get_or_create_collection", return_value=collection)
+    mocker.patch.object(VectorDB, "connect", side_effect=connect)
+    return VectorDB()
+
+
+class TestMigrateCollection:
+    def test_should_copy_objects_into_new_tenant(
+        self, client, collection, vector_db, source_objects
+    ):
+        count = tenant_migration.migrate_collection(
+            client=client, vector_db=vector_db, collection_name="user_1"
+        )
+
+        assert count == 2
+        collection.tenants.create.assert_called_once()
+        assert collection.tenants.create.call_args.args[0].name == "user_1"
+        collection.with_tenant.assert_called_once_with("user_1")
+        client.collections.get.assert_called_once_with(name="user_1")
+        client.collections.get.return_value.iterator.assert_called_once_with(
+            include_vector=True
+        )
+        batch = collection.with_tenant.return_value.batch.dynamic.return_value
+        assert [
+            call.kwargs for call in batch.__enter__.return_value.add_object.mock_calls
+        ] == [
+            {"properties": obj.properties, "uuid": obj.uuid, "vector": obj.vector}
+            for obj in source_objects
+        ]
+
+    def test_should_reuse_existing_tenant(self, client, collection, vector_db):
+        collection.tenants.exists.return_value = True
+
+        tenant_migration.migrate_collection(
+            client=client, vector_db=vector_db, collection_name="user_1"
+        )
+
+        collection.tenants.create.assert_not_called()
+
+    def test_should_raise_if_objects_failed(
+        self, mocker, client, collection, vector_db
+    ):
+        collection.with_tenant.return_value.batch.failed_objects = [mocker.MagicMock()]
+
+        with pytest.raises(RuntimeError, match="1 objects of user_1"):
+            tenant_migration.migrate_collection(
+                client=client, vector_db=vector_db, collection_name="user_1"
+            )
+
+
+class TestMigrate:
+    def test_should_migrate_user_collections_only(self, mocker, client, vector_db):
+        migrate_collection = mocker.patch.object(
+            tenant_migration, "migrate_collection", return_value=2
+        )
+        close = mocker.patch.object(VectorDB().client_manager, "close")
+
+        tenant_migration.migrate()
+
+        assert [
+            call.kwargs["collection_name"] for call in migrate_collection.mock_calls
+        ] == ["user_1"]
+        client.collections.delete.assert_not_called()
+        close.assert_called_once()
+
+    def test_should_delete_migrated_collections(self, mocker, client, vector_db):
+        mocker.patch.object(tenant_migration, "migrate_collection", return_value=2)
+        mocker.patch.object(VectorDB().client_manager, "close")
+
+        tenant_migration.migrate(delete=True)
+
+        client.collections.delete.assert_called_once_with("user_1")
+
+
+class TestMain:
+    @pytest.mark.parametrize("arguments, delete", [([], False), (["--delete"], True)])
+    def test_should_migrate_from_command_line(self, mocker, arguments, delete):
+        migrate = mocker.patch.object(tenant_migration, "migrate")
+        mocker.patch.object(sys, "argv", ["tenant_migration", *arguments])
+
+        tenant_migration.main()
+
+        migrate.assert_called_once_with(delete=delete)
@@ -0,0 +1,72 @@
+"""Unit tests for vector database client manager."""
+
+import pytest
+from weaviate.exceptions import WeaviateConnectionError
+
+from src.database.vector_db_client import VectorDBClientManager
+
+
+@pytest.fixture
+def client_manager():
+    return VectorDBClientManager(
+        host="localhost",
+        api_key="api-key",
+        cohere_key="cohere-key",
+        pool_connections=1,
+        pool_maxsize=1,
+        health_check_interval=30,
+    )
+
+
+@pytest.fixture
+def connect_to_wcs(mocker):
+    return mocker.patch("src.database.vector_db_client.connect_to_wcs")
+
+
+class TestGetClient:
+    def test_should_reuse_client(self, client_manager, connect_to_wcs):
+        first = client_manager.get_client()
+        second = client_manager.get_client()
+
+        assert first is second
+        assert connect_to_wcs.call_count == 1
+        first.is_ready.assert_not_called()
+
+    def test_should_reconnect_unhealthy_client(self, client_manager, connect_to_wcs):
+        client = client_manager.get_client()
+        client.is_ready.return_value = False
+        client_manager.invalidate()
+
+        client_manager.get_client()
+
+        client.close.assert_called_once()
+        assert connect_to_wcs.call_count == 2
+
+    def test_should_keep_healthy_client(self, client_manager, connect_to_wcs):
+        client = client_manager.get_client()
+        client.is_ready.return_value = True
+        client_manager.invalidate()
+
+        assert client_manager.get_client() is client
+        assert connect_to_wcs.call_count == 1
+
+
+class TestConnect:
+    def test_should_not_raise_if_unreachable(self, client_manager, connect_to_wcs):
+        connect_to_wcs.side_effect = WeaviateConnectionError("unreachable")
+
+        client_manager.connect()
+
+        connect_to_wcs.side_effect = None
+        client_manager.get_client()
+        assert connect_to_wcs.call_count == 2
+
+
+class TestClose:
+    def test_ok(self, client_manager, connect_to_wcs):
+        client = client_manager.get_client()
+
+        client_manager.close()
+        client_manager.close()
+
+        client.close.assert_called_once()
@@ -4,10 +4,16 @@ from datetime import datetime, timezone
 
 import pytest
 
-from src.core import InvalidInputError
+from src.core import (
+    InvalidInputError,
+    ServiceUnavailableError,
+    TooManyRequestsError,
+    configuration,
+)
 from src.schemas.dropbox import DropboxAuthToken
 from src.service.utils import HttpResponse
 from src.service.dropbox.handler import DropboxHandler
+from src.service.limiter import AdaptiveLimiter
 
 
 @pytest.fixture
@@ -90,3 +96,158 @@ class TestGetAccessAndRefreshToken:
             await dropbox_handler.get_access_and_refresh_token(code="invalid-code")
 
         assert str(error.value) == "Invalid Code!"
+
+
+def list_folder_page(entries, cursor, has_more):
+    return HttpResponse(
+        data={"entries": entries, "cursor": cursor, "has_more": has_more},
+        status=200,
+        ok=True,
+    )
+
+
+def rate_limited(retry_after="0"):
+    return HttpResponse(
+        data={}, status=429, ok=False, headers={"retry-after": retry_after}
+    )
+
+
+@pytest.fixture
+def limiter():
+    return AdaptiveLimiter(initial=1, minimum=1, maximum=1)
+
+
+def file_entry(resource_id):
+    return {
+        ".tag": "file",
+        "id": resource_id,
+        "name": f"{resource_id}.pdf",
+        "path_lower": f"/folder/{resource_id}.pdf",
+        "rev": "1",
+        "content_hash": "hash",
+        "size": 10,
+    }
+
+
+class TestListFolder:
+    async def test_should_fetch_all_pages(self, mocker, dropbox_handler):
+        send_http_request = mocker.patch(
+            "src.service.dropbox.handler.send_http_request",
+            side_effect=[
+                list_folder_page([file_entry("id:1")], "cursor-1", True),
+                list_folder_page([file_entry("id:2")], "cursor-2", False),
+            ],
+        )
+
+        result = await dropbox_handler.list_folder(
+            access_token="access-token", path="/folder", recursive=True
+        )
+
+        assert [entry.id for entry in result.entries] == ["id:1", "id:2"]
+        assert result.cursor == "cursor-2"
+        assert send_http_request.call_args.args[0].endswith("list_folder/continue")
+        assert send_http_request.call_args.kwargs["body"] == '{"cursor": "cursor-1"}'
+
+    async def test_should_raise_invalid_input_error(self, mocker, dropbox_handler):
+        mocker.patch(
+            "src.service.dropbox.handler.send_http_request",
+            return_value=HttpResponse(data={}, status=409, ok=False),
+        )
+        with pytest.raises(InvalidInputError):
+            await dropbox_handler.list_folder(access_token="access-token", path="/x")
+
+    async def test_should_raise_too_many_requests_error(self, mocker, dropbox_handler):
+        mocker.patch(
+            "src.service.dropbox.handler.send_http_request",
+            return_value=rate_limited(retry_after="30"),
+        )
+
+        with pytest.raises(TooManyRequestsError) as error:
+            await dropbox_handler.list_folder(access_token="access-token", path="/x")
+
+        assert error.value.retry_after == 30
+
+    async def test_should_retry_rate_limited_pages(
+        self, mocker, dropbox_handler, limiter
+    ):
+        send_http_request = mocker.patch(
+            "src.service.dropbox.handler.send_http_request",
+            side_effect=[
+                rate_limited(),
+                list_folder_page([file_entry("id:1")], "cursor-1", True),
+                rate_limited(),
+                list_folder_page([file_entry("id:2")], "cursor-2", False),
+            ],
+        )
+
+        result = await dropbox_handler.list_folder(
+            access_token="access-token", path="/folder", limiter=limiter
+        )
+
+        assert [entry.id for entry in result.entries] == ["id:1", "id:2"]
+        assert send_http_request.call_count == 4
+
+    async def test_should_raise_service_unavailable_error(
+        self, mocker, dropbox_handler, limiter
+    ):
+        mocker.patch.object(configuration.INDEX, "DOWNLOAD_MAX_RETRIES", 0)
+        mocker.patch(
+            "src.service.dropbox.handler.send_http_request",
+            return_value=HttpResponse(data={}, status=503, ok=False),
+        )
+
+        with pytest.raises(ServiceUnavailableError):
+            await dropbox_handler.list_folder(
+                access_token="access-token", path="/x", limiter=limiter
+            )
+
+
+class TestListFolderChanges:
+    async def test_ok(self, mocker, dropbox_handler):
+        mocker.patch(
+            "src.service.dropbox.handler.send_http_request",
+            return_value=list_folder_page(
+                [
+                    file_entry("id:1"),
+                    {".tag": "deleted", "name": "old.pdf", "path_lower": "/old.pdf"},
+                ],
+                "cursor-2",
+                False,
+            ),
+        )
+
+        result = await dropbox_handler.list_folder_changes(
+            access_token="access-token", cursor="cursor-1"
+        )
+
+        assert [entry.id for entry in result.entries] == ["id:1"]
+        assert result.entries[0].content_hash == "hash"
+        assert result.deleted_paths == ["/old.pdf"]
+        assert result.cursor == "cursor-2"
+
+    async def test_should_return_none_if_cursor_is_reset(self, mocker, dropbox_handler):
+        mocker.patch(
+            "src.service.dropbox.handler.send_http_request",
+            return_value=HttpResponse(data={}, status=409, ok=False),
+        )
+
+        assert (
+            await dropbox_handler.list_folder_changes(
+                access_token="access-token", cursor="cursor-1"
+            )
+            is None
+        )
+
+    async def test_should_raise_after_retries(self, mocker, dropbox_handler, limiter):
+        mocker.patch.object(configuration.INDEX, "DOWNLOAD_MAX_RETRIES", 1)
+        send_http_request = mocker.patch(
+            "src.service.dropbox.handler.send_http_request",
+            return_value=rate_limited(),
+        )
+
+        with pytest.raises(TooManyRequestsError):
+            await dropbox_handler.list_folder_changes(
+                access_token="access-token", cursor="cursor-1", limiter=limiter
+            )
+
+        assert send_http_request.call_count == 2
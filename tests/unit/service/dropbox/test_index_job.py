@@ -0,0 +1,313 @@
+"""Unit tests for dropbox index job service."""
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.session import DatabaseSessionManager
+from src.core import NotFoundError
+from src.models import IndexJob, IndexJobFile
+from src.schemas.dropbox import (
+    DropboxFileMetadata,
+    DropboxFolderListing,
+    ResourceType,
+)
+from src.schemas.index_job import IndexFileStatus, IndexJobSchema, IndexJobStatus
+from src.service.dropbox.index_job import IndexJobProgress, IndexJobService
+from src.service.dropbox.resource_index import ResourceIndexService
+
+from tests import mock_async_func_generator
+
+
+def resource(resource_id: str, size: int) -> DropboxFileMetadata:
+    return DropboxFileMetadata(
+        id=resource_id,
+        name=f"{resource_id}.pdf",
+        type=ResourceType.FILE,
+        path=f"/{resource_id}.pdf",
+        size=size,
+    )
+
+
+@pytest.fixture
+def session(mocker):
+    session = mocker.MagicMock(spec=AsyncSession)
+    session.execute = mocker.AsyncMock(return_value=mocker.MagicMock())
+    return session
+
+
+@pytest.fixture
+def session_manager(mocker, session):
+    session_manager = mocker.MagicMock(spec=DatabaseSessionManager)
+
+    @asynccontextmanager
+    async def get_session():
+        yield session
+
+    session_manager.get_session = get_session
+    return session_manager
+
+
+class TestIndexJobSchema:
+    def test_should_compute_throughput(self):
+        started_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        job = IndexJobSchema(
+            id=1,
+            resource_id="id:folder",
+            status=IndexJobStatus.SUCCEEDED,
+            indexed_files=6,
+            unchanged_files=3,
+            failed_files=1,
+            indexed_bytes=1000,
+            created_at=started_at,
+            started_at=started_at,
+            finished_at=started_at + timedelta(seconds=10),
+        )
+
+        assert job.files_per_second == 1.0
+        assert job.bytes_per_second == 100.0
+
+    def test_should_not_compute_throughput_of_pending_job(self):
+        job = IndexJobSchema(
+            id=1,
+            resource_id="id:folder",
+            status=IndexJobStatus.PENDING,
+            created_at=datetime.now(tz=timezone.utc),
+        )
+
+        assert job.files_per_second is None
+        assert job.bytes_per_second is None
+
+
+def job_file(file_id: int, job_id: int, resource_id: str) -> IndexJobFile:
+    return IndexJobFile(
+        id=file_id,
+        job_id=job_id,
+        resource_id=resource_id,
+        name=f"{resource_id}.pdf",
+        path=f"/{resource_id}.pdf",
+        size=10,
+    )
+
+
+class TestIndexJobProgress:
+    async def test_should_save_outcomes_and_counters(self, session, session_manager):
+        progress = IndexJobProgress(
+            files=[
+                job_file(1, 1, "id:1"),
+                job_file(2, 1, "id:2"),
+                job_file(3, 2, "id:3"),
+            ],
+            session_manager=session_manager,
+        )
+        progress.reporter(job_id=1)(resource("id:1", 10), IndexFileStatus.INDEXED, None)
+        progress.reporter(job_id=1)(
+            resource("id:2", 20), IndexFileStatus.SKIPPED, "Unsupported file type"
+        )
+        progress.reporter(job_id=2)(
+            resource("id:3", 30), IndexFileStatus.FAILED, "error"
+        )
+
+        await progress.flush()
+
+        outcomes = session.execute.call_args_list[0].args[1]
+        assert outcomes == [
+            {"id": 1, "status": IndexFileStatus.INDEXED, "error": None},
+            {
+                "id": 2,
+                "status": IndexFileStatus.SKIPPED,
+                "error": "Unsupported file type",
+            },
+            {"id": 3, "status": IndexFileStatus.FAILED, "error": "error"},
+        ]
+        job_1_values = session.execute.call_args_list[1].args[0].compile().params
+        assert job_1_values["indexed_files_1"] == 1
+        assert job_1_values["skipped_files_1"] == 1
+        assert job_1_values["indexed_bytes_1"] == 10
+        assert len(session.execute.call_args_list) == 3
+
+    def test_should_fail_unreported_files_of_job(self, session_manager):
+        progress = IndexJobProgress(
+            files=[job_file(1, 1, "id:1"), job_file(2, 1, "id:2")],
+            session_manager=session_manager,
+        )
+        progress.reporter(job_id=1)(
+            resource("id:1", 10), IndexFileStatus.UNCHANGED, None
+        )
+
+        progress.fail_unreported(job_id=1, error="token not found")
+
+        assert progress._outcomes == [
+            {"id": 1, "status": IndexFileStatus.UNCHANGED, "error": None},
+            {"id": 2, "status": IndexFileStatus.FAILED, "error": "token not found"},
+        ]
+
+
+class TestIndexJobService:
+    @pytest.fixture
+    def index_job_service(self, session_manager):
+        return IndexJobService(session_manager=session_manager)
+
+    async def test_should_not_list_without_pending_job(self, mocker, index_job_service):
+        mocker.patch.object(
+            IndexJobService, "_claim_job", side_effect=mock_async_func_generator(None)
+        )
+        list_resource = mocker.patch.object(
+            ResourceIndexService, "list_resource", autospec=True
+        )
+
+        assert await index_job_service.list_next_job() is False
+        list_resource.assert_not_called()
+
+    async def test_should_queue_files_of_pages(self, mocker, index_job_service):
+        mocker.patch.object(
+            IndexJobService,
+            "_claim_job",
+            side_effect=mock_async_func_generator(
+                IndexJob(id=1, user_id=2, resource_id="id:folder")
+            ),
+        )
+
+        async def pages():
+            yield DropboxFolderListing(
+                entries=[
+                    resource("id:1", 10),
+                    DropboxFileMetadata(
+                        id="id:sub", name="sub", type=ResourceType.FOLDER
+                    ),
+                ],
+                cursor="cursor-1",
+            )
+            yield DropboxFolderListing(
+                entries=[resource("id:2", 20)], cursor="cursor-2"
+            )
+
+        mocker.patch.object(
+            ResourceIndexService,
+            "list_resource",
+            side_effect=mock_async_func_generator(
+                (
+                    DropboxFileMetadata(
+                        id="id:folder", name="folder", type=ResourceType.FOLDER
+                    ),
+                    pages(),
+                )
+            ),
+        )
+        queue_files = mocker.patch.object(
+            IndexJobService,
+            "_queue_files",
+            side_effect=mock_async_func_generator(None),
+        )
+        finish_job = mocker.patch.object(
+            IndexJobService,
+            "_finish_job_if_done",
+            side_effect=mock_async_func_generator(None),
+        )
+
+        assert await index_job_service.list_next_job() is True
+
+        assert [
+            [resource.id for resource in call.kwargs["resources"]]
+            for call in queue_files.call_args_list
+        ] == [["id:1"], ["id:2"]]
+        finish_job.assert_called_once_with(job_id=1)
+
+    async def test_should_index_claimed_files_by_job(self, mocker, index_job_service):
+        mocker.patch.object(
+            IndexJobService,
+            "_claim_files",
+            side_effect=mock_async_func_generator(
+                [job_file(1, 1, "id:1"), job_file(2, 2, "id:2")]
+            ),
+        )
+        mocker.patch.object(
+            IndexJobService,
+            "_get_user_ids",
+            side_effect=mock_async_func_generator({1: 10, 2: 20}),
+        )
+
+        async def index_files(user_id, resources, report):
+            if user_id == 20:
+                raise NotFoundError("Dropbox tokens")
+            report(resources[0], IndexFileStatus.INDEXED, None)
+
+        mocker.patch.object(
+            ResourceIndexService, "index_files", side_effect=index_files
+        )
+        flush = mocker.patch.object(IndexJobProgress, "flush", autospec=True)
+        finish_job = mocker.patch.object(
+            IndexJobService,
+            "_finish_job_if_done",
+            side_effect=mock_async_func_generator(None),
+        )
+
+        assert await index_job_service.index_next_files() is True
+
+        assert flush.call_args.args[0]._outcomes == [
+            {"id": 1, "status": IndexFileStatus.INDEXED, "error": None},
+            {
+                "id": 2,
+                "status": IndexFileStatus.FAILED,
+                "error": "Dropbox Tokens not found!",
+            },
+        ]
+        assert [call.kwargs["job_id"] for call in finish_job.call_args_list] == [1, 2]
+
+    async def test_should_keep_live_files_of_reclaimed_job(
+        self, mocker, session, index_job_service
+    ):
+        job = IndexJob(
+            id=1,
+            user_id=2,
+            resource_id="id:folder",
+            status=IndexJobStatus.RUNNING,
+            indexed_files=5,
+            failed_files=3,
+        )
+        claim = mocker.MagicMock()
+        claim.scalar_one_or_none.return_value = job
+        session.execute.side_effect = [
+            claim,
+            mocker.MagicMock(),
+            [
+                (IndexFileStatus.INDEXED, 2, 30),
+                (IndexFileStatus.SKIPPED, 1, None),
+                (IndexFileStatus.RUNNING, 4, 40),
+            ],
+        ]
+
+        assert await index_job_service._claim_job() is job
+
+        statements = [
+            str(call.args[0].compile(dialect=postgresql.dialect()))
+            for call in session.execute.call_args_list
+        ]
+        assert not any(statement.startswith("DELETE") for statement in statements)
+        assert statements[1].startswith("UPDATE index_job_files")
+        assert "index_job_files.updated_at <" in statements[1]
+        assert (
+            job.indexed_files,
+            job.unchanged_files,
+            job.skipped_files,
+            job.failed_files,
+            job.indexed_bytes,
+        ) == (2, 0, 1, 0, 30)
+
+    async def test_should_not_queue_files_twice(
+        self, mocker, session, index_job_service
+    ):
+        session.execute.return_value.scalars.return_value = ["id:1"]
+
+        await index_job_service._queue_files(
+            job_id=1, resources=[resource("id:1", 10), resource("id:2", 20)]
+        )
+
+        lookup = session.execute.call_args_list[0].args[0]
+        assert lookup.compile().params["resource_ids"] == ["id:1", "id:2"]
+        assert [
+            row["resource_id"] for row in session.execute.call_args_list[1].args[1]
+        ] == ["id:2"]
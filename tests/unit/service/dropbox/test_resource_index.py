@@ -0,0 +1,721 @@
+"""Unit tests for dropbox resource index service."""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core import configuration
+from src.database import AsyncVectorDB
+from src.database.batch_writer import VectorBatchWriter
+from src.database.session import DatabaseSessionManager
+from src.models.indexed_resource import IndexedResource
+from src.schemas.dropbox import (
+    DropboxFileMetadata,
+    DropboxFolderListing,
+    ResourceType,
+)
+from src.schemas.index_job import IndexFileStatus
+from src.schemas.query import QueryResult
+from src.service.cache import QueryCache
+from src.service.chunk_cache import ChunkCache
+from src.service.chunker import (
+    chunk_segments,
+    count_pdf_pages,
+    parse_and_chunk,
+    parse_pdf_pages,
+)
+from src.service.dropbox.handler import DropboxHandler
+from src.service.dropbox.resource_index import ResourceIndexService
+from src.service.limiter import AdaptiveLimiter
+from src.service.process_pool import ProcessPool
+from src.service.shared_content import SharedContents
+
+from tests import mock_async_func_generator
+
+
+@pytest.fixture
+def session(mocker):
+    session = mocker.MagicMock(spec=AsyncSession)
+    session.execute = mocker.AsyncMock(return_value=mocker.MagicMock())
+    return session
+
+
+@pytest.fixture
+def session_manager(mocker, session):
+    session_manager = mocker.MagicMock(spec=DatabaseSessionManager)
+    session_manager.sessions = 0
+
+    @asynccontextmanager
+    async def get_session():
+        session_manager.sessions += 1
+        yield session
+
+    session_manager.get_session = get_session
+    return session_manager
+
+
+@pytest.fixture
+def chunk_cache(session_manager):
+    return ChunkCache(session_manager=session_manager, enabled=False)
+
+
+@pytest.fixture
+def shared_contents(session_manager):
+    return SharedContents(session_manager=session_manager, vector_db=AsyncVectorDB())
+
+
+@pytest.fixture
+def resource_index_service(session_manager, chunk_cache, shared_contents):
+    return ResourceIndexService(
+        session_manager=session_manager,
+        chunk_cache=chunk_cache,
+        shared_contents=shared_contents,
+    )
+
+
+def resource(content_hash: str | None, rev: str | None = None) -> DropboxFileMetadata:
+    return DropboxFileMetadata(
+        id="id:1",
+        name="file.pdf",
+        type=ResourceType.FILE,
+        path="/file.pdf",
+        rev=rev,
+        content_hash=content_hash,
+        size=10,
+    )
+
+
+class TestIsUnchanged:
+    @pytest.mark.parametrize(
+        "indexed_resource, current, expected",
+        [
+            (IndexedResource(content_hash="a", rev="1"), resource("a", "2"), True),
+            (IndexedResource(content_hash="a", rev="1"), resource("b", "1"), False),
+            (IndexedResource(rev="1"), resource(None, "1"), True),
+            (IndexedResource(rev="1"), resource(None, "2"), False),
+            (IndexedResource(), resource("a", "1"), False),
+        ],
+    )
+    def test_ok(self, indexed_resource, current, expected):
+        assert (
+            ResourceIndexService._is_unchanged(
+                indexed_resource=indexed_resource, resource=current
+            )
+            is expected
+        )
+
+
+class TestIsMoved:
+    @pytest.mark.parametrize(
+        "indexed_resource, expected",
+        [
+            (IndexedResource(name="file.pdf", path="/file.pdf"), False),
+            (IndexedResource(name="old.pdf", path="/old.pdf"), True),
+            (IndexedResource(name="file.pdf", path="/folder/file.pdf"), True),
+            (IndexedResource(), True),
+        ],
+    )
+    def test_ok(self, indexed_resource, expected):
+        assert (
+            ResourceIndexService._is_moved(
+                indexed_resource=indexed_resource, resource=resource("a")
+            )
+            is expected
+        )
+
+
+class TestPlanFiles:
+    def test_should_skip_unsupported_and_large_files(self):
+        files = [
+            resource("a"),
+            resource("b").model_copy(update={"id": "id:2", "name": "FILE.PDF"}),
+            resource("c").model_copy(update={"id": "id:3", "name": "movie.mp4"}),
+            resource("d").model_copy(update={"id": "id:4", "name": "README"}),
+            resource("e").model_copy(update={"id": "id:5", "size": 11}),
+            resource("f").model_copy(update={"id": "id:6", "size": None}),
+        ]
+
+        files_to_index, skipped_files = ResourceIndexService._plan_files(
+            resources=files, max_size=10
+        )
+
+        assert [file.id for file in files_to_index] == ["id:1", "id:2", "id:6"]
+        assert [(file.id, reason) for file, reason in skipped_files] == [
+            ("id:3", "Unsupported file type: mp4"),
+            ("id:4", "Unsupported file type: none"),
+            ("id:5", "File larger than 10 bytes: 11"),
+        ]
+
+
+class TestIndexFile:
+    @pytest.fixture
+    def batch_writer(self, mocker):
+        batch_writer = mocker.MagicMock(spec=VectorBatchWriter)
+        batch_writer.tenant = "user_1"
+        batch_writer.write = mocker.AsyncMock()
+        return batch_writer
+
+    @pytest.fixture
+    def shared_batch_writer(self, mocker):
+        shared_batch_writer = mocker.MagicMock(spec=VectorBatchWriter)
+        shared_batch_writer.tenant = "shared"
+        shared_batch_writer.write = mocker.AsyncMock()
+        return shared_batch_writer
+
+    @pytest.fixture
+    def download_mocks(self, mocker):
+        fetch = mocker.patch.object(
+            DropboxHandler,
+            "fetch_pdf_file_content",
+            side_effect=mock_async_func_generator(b"content"),
+        )
+        mocker.patch.object(
+            ProcessPool, "run", side_effect=mock_async_func_generator(["chunk"])
+        )
+        delete = mocker.patch.object(
+            AsyncVectorDB, "delete_resource_objects", autospec=True
+        )
+        return fetch, delete
+
+    async def test_should_skip_unchanged_file(
+        self, mocker, resource_index_service, batch_writer, shared_batch_writer
+    ):
+        fetch = mocker.patch.object(
+            DropboxHandler, "fetch_pdf_file_content", autospec=True
+        )
+
+        file_status = await resource_index_service._index_file(
+            access_token="access-token",
+            resource=resource("a"),
+            indexed_resource=IndexedResource(content_hash="a"),
+            batch_writer=batch_writer,
+            shared_batch_writer=shared_batch_writer,
+            shared_indexings={},
+            download_limiter=AdaptiveLimiter(initial=1, minimum=1, maximum=1),
+        )
+
+        fetch.assert_not_called()
+        batch_writer.write.assert_not_called()
+        assert file_status == IndexFileStatus.UNCHANGED
+
+    async def test_should_replace_objects_of_changed_file(
+        self,
+        mocker,
+        resource_index_service,
+        batch_writer,
+        shared_batch_writer,
+        download_mocks,
+    ):
+        _, delete = download_mocks
+
+        file_status = await resource_index_service._index_file(
+            access_token="access-token",
+            resource=resource(None, "2"),
+            indexed_resource=IndexedResource(rev="1"),
+            batch_writer=batch_writer,
+            shared_batch_writer=shared_batch_writer,
+            shared_indexings={},
+            download_limiter=AdaptiveLimiter(initial=1, minimum=1, maximum=1),
+        )
+
+        delete.assert_called_once_with(mocker.ANY, tenant="user_1", resource_id="id:1")
+        batch_writer.write.assert_called_once_with(
+            chunks=["chunk"], resource=resource(None, "2")
+        )
+        shared_batch_writer.write.assert_not_called()
+        assert file_status == IndexFileStatus.INDEXED
+
+    async def test_should_insert_new_content_in_shared_tenant(
+        self,
+        mocker,
+        resource_index_service,
+        batch_writer,
+        shared_batch_writer,
+        download_mocks,
+    ):
+        _, delete = download_mocks
+        mocker.patch.object(
+            SharedContents, "touch", side_effect=mock_async_func_generator(False)
+        )
+        save = mocker.patch.object(
+            SharedContents, "save", side_effect=mock_async_func_generator(None)
+        )
+
+        file_status = await resource_index_service._index_file(
+            access_token="access-token",
+            resource=resource("b", "2"),
+            indexed_resource=IndexedResource(content_hash="a", rev="1"),
+            batch_writer=batch_writer,
+            shared_batch_writer=shared_batch_writer,
+            shared_indexings={},
+            download_limiter=AdaptiveLimiter(initial=1, minimum=1, maximum=1),
+        )
+
+        shared_batch_writer.write.assert_called_once_with(
+            chunks=["chunk"],
+            resource=resource("b", "2").model_copy(
+                update={"id": "b", "name": "", "path": ""}
+            ),
+        )
+        save.assert_called_once_with(content_hash="b")
+        delete.assert_called_once_with(mocker.ANY, tenant="user_1", resource_id="id:1")
+        batch_writer.write.assert_not_called()
+        assert file_status == IndexFileStatus.INDEXED
+
+    async def test_should_not_download_shared_content(
+        self,
+        mocker,
+        resource_index_service,
+        batch_writer,
+        shared_batch_writer,
+        download_mocks,
+    ):
+        fetch, _ = download_mocks
+        mocker.patch.object(
+            SharedContents, "touch", side_effect=mock_async_func_generator(True)
+        )
+        save = mocker.patch.object(SharedContents, "save")
+
+        file_status = await resource_index_service._index_file(
+            access_token="access-token",
+            resource=resource("b"),
+            indexed_resource=None,
+            batch_writer=batch_writer,
+            shared_batch_writer=shared_batch_writer,
+            shared_indexings={},
+            download_limiter=AdaptiveLimiter(initial=1, minimum=1, maximum=1),
+        )
+
+        fetch.assert_not_called()
+        save.assert_not_called()
+        shared_batch_writer.write.assert_not_called()
+        assert file_status == IndexFileStatus.INDEXED
+
+    async def test_should_insert_shared_content_once_per_job(
+        self,
+        mocker,
+        resource_index_service,
+        batch_writer,
+        shared_batch_writer,
+        download_mocks,
+    ):
+        mocker.patch.object(
+            SharedContents, "touch", side_effect=mock_async_func_generator(False)
+        )
+        mocker.patch.object(
+            SharedContents, "save", side_effect=mock_async_func_generator(None)
+        )
+        shared_indexings = {}
+
+        await asyncio.gather(
+            *(
+                resource_index_service._index_file(
+                    access_token="access-token",
+                    resource=resource("b").model_copy(update={"id": resource_id}),
+                    indexed_resource=None,
+                    batch_writer=batch_writer,
+                    shared_batch_writer=shared_batch_writer,
+                    shared_indexings=shared_indexings,
+                    download_limiter=AdaptiveLimiter(initial=1, minimum=1, maximum=1),
+                )
+                for resource_id in ("id:1", "id:2")
+            )
+        )
+
+        shared_batch_writer.write.assert_called_once()
+        assert list(shared_indexings) == ["b"]
+
+
+class TestGetChunks:
+    async def test_should_not_download_cached_content(
+        self, mocker, chunk_cache, resource_index_service
+    ):
+        chunk_cache.enabled = True
+        get = mocker.patch.object(
+            ChunkCache, "get", side_effect=mock_async_func_generator(["cached"])
+        )
+        fetch = mocker.patch.object(DropboxHandler, "fetch_pdf_file_content")
+
+        chunks = await resource_index_service._get_chunks(
+            access_token="access-token",
+            resource=resource("a"),
+            download_limiter=mocker.MagicMock(spec=AdaptiveLimiter),
+        )
+
+        assert chunks == ["cached"]
+        assert get.call_args.kwargs["content_hash"] == "a"
+        assert get.call_args.kwargs["version"].startswith("PDFParser.1:")
+        fetch.assert_not_called()
+
+    async def test_should_cache_parsed_content(
+        self, mocker, chunk_cache, resource_index_service
+    ):
+        chunk_cache.enabled = True
+        mocker.patch.object(
+            ChunkCache, "get", side_effect=mock_async_func_generator(None)
+        )
+        set_chunks = mocker.patch.object(
+            ChunkCache, "set", side_effect=mock_async_func_generator(None)
+        )
+        mocker.patch.object(
+            DropboxHandler,
+            "fetch_pdf_file_content",
+            side_effect=mock_async_func_generator(b"content"),
+        )
+        mocker.patch.object(
+            ProcessPool, "run", side_effect=mock_async_func_generator(["chunk"])
+        )
+
+        chunks = await resource_index_service._get_chunks(
+            access_token="access-token",
+            resource=resource("a"),
+            download_limiter=AdaptiveLimiter(initial=1, minimum=1, maximum=1),
+        )
+
+        assert chunks == ["chunk"]
+        assert set_chunks.call_args.kwargs["chunks"] == ["chunk"]
+
+
+class TestParseAndChunk:
+    async def test_should_parse_page_ranges_of_large_pdf_in_parallel(
+        self, mocker, resource_index_service
+    ):
+        mocker.patch.object(configuration.INDEX, "PDF_PARALLEL_MIN_SIZE", 4)
+        mocker.patch.object(configuration.INDEX, "PDF_PAGES_PER_TASK", 2)
+        calls = []
+
+        async def run(func, **kwargs):
+            calls.append((func, kwargs))
+            if func is count_pdf_pages:
+                with open(kwargs["path"], "rb") as file:
+                    assert file.read() == b"%PDF-large"
+                return 5
+            if func is parse_pdf_pages:
+                return [
+                    f"page {page}" for page in range(kwargs["start"], kwargs["stop"])
+                ]
+            return kwargs["segments"]
+
+        mocker.patch.object(ProcessPool, "run", side_effect=run)
+
+        chunks = await resource_index_service._parse_and_chunk(
+            content=b"%PDF-large", file_extension="pdf"
+        )
+
+        assert [
+            (kwargs["start"], kwargs["stop"])
+            for func, kwargs in calls
+            if func is parse_pdf_pages
+        ] == [(0, 2), (2, 4), (4, 5)]
+        assert calls[-1][0] is chunk_segments
+        assert chunks == [f"page {page}" for page in range(5)]
+        assert all("content" not in kwargs for _, kwargs in calls[:-1])
+        assert not os.path.exists(calls[0][1]["path"])
+
+    async def test_should_parse_small_files_in_one_task(
+        self, mocker, resource_index_service
+    ):
+        run = mocker.patch.object(
+            ProcessPool, "run", side_effect=mock_async_func_generator(["chunk"])
+        )
+
+        chunks = await resource_index_service._parse_and_chunk(
+            content=b"%PDF", file_extension="pdf"
+        )
+
+        assert chunks == ["chunk"]
+        assert run.call_args.args[0] is parse_and_chunk
+
+
+class TestListResource:
+    async def test_should_remove_deleted_paths_of_pages(
+        self, mocker, session, resource_index_service
+    ):
+        session.execute.return_value.scalar_one_or_none.return_value = None
+        session.execute.return_value.scalars.return_value = []
+        mocker.patch.object(
+            ResourceIndexService,
+            "_get_access_token",
+            side_effect=mock_async_func_generator("access-token"),
+        )
+        folder = DropboxFileMetadata(
+            id="id:folder",
+            name="folder",
+            type=ResourceType.FOLDER,
+            path="/folder",
+        )
+        mocker.patch.object(
+            DropboxHandler,
+            "get_metadata_of_resource",
+            side_effect=mock_async_func_generator(folder),
+        )
+
+        async def pages():
+            yield DropboxFolderListing(
+                entries=[resource("a"), resource("b")],
+                deleted_paths=["/folder/old.pdf"],
+                cursor="cursor-1",
+            )
+            yield DropboxFolderListing(entries=[resource("c")], cursor="cursor-2")
+
+        mocker.patch.object(
+            DropboxHandler,
+            "list_folder_pages",
+            side_effect=mock_async_func_generator(pages()),
+        )
+        remove_deleted_resources = mocker.patch.object(
+            ResourceIndexService,
+            "_remove_deleted_resources",
+            side_effect=mock_async_func_generator(None),
+        )
+
+        metadata, listing = await resource_index_service.list_resource(
+            user_id=1, resource_id="id:folder"
+        )
+        listed_pages = [page async for page in listing]
+
+        assert metadata == folder
+        assert [
+            [entry.content_hash for entry in page.entries] for page in listed_pages
+        ] == [["a", "b"], ["c"], []]
+        assert listed_pages[-1].cursor == "cursor-2"
+        assert remove_deleted_resources.call_args_list[0].kwargs["paths"] == [
+            "/folder/old.pdf"
+        ]
+        statements = [call.args[0] for call in session.execute.call_args_list]
+        marks = [
+            statement.compile().params["resource_ids"]
+            for statement in statements
+            if str(statement).startswith("UPDATE indexed_resource SET listed_at")
+        ]
+        assert marks == [["id:1", "id:1"], ["id:1"]]
+        assert "NOT IN" not in str(statements[-1])
+
+
+class TestIndexFiles:
+    @pytest.fixture
+    def index_file_mocks(self, mocker):
+        mocker.patch.object(
+            ResourceIndexService,
+            "_get_access_token",
+            side_effect=mock_async_func_generator("access-token"),
+        )
+        get_indexed_resources = mocker.patch.object(
+            ResourceIndexService,
+            "_get_indexed_resources",
+            side_effect=mock_async_func_generator(
+                {
+                    "id:1": IndexedResource(
+                        resource_id="id:1",
+                        name="file.pdf",
+                        path="/file.pdf",
+                        content_hash="a",
+                    )
+                }
+            ),
+        )
+        mocker.patch.object(
+            DropboxHandler,
+            "fetch_pdf_file_content",
+            side_effect=mock_async_func_generator(b"content"),
+        )
+        mocker.patch.object(
+            ProcessPool, "run", side_effect=mock_async_func_generator(["chunk"])
+        )
+        mocker.patch.object(
+            AsyncVectorDB,
+            "delete_resource_objects",
+            side_effect=mock_async_func_generator(None),
+        )
+        mocker.patch.object(
+            VectorBatchWriter, "write", side_effect=mock_async_func_generator(None)
+        )
+        mocker.patch.object(
+            SharedContents, "touch", side_effect=mock_async_func_generator(False)
+        )
+        mocker.patch.object(
+            SharedContents, "save", side_effect=mock_async_func_generator(None)
+        )
+        return get_indexed_resources
+
+    async def test_should_index_changed_files(
+        self, mocker, session_manager, resource_index_service, index_file_mocks
+    ):
+        save_indexed_resources = mocker.patch.object(
+            ResourceIndexService,
+            "_save_indexed_resources",
+            side_effect=mock_async_func_generator(None),
+        )
+        report = mocker.MagicMock()
+
+        await resource_index_service.index_files(
+            user_id=1,
+            resources=[resource("a"), resource("b")],
+            report=report,
+        )
+
+        assert index_file_mocks.call_args.kwargs["resource_ids"] == [
+            "id:1",
+            "id:1",
+        ]
+        report.assert_has_calls(
+            [
+                mocker.call(resource("a"), IndexFileStatus.UNCHANGED, None),
+                mocker.call(resource("b"), IndexFileStatus.INDEXED, None),
+            ],
+            any_order=True,
+        )
+        assert save_indexed_resources.call_args.kwargs["resources"] == [resource("b")]
+        assert session_manager.sessions == 2
+
+    async def test_should_save_new_path_of_renamed_unchanged_file(
+        self, mocker, resource_index_service, index_file_mocks
+    ):
+        save_indexed_resources = mocker.patch.object(
+            ResourceIndexService,
+            "_save_indexed_resources",
+            side_effect=mock_async_func_generator(None),
+        )
+        write = mocker.patch.object(
+            VectorBatchWriter, "write", side_effect=mock_async_func_generator(None)
+        )
+        report = mocker.MagicMock()
+        renamed = resource("a").model_copy(
+            update={"name": "renamed.pdf", "path": "/folder/renamed.pdf"}
+        )
+
+        await resource_index_service.index_files(
+            user_id=1, resources=[renamed], report=report
+        )
+
+        write.assert_not_called()
+        assert save_indexed_resources.call_args.kwargs["resources"] == [renamed]
+        report.assert_called_once_with(renamed, IndexFileStatus.UNCHANGED, None)
+
+    async def test_should_share_download_limiter_of_user(
+        self, mocker, resource_index_service, index_file_mocks
+    ):
+        mocker.patch.object(
+            ResourceIndexService,
+            "_save_indexed_resources",
+            side_effect=mock_async_func_generator(None),
+        )
+        index_file = mocker.patch.object(
+            ResourceIndexService,
+            "_index_file",
+            side_effect=mock_async_func_generator(IndexFileStatus.INDEXED),
+        )
+
+        await resource_index_service.index_files(user_id=1, resources=[resource("b")])
+        await resource_index_service.index_files(user_id=1, resources=[resource("b")])
+        await resource_index_service.index_files(user_id=2, resources=[resource("b")])
+
+        limiters = [
+            call.kwargs["download_limiter"] for call in index_file.call_args_list
+        ]
+        assert limiters[0] is limiters[1]
+        assert limiters[0] is resource_index_service.download_limiters.get(1)
+        assert limiters[2] is not limiters[0]
+
+    async def test_should_invalidate_query_results_after_commit(
+        self, mocker, session, session_manager, chunk_cache, index_file_mocks
+    ):
+        query_cache = QueryCache(max_items=10, ttl=60)
+        query_cache.set_results(
+            tenant="user_1",
+            query="a",
+            results=[
+                QueryResult(
+                    resource_id="id:1", name="a.pdf", path="/a.pdf", content="a"
+                )
+            ],
+        )
+        resource_index_service = ResourceIndexService(
+            session_manager=session_manager,
+            chunk_cache=chunk_cache,
+            query_cache=query_cache,
+        )
+        mocker.patch.object(
+            ResourceIndexService,
+            "_save_indexed_resources",
+            side_effect=mock_async_func_generator(None),
+        )
+
+        await resource_index_service.index_files(user_id=1, resources=[resource("b")])
+
+        notification = session.execute.call_args.args[0].compile().params
+        assert list(notification.values()) == ["query_results", "user_1"]
+        assert query_cache.get_results(tenant="user_1", query="a") is None
+
+    async def test_should_skip_files_before_downloading(
+        self, mocker, session_manager, resource_index_service
+    ):
+        fetch = mocker.patch.object(DropboxHandler, "fetch_pdf_file_content")
+        report = mocker.MagicMock()
+        video = resource("a").model_copy(update={"name": "movie.mp4"})
+
+        await resource_index_service.index_files(
+            user_id=1, resources=[video], report=report
+        )
+
+        report.assert_called_once_with(
+            video, IndexFileStatus.SKIPPED, "Unsupported file type: mp4"
+        )
+        fetch.assert_not_called()
+        assert session_manager.sessions == 0
+
+    async def test_should_report_indexed_files_failed_if_not_saved(
+        self, mocker, session, resource_index_service, index_file_mocks
+    ):
+        mocker.patch.object(
+            ResourceIndexService,
+            "_save_indexed_resources",
+            side_effect=OperationalError("upsert", {}, Exception("lost")),
+        )
+        report = mocker.MagicMock()
+
+        with pytest.raises(OperationalError):
+            await resource_index_service.index_files(
+                user_id=1,
+                resources=[resource("a"), resource("b")],
+                report=report,
+            )
+
+        assert [call.args[1] for call in report.call_args_list] == [
+            IndexFileStatus.UNCHANGED,
+            IndexFileStatus.FAILED,
+        ]
+        session.execute.assert_not_called()
+
+    async def test_should_report_failed_files(self, mocker, resource_index_service):
+        mocker.patch.object(
+            ResourceIndexService,
+            "_index_file",
+            side_effect=RuntimeError("insert failed"),
+        )
+        report = mocker.MagicMock()
+
+        indexed_files = []
+
+        with pytest.raises(RuntimeError):
+            await resource_index_service._index_and_report_file(
+                access_token="access-token",
+                resource=resource("a"),
+                indexed_resource=None,
+                batch_writer=mocker.MagicMock(spec=VectorBatchWriter),
+                shared_batch_writer=mocker.MagicMock(spec=VectorBatchWriter),
+                shared_indexings={},
+                download_limiter=mocker.MagicMock(spec=AdaptiveLimiter),
+                report=report,
+                indexed_files=indexed_files,
+                moved_files=[],
+            )
+
+        report.assert_called_once_with(
+            resource("a"), IndexFileStatus.FAILED, "insert failed"
+        )
+        assert indexed_files == []
@@ -1,6 +1,9 @@
 """Unit tests for dropbox service."""
 
+from datetime import datetime, timedelta, timezone
+
 import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core import NotFoundError
 from src.schemas.dropbox import DropboxAuthToken
@@ -26,3 +29,26 @@ class TestGetTokensOfUserFromDB:
             await dropbox_service._get_tokens_of_user_from_db(
                 user_id=100, session=db_session
             )
+
+
+class TestGetAccessToken:
+    async def test_should_use_cached_tokens(self, mocker, dropbox_service):
+        dropbox_service.token_cache.set(
+            1,
+            DropboxAuthToken(
+                access_token="cached-access-token",
+                refresh_token="refresh-token",
+                expires_at=datetime.now(tz=timezone.utc) + timedelta(hours=4),
+            ),
+        )
+        get_tokens = mocker.patch.object(
+            DropboxService, "_get_tokens_of_user_from_db", autospec=True
+        )
+
+        access_token = await dropbox_service._get_access_token(
+            user_id=1, session=mocker.MagicMock(spec=AsyncSession)
+        )
+
+        assert access_token == "cached-access-token"
+        get_tokens.assert_not_called()
+        dropbox_service.token_cache.invalidate(1)
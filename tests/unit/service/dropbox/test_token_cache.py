@@ -0,0 +1,84 @@
+"""Unit tests for the Dropbox token cache."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.schemas.dropbox import DropboxAuthToken
+from src.service.dropbox.token_cache import TokenCache
+
+
+def tokens(access_token: str, expires_in: timedelta) -> DropboxAuthToken:
+    return DropboxAuthToken(
+        access_token=access_token,
+        refresh_token="refresh-token",
+        expires_at=datetime.now(tz=timezone.utc) + expires_in,
+    )
+
+
+@pytest.fixture
+def token_cache():
+    return TokenCache(max_items=10, ttl=60)
+
+
+class TestTokenCache:
+    async def test_should_refresh_once_for_concurrent_callers(self, token_cache):
+        calls = 0
+
+        async def refresh():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return tokens("new-token", timedelta(hours=4))
+
+        valid_after = datetime.now(tz=timezone.utc) + timedelta(minutes=5)
+        results = await asyncio.gather(
+            *[
+                token_cache.refresh(user_id=1, refresh=refresh, valid_after=valid_after)
+                for _ in range(5)
+            ]
+        )
+
+        assert calls == 1
+        assert {result.access_token for result in results} == {"new-token"}
+        assert token_cache.get(1).access_token == "new-token"
+
+    async def test_should_reuse_tokens_refreshed_by_previous_flight(self, token_cache):
+        token_cache.set(1, tokens("fresh-token", timedelta(hours=4)))
+
+        async def refresh():
+            raise AssertionError("The tokens should not be refreshed.")
+
+        result = await token_cache.refresh(
+            user_id=1,
+            refresh=refresh,
+            valid_after=datetime.now(tz=timezone.utc) + timedelta(minutes=5),
+        )
+
+        assert result.access_token == "fresh-token"
+
+    async def test_should_raise_refresh_error_to_all_callers(self, token_cache):
+        async def refresh():
+            await asyncio.sleep(0.01)
+            raise ValueError("invalid refresh token")
+
+        valid_after = datetime.now(tz=timezone.utc)
+        results = await asyncio.gather(
+            token_cache.refresh(user_id=1, refresh=refresh, valid_after=valid_after),
+            token_cache.refresh(user_id=1, refresh=refresh, valid_after=valid_after),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert token_cache.get(1) is None
+
+    def test_should_invalidate_notified_user(self, token_cache):
+        token_cache.set(1, tokens("token-1", timedelta(hours=4)))
+        token_cache.set(2, tokens("token-2", timedelta(hours=4)))
+
+        token_cache.on_notification("1")
+        token_cache.on_notification("invalid")
+
+        assert token_cache.get(1) is None
+        assert token_cache.get(2).access_token == "token-2"
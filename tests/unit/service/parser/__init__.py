@@ -0,0 +1 @@
+"""Unit tests for parser services."""
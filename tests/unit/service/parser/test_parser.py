@@ -0,0 +1,152 @@
+"""Unit tests for file parsers."""
+
+from io import BytesIO
+from zipfile import ZipFile
+
+import pytest
+from PyPDF2 import PdfWriter
+
+from src.service.parser import Parser, ParserFactory
+from src.service.parser import factory, text_parser
+from src.service.parser.docx_parser import DocxParser
+from src.service.parser.html_parser import HTMLParser
+from src.service.parser.pdf_parser import PDFParser, PdfiumParser
+from src.service.parser.text_parser import MarkdownParser, TextParser
+
+
+def docx(body: str) -> bytes:
+    content = BytesIO()
+    with ZipFile(content, "w") as archive:
+        archive.writestr(
+            "word/document.xml",
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/'
+            f'wordprocessingml/2006/main"><w:body>{body}</w:body></w:document>',
+        )
+    return content.getvalue()
+
+
+class TestParserFactory:
+    @pytest.mark.parametrize(
+        "file_extension, parser",
+        [
+            ("pdf", PDFParser),
+            ("docx", DocxParser),
+            ("txt", TextParser),
+            ("md", MarkdownParser),
+            ("html", HTMLParser),
+        ],
+    )
+    def test_should_create_registered_parser(self, file_extension, parser):
+        assert isinstance(ParserFactory.create_parser(file_extension), parser)
+
+    def test_should_register_parser_for_its_extensions(self, mocker):
+        mocker.patch.dict(factory.file_extension_to_parser)
+
+        class CSVParser(Parser):
+            extensions = ("csv",)
+
+            def parse(self, content):
+                yield content.decode()
+
+        ParserFactory.register(CSVParser)
+
+        assert ParserFactory.is_supported("csv")
+        assert isinstance(ParserFactory.create_parser("csv"), CSVParser)
+
+    def test_should_raise_unsupported_file_extension(self):
+        with pytest.raises(ValueError, match="Unsupported file extension"):
+            ParserFactory.create_parser("exe")
+
+
+def blank_pdf(pages: int) -> bytes:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=100, height=100)
+    content = BytesIO()
+    writer.write(content)
+    return content.getvalue()
+
+
+class TestPDFParser:
+    def test_should_parse_page_ranges(self):
+        content = blank_pdf(pages=3)
+
+        assert PDFParser().count_pages(content) == 3
+        assert list(PDFParser().parse_pages(content=content, start=1, stop=3)) == [
+            "",
+            "",
+        ]
+        assert list(PDFParser().parse(content)) == ["", "", ""]
+
+    @pytest.mark.parametrize("parser", [PDFParser, PdfiumParser])
+    def test_should_parse_page_ranges_of_open_file(self, tmp_path, parser):
+        if parser is PdfiumParser:
+            pytest.importorskip("pypdfium2")
+        path = tmp_path / "file.pdf"
+        path.write_bytes(blank_pdf(pages=3))
+
+        with path.open("rb") as file:
+            assert parser().count_pages(file) == 3
+        with path.open("rb") as file:
+            assert list(parser().parse_pages(content=file, start=1, stop=3)) == [
+                "",
+                "",
+            ]
+
+
+class TestTextParser:
+    def test_should_yield_bounded_segments(self, mocker):
+        mocker.patch.object(text_parser, "SEGMENT_SIZE", 4)
+
+        result = list(TextParser().parse("abcdefghij\xe9".encode()))
+
+        assert result == ["abcd", "efgh", "ij\xe9"]
+
+
+class TestMarkdownParser:
+    def test_should_yield_sections(self):
+        content = b"intro\n# Title\ntext\n## Part\nmore\n#hashtag\n"
+
+        result = list(MarkdownParser().parse(content))
+
+        assert result == ["intro\n", "# Title\ntext\n", "## Part\nmore\n#hashtag\n"]
+
+
+class TestDocxParser:
+    def test_should_yield_paragraphs(self):
+        content = docx(
+            "<w:p><w:r><w:t>Hello</w:t></w:r><w:r><w:tab/><w:t>world</w:t></w:r></w:p>"
+            "<w:p></w:p>"
+            "<w:tbl><w:tr><w:tc><w:p><w:r><w:t>cell</w:t></w:r></w:p></w:tc></w:tr></w:tbl>"
+        )
+
+        result = list(DocxParser().parse(content))
+
+        assert result == ["Hello\tworld\n", "cell\n"]
+
+    def test_should_raise_invalid_document(self):
+        with pytest.raises(ValueError, match="Invalid DOCX document"):
+            list(DocxParser().parse(b"not a zip"))
+
+
+class TestHTMLParser:
+    def test_should_yield_visible_text(self):
+        content = (
+            b"<html><head><title>T</title><style>p {}</style></head>"
+            b"<body><p>Hello &amp; welcome</p><script>var a;</script>"
+            b"<div>Bye</div></body></html>"
+        )
+
+        result = "".join(HTMLParser().parse(content))
+
+        assert result.split() == ["Hello", "&", "welcome", "Bye"]
+
+    def test_should_yield_body_text_after_unclosed_head(self):
+        content = (
+            b"<html><head><title>T</title><meta charset='utf-8'>"
+            b"<body><p>Invoice 123</p></body></html>"
+        )
+
+        result = "".join(HTMLParser().parse(content))
+
+        assert result.split() == ["Invoice", "123"]
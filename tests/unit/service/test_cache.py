@@ -0,0 +1,114 @@
+"""Unit tests for service caches."""
+
+import pytest
+
+from src.schemas.query import QueryResult, SearchMode
+from src.service.cache import LRUCache, QueryCache
+
+
+class TestLRUCache:
+    def test_should_evict_least_recently_used(self):
+        cache = LRUCache(max_items=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_should_expire_values(self, mocker):
+        monotonic = mocker.patch("src.service.cache.monotonic", return_value=100)
+        cache = LRUCache(max_items=2, ttl=60)
+        cache.set("a", 1)
+
+        monotonic.return_value = 159
+        assert cache.get("a") == 1
+
+        monotonic.return_value = 160
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_should_respect_memory_bound(self):
+        cache = LRUCache(max_items=10, ttl=60, max_bytes=10, sizeof=len)
+        cache.set("a", "12345")
+        cache.set("b", "12345")
+        cache.set("c", "1")
+
+        assert cache.get("a") is None
+        assert cache.size == 6
+
+        cache.set("d", "12345678901")
+        assert cache.get("d") is None
+
+    def test_should_delete_where(self):
+        cache = LRUCache(max_items=10, ttl=60)
+        cache.set(("x", 1), 1)
+        cache.set(("y", 1), 2)
+        cache.delete_where(lambda key: key[0] == "x")
+
+        assert cache.get(("x", 1)) is None
+        assert cache.get(("y", 1)) == 2
+
+
+class TestQueryCache:
+    @pytest.fixture
+    def query_cache(self):
+        return QueryCache(max_items=10, ttl=60)
+
+    results = [
+        QueryResult(
+            content="content", resource_id="id", name="name", path="/path", score=1
+        )
+    ]
+
+    def test_should_normalize_query(self, query_cache):
+        query_cache.set_results(
+            tenant="user_1", query="  What is  THIS? ", results=self.results
+        )
+
+        assert (
+            query_cache.get_results(tenant="user_1", query="what is this?")
+            == self.results
+        )
+        assert query_cache.get_results(tenant="user_2", query="what is this?") is None
+
+    def test_should_key_by_search_parameters(self, query_cache):
+        query_cache.set_results(
+            tenant="user_1", query="a", results=self.results, limit=5, offset=5
+        )
+
+        assert (
+            query_cache.get_results(tenant="user_1", query="a", limit=5, offset=5)
+            == self.results
+        )
+        assert query_cache.get_results(tenant="user_1", query="a", limit=5) is None
+        assert (
+            query_cache.get_results(
+                tenant="user_1",
+                query="a",
+                mode=SearchMode.KEYWORD,
+                limit=5,
+                offset=5,
+            )
+            is None
+        )
+
+    def test_should_invalidate_tenant(self, query_cache):
+        query_cache.set_results(tenant="user_1", query="a", results=self.results)
+        query_cache.set_results(tenant="user_2", query="a", results=self.results)
+
+        query_cache.invalidate(tenant="user_1")
+
+        assert query_cache.get_results(tenant="user_1", query="a") is None
+        assert query_cache.get_results(tenant="user_2", query="a") == self.results
+
+    def test_should_invalidate_notified_tenant(self, query_cache):
+        query_cache.set_results(tenant="user_1", query="a", results=self.results)
+        query_cache.set_results(tenant="user_2", query="a", results=self.results)
+
+        query_cache.on_notification("user_1")
+
+        assert query_cache.get_results(tenant="user_1", query="a") is None
+        assert query_cache.get_results(tenant="user_2", query="a") == self.results
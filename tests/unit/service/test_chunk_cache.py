@@ -0,0 +1,71 @@
+"""Unit tests for the cache of the chunks of the parsed files."""
+
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.session import DatabaseSessionManager
+from src.service.chunk_cache import ChunkCache
+
+
+@pytest.fixture
+def session(mocker):
+    session = mocker.MagicMock(spec=AsyncSession)
+    session.execute = mocker.AsyncMock(return_value=mocker.MagicMock())
+    return session
+
+
+@pytest.fixture
+def chunk_cache(mocker, session):
+    session_manager = mocker.MagicMock(spec=DatabaseSessionManager)
+
+    @asynccontextmanager
+    async def get_session():
+        yield session
+
+    session_manager.get_session = get_session
+    return ChunkCache(session_manager=session_manager, enabled=True)
+
+
+def compile_statement(session) -> str:
+    return str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+
+
+class TestChunkCache:
+    async def test_should_get_and_touch_chunks(self, session, chunk_cache):
+        session.execute.return_value.scalar_one_or_none.return_value = ["a", "b"]
+
+        chunks = await chunk_cache.get(content_hash="hash", version="v1")
+
+        assert chunks == ["a", "b"]
+        statement = compile_statement(session)
+        assert statement.startswith("UPDATE parsed_contents SET used_at=now()")
+        assert "RETURNING parsed_contents.chunks" in statement
+
+    async def test_should_set_chunks_with_their_size(self, session, chunk_cache):
+        await chunk_cache.set(content_hash="hash", version="v1", chunks=["a", "é"])
+
+        params = session.execute.call_args.args[0].compile().params
+        assert params["size"] == 3
+        assert "ON CONFLICT (content_hash, version) DO NOTHING" in compile_statement(
+            session
+        )
+
+    async def test_should_evict_least_recently_used_beyond_size(
+        self, session, chunk_cache
+    ):
+        await chunk_cache.evict(max_bytes=100)
+
+        statement = compile_statement(session)
+        assert statement.startswith("DELETE FROM parsed_contents")
+        assert "ORDER BY parsed_contents.used_at DESC" in statement
+
+    async def test_should_skip_disabled_cache(self, session, chunk_cache):
+        chunk_cache.enabled = False
+
+        assert await chunk_cache.get(content_hash="hash", version="v1") is None
+        await chunk_cache.set(content_hash="hash", version="v1", chunks=["a"])
+
+        session.execute.assert_not_called()
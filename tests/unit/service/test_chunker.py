@@ -0,0 +1,52 @@
+"""Unit tests for text chunking."""
+
+import pytest
+
+from src.service import chunker
+
+
+class MockEncoding:
+    def __init__(self, ids: list[int]):
+        self.ids = ids
+
+
+class MockTokenizer:
+    def encode(self, text: str, add_special_tokens: bool = True) -> MockEncoding:
+        return MockEncoding([int(token) for token in text.split()])
+
+    def decode(self, ids: list[int]) -> str:
+        return " ".join(map(str, ids))
+
+
+@pytest.fixture(autouse=True)
+def tokenizer(mocker):
+    mocker.patch.object(chunker, "get_tokenizer", return_value=MockTokenizer())
+
+
+class TestChunkTextWithOverlap:
+    def test_ok(self):
+        result = chunker.chunk_text_with_overlap(
+            text="1 2 3 4 5 6 7", max_tokens=3, overlap=1
+        )
+
+        assert result == ["1 2 3", "3 4 5", "5 6 7", "7"]
+
+
+class TestChunkSegmentsWithOverlap:
+    def test_should_chunk_across_segments(self):
+        result = chunker.chunk_segments_with_overlap(
+            segments=iter(["1 2", "3 4 5", "", "6 7"]), max_tokens=3, overlap=1
+        )
+
+        assert list(result) == ["1 2 3", "3 4 5", "5 6 7", "7"]
+
+
+class TestParseAndChunk:
+    def test_should_raise_unsupported_file_type(self):
+        with pytest.raises(ValueError, match="Unsupported file type: exe"):
+            chunker.parse_and_chunk(content=b"", file_extension="exe")
+
+    def test_should_chunk_parsed_segments(self):
+        result = chunker.parse_and_chunk(content=b"1 2 3 4", file_extension="txt")
+
+        assert result == ["1 2 3 4"]
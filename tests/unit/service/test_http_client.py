@@ -0,0 +1,39 @@
+"""Unit tests for the shared HTTP client."""
+
+import pytest
+
+from src.service.http_client import HttpClientManager
+
+
+@pytest.fixture
+def http_client_manager():
+    return HttpClientManager(
+        limit=10,
+        limit_per_host=5,
+        keepalive_timeout=30.0,
+        dns_cache_ttl=300,
+        connect_timeout=10.0,
+        read_timeout=60.0,
+    )
+
+
+class TestHttpClientManager:
+    async def test_should_share_session(self, http_client_manager):
+        session = http_client_manager.get_session()
+
+        assert http_client_manager.get_session() is session
+        assert session.connector.limit == 10
+        assert session.connector.limit_per_host == 5
+
+        await http_client_manager.close()
+
+    async def test_should_recreate_closed_session(self, http_client_manager):
+        session = http_client_manager.get_session()
+        await http_client_manager.close()
+
+        assert session.closed
+        new_session = http_client_manager.get_session()
+        assert new_session is not session
+        assert not new_session.closed
+
+        await http_client_manager.close()
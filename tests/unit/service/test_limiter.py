@@ -0,0 +1,108 @@
+"""Unit tests for the adaptive concurrency limiter."""
+
+import asyncio
+
+import pytest
+
+from src.core import ServiceUnavailableError, TooManyRequestsError
+from src.service.limiter import AdaptiveLimiter, LimiterRegistry
+
+
+def limiter(**kwargs) -> AdaptiveLimiter:
+    return AdaptiveLimiter(**{"initial": 2, "minimum": 1, "maximum": 4, **kwargs})
+
+
+class TestCall:
+    async def test_should_bound_concurrent_calls(self):
+        adaptive_limiter = limiter()
+        running: list[int] = []
+        peak: list[int] = [0]
+
+        async def func():
+            running.append(1)
+            peak[0] = max(peak[0], len(running))
+            await asyncio.sleep(0.01)
+            running.pop()
+
+        await asyncio.gather(*[adaptive_limiter.call(func) for _ in range(6)])
+
+        assert peak[0] <= 3
+        assert adaptive_limiter.limit > 2
+
+    async def test_should_increase_additively_up_to_maximum(self):
+        adaptive_limiter = limiter(initial=1, maximum=2)
+
+        async def func():
+            return "result"
+
+        assert await adaptive_limiter.call(func) == "result"
+        assert adaptive_limiter.limit == 2
+        await adaptive_limiter.call(func)
+        assert adaptive_limiter.limit == 2
+
+    async def test_should_decrease_and_retry_after_delay(self, mocker):
+        adaptive_limiter = limiter(initial=4)
+        func = mocker.AsyncMock(
+            side_effect=[TooManyRequestsError("Service", retry_after=0.05), "result"]
+        )
+
+        started_at = asyncio.get_running_loop().time()
+        result = await adaptive_limiter.call(func)
+
+        assert result == "result"
+        assert asyncio.get_running_loop().time() - started_at >= 0.05
+        assert 2 <= adaptive_limiter.limit < 3
+
+    async def test_should_raise_after_retries(self, mocker):
+        adaptive_limiter = limiter(default_retry_after=0)
+        func = mocker.AsyncMock(side_effect=TooManyRequestsError("Service"))
+
+        with pytest.raises(TooManyRequestsError):
+            await adaptive_limiter.call(func, max_retries=2)
+
+        assert func.call_count == 3
+        assert adaptive_limiter.limit == 1
+
+    async def test_should_decrease_and_retry_on_server_error(self, mocker):
+        adaptive_limiter = limiter(initial=4, default_retry_after=0)
+        func = mocker.AsyncMock(
+            side_effect=[ServiceUnavailableError("Service"), "result"]
+        )
+
+        assert await adaptive_limiter.call(func) == "result"
+        assert func.call_count == 2
+        assert 2 <= adaptive_limiter.limit < 3
+
+    async def test_should_not_decrease_on_slow_call(self):
+        adaptive_limiter = limiter(initial=2)
+
+        async def func():
+            await asyncio.sleep(0.05)
+
+        await adaptive_limiter.call(func)
+
+        assert adaptive_limiter.limit == 2.5
+
+
+class TestLimiterRegistry:
+    def test_should_share_limiter_of_key(self):
+        registry = LimiterRegistry(max_items=10, idle_timeout=60, factory=limiter)
+
+        first = registry.get(1)
+        first.limit = 3.5
+
+        assert registry.get(1) is first
+        assert registry.get(2) is not first
+        assert registry.get(2).limit == 2
+
+    def test_should_restart_idle_limiter(self, mocker):
+        now = mocker.patch("src.service.cache.monotonic", return_value=0.0)
+        registry = LimiterRegistry(max_items=10, idle_timeout=60, factory=limiter)
+        first = registry.get(1)
+
+        now.return_value = 50.0
+        assert registry.get(1) is first
+        now.return_value = 100.0
+        assert registry.get(1) is first
+        now.return_value = 200.0
+        assert registry.get(1) is not first
@@ -0,0 +1,76 @@
+"""Unit tests for the notification listener."""
+
+import asyncio
+
+import pytest
+
+from src.service.notification import NotificationListener
+
+
+@pytest.fixture
+def driver_connection(mocker):
+    driver_connection = mocker.MagicMock()
+    driver_connection.add_listener = mocker.AsyncMock()
+    driver_connection.remove_listener = mocker.AsyncMock()
+    driver_connection.is_closed.return_value = False
+    return driver_connection
+
+
+@pytest.fixture
+def engine(mocker, driver_connection):
+    connection = mocker.MagicMock()
+    connection.get_raw_connection = mocker.AsyncMock(
+        return_value=mocker.MagicMock(driver_connection=driver_connection)
+    )
+    engine = mocker.MagicMock()
+    engine.connect.return_value.__aenter__ = mocker.AsyncMock(return_value=connection)
+    engine.connect.return_value.__aexit__ = mocker.AsyncMock(return_value=None)
+    return engine
+
+
+class TestNotificationListener:
+    def test_should_dispatch_notifications_by_channel(self, mocker):
+        listener = NotificationListener()
+        tokens = mocker.MagicMock()
+        queries = mocker.MagicMock()
+        listener.subscribe("tokens", tokens, mocker.MagicMock())
+        listener.subscribe("queries", queries, mocker.MagicMock())
+
+        listener._on_notification(None, 123, "queries", "user_1")
+        listener._on_notification(None, 123, "unknown", "user_2")
+
+        tokens.assert_not_called()
+        queries.assert_called_once_with("user_1")
+
+    def test_should_ignore_failing_subscriber(self, mocker):
+        listener = NotificationListener()
+        listener.subscribe("tokens", mocker.MagicMock(side_effect=ValueError), int)
+
+        listener._on_notification(None, 123, "tokens", "invalid")
+
+    async def test_should_listen_to_all_channels_and_reset(
+        self, mocker, engine, driver_connection
+    ):
+        listener = NotificationListener()
+        tokens_reset = mocker.MagicMock()
+        queries_reset = mocker.MagicMock()
+        listener.subscribe("tokens", mocker.MagicMock(), tokens_reset)
+        listener.subscribe("queries", mocker.MagicMock(), queries_reset)
+
+        listening = asyncio.create_task(
+            listener.listen(engine=engine, retry_interval=60)
+        )
+        await asyncio.sleep(0.01)
+        driver_connection.add_termination_listener.call_args.args[0](None)
+        await asyncio.sleep(0.01)
+        listening.cancel()
+        await asyncio.gather(listening, return_exceptions=True)
+
+        assert [call.args[0] for call in driver_connection.add_listener.mock_calls] == [
+            "tokens",
+            "queries",
+        ]
+        assert driver_connection.remove_listener.await_count == 2
+        # Once when the listening starts, once when the connection is lost.
+        assert tokens_reset.call_count == 2
+        assert queries_reset.call_count == 2
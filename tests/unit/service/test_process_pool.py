@@ -0,0 +1,26 @@
+"""Unit tests for the indexing process pool."""
+
+import os
+
+import pytest
+
+from src.service.chunker import parse_and_chunk
+from src.service.process_pool import ProcessPool
+
+
+@pytest.fixture
+def process_pool():
+    pool = ProcessPool(max_workers=1, max_pending=1)
+    yield pool
+    pool.shutdown()
+
+
+class TestRun:
+    async def test_should_run_in_another_process(self, process_pool):
+        result = await process_pool.run(os.getpid)
+
+        assert result != os.getpid()
+
+    async def test_should_raise_error_of_function(self, process_pool):
+        with pytest.raises(ValueError, match="Unsupported file type: exe"):
+            await process_pool.run(parse_and_chunk, content=b"", file_extension="exe")
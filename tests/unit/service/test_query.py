@@ -0,0 +1,311 @@
+"""Unit tests for query service."""
+
+import json
+from base64 import urlsafe_b64encode
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core import InvalidInputError, configuration
+from src.database import AsyncVectorDB
+from src.schemas.query import QueryResult, SearchMode
+from src.service.query import QueryService
+
+from tests import mock_async_func_generator
+
+
+def result(resource_id: str, content: str, distance: float) -> QueryResult:
+    return QueryResult(
+        content=content,
+        resource_id=resource_id,
+        name="",
+        path="",
+        distance=distance,
+    )
+
+
+def keyword_result(resource_id: str, content: str, score: float) -> QueryResult:
+    return QueryResult(
+        content=content, resource_id=resource_id, name="", path="", score=score
+    )
+
+
+@pytest.fixture
+def session(mocker):
+    session = mocker.MagicMock(spec=AsyncSession)
+    session.execute = mocker.AsyncMock(return_value=mocker.MagicMock())
+    session.execute.return_value.scalars.return_value = ["hash:1"]
+    return session
+
+
+class TestQueryWithSharedContents:
+    @pytest.fixture
+    def query_mocks(self, mocker):
+        get_files_by_content = mocker.patch.object(
+            QueryService,
+            "_get_files_by_content",
+            side_effect=mock_async_func_generator(
+                {"hash:1": ("id:1", "file.pdf", "/file.pdf")}
+            ),
+        )
+
+        async def query(tenant, **kwargs):
+            query.calls.append((tenant, kwargs))
+            if tenant == "shared":
+                return [
+                    result("hash:1", "b", 0.1),
+                    result("hash:2", "d", 0.15),
+                    result("hash:1", "a", 0.3),
+                ]
+            return [result("id:1", "a", 0.2), result("id:2", "c", 0.4)]
+
+        query.calls = []
+        mocker.patch.object(AsyncVectorDB, "query", side_effect=query)
+        return query, get_files_by_content
+
+    async def test_should_give_shared_results_the_user_file(self, session, query_mocks):
+        results = await QueryService()._query_with_shared_contents(
+            user_id=1,
+            tenant="user_1",
+            query="query",
+            session=session,
+            mode=SearchMode.VECTOR,
+            alpha=0.5,
+            limit=1,
+            offset=0,
+        )
+
+        assert results[0].resource_id == "id:1"
+        assert results[0].content == "b"
+        assert results[0].name == "file.pdf"
+        assert results[0].path == "/file.pdf"
+
+    async def test_should_merge_user_and_shared_results(self, session, query_mocks):
+        query, get_files_by_content = query_mocks
+
+        results = await QueryService()._query_with_shared_contents(
+            user_id=1,
+            tenant="user_1",
+            query="query",
+            session=session,
+            mode=SearchMode.VECTOR,
+            alpha=0.5,
+            limit=2,
+            offset=1,
+        )
+
+        assert [(item.resource_id, item.content) for item in results] == [
+            ("id:1", "a"),
+            ("id:2", "c"),
+        ]
+        assert results[0].distance == 0.2
+        assert query.calls[1] == (
+            "shared",
+            dict(
+                query="query",
+                resource_ids=["hash:1"],
+                mode=SearchMode.VECTOR,
+                alpha=0.5,
+                limit=3,
+                offset=0,
+            ),
+        )
+        assert sorted(get_files_by_content.call_args.kwargs["content_hashes"]) == [
+            "hash:1",
+            "hash:2",
+        ]
+
+    async def test_should_not_filter_by_too_many_contents(
+        self, mocker, session, query_mocks
+    ):
+        query, _ = query_mocks
+        mocker.patch.object(configuration.VECTOR_DB, "SHARED_FILTER_MAX_CONTENTS", 1)
+        mocker.patch.object(configuration.VECTOR_DB, "SHARED_OVERFETCH_FACTOR", 5)
+        session.execute.return_value.scalars.return_value = ["hash:1", "hash:3"]
+
+        results = await QueryService()._query_with_shared_contents(
+            user_id=1,
+            tenant="user_1",
+            query="query",
+            session=session,
+            mode=SearchMode.VECTOR,
+            alpha=0.5,
+            limit=2,
+            offset=0,
+        )
+
+        assert [(item.resource_id, item.content) for item in results] == [
+            ("id:1", "b"),
+            ("id:1", "a"),
+        ]
+        assert "resource_ids" not in query.calls[1][1]
+        assert query.calls[1][1]["limit"] == 10
+        statement = session.execute.call_args.args[0]
+        assert statement.compile().params["param_1"] == 2
+
+    async def test_should_merge_tenants_by_rank(self, mocker, session):
+        mocker.patch.object(
+            QueryService,
+            "_get_files_by_content",
+            side_effect=mock_async_func_generator(
+                {"hash:1": ("id:1", "file.pdf", "/file.pdf")}
+            ),
+        )
+
+        async def query(tenant, **kwargs):
+            if tenant == "shared":
+                return [
+                    keyword_result("hash:1", "shared best", 2.0),
+                    keyword_result("hash:1", "shared worst", 1.0),
+                ]
+            return [
+                keyword_result("id:2", "user best", 40.0),
+                keyword_result("id:2", "user middle", 25.0),
+                keyword_result("id:2", "user worst", 10.0),
+            ]
+
+        mocker.patch.object(AsyncVectorDB, "query", side_effect=query)
+
+        results = await QueryService()._query_with_shared_contents(
+            user_id=1,
+            tenant="user_1",
+            query="query",
+            session=session,
+            mode=SearchMode.KEYWORD,
+            alpha=0.5,
+            limit=5,
+            offset=0,
+        )
+
+        # By score, the user results would all rank first.
+        assert [item.content for item in results] == [
+            "user best",
+            "shared best",
+            "user middle",
+            "shared worst",
+            "user worst",
+        ]
+        assert results[0].score == 40.0
+
+    async def test_should_rank_keyword_fallback_after_vector_hits(
+        self, mocker, session
+    ):
+        mocker.patch.object(
+            QueryService,
+            "_get_files_by_content",
+            side_effect=mock_async_func_generator(
+                {"hash:1": ("id:1", "file.pdf", "/file.pdf")}
+            ),
+        )
+
+        async def query(tenant, **kwargs):
+            if tenant == "shared":
+                return [result("hash:1", "vector", 0.35)]
+            return [
+                keyword_result("id:2", "keyword best", 3.0),
+                keyword_result("id:2", "keyword worst", 1.0),
+            ]
+
+        mocker.patch.object(AsyncVectorDB, "query", side_effect=query)
+
+        results = await QueryService()._query_with_shared_contents(
+            user_id=1,
+            tenant="user_1",
+            query="query",
+            session=session,
+            mode=SearchMode.VECTOR,
+            alpha=0.5,
+            limit=3,
+            offset=0,
+        )
+
+        assert [(item.content, item.distance) for item in results] == [
+            ("vector", 0.35),
+            ("keyword best", pytest.approx(1.0 + 1 / 61)),
+            ("keyword worst", pytest.approx(1.0 + 2 / 62)),
+        ]
+
+    async def test_should_page_in_the_order_of_a_single_page(self, mocker, session):
+        mocker.patch.object(
+            QueryService,
+            "_get_files_by_content",
+            side_effect=mock_async_func_generator(
+                {"hash:1": ("id:1", "file.pdf", "/file.pdf")}
+            ),
+        )
+        tenant_results = {
+            "shared": [
+                keyword_result("hash:1", f"shared {score}", score)
+                for score in [5.0, 4.5, 4.0, 3.9, 3.8, 3.7]
+            ],
+            "user_1": [
+                keyword_result("id:2", f"user {score}", score)
+                for score in [10.0, 6.5, 5.0, 0.3, 0.2, 0.1]
+            ],
+        }
+
+        async def query(tenant, limit, **kwargs):
+            return tenant_results[tenant][:limit]
+
+        mocker.patch.object(AsyncVectorDB, "query", side_effect=query)
+
+        async def get_page(limit, offset):
+            return await QueryService()._query_with_shared_contents(
+                user_id=1,
+                tenant="user_1",
+                query="query",
+                session=session,
+                mode=SearchMode.KEYWORD,
+                alpha=0.5,
+                limit=limit,
+                offset=offset,
+            )
+
+        pages = [*await get_page(limit=3, offset=0), *await get_page(limit=3, offset=3)]
+        single_page = await get_page(limit=6, offset=0)
+
+        assert [item.content for item in pages] == [
+            item.content for item in single_page
+        ]
+
+
+class TestGetFilesByContent:
+    async def test_should_bind_content_hashes_as_one_array(self, session):
+        session.execute.return_value = [
+            ("hash:1", "id:1", "file.pdf", "/file.pdf"),
+            ("hash:1", "id:2", "copy.pdf", "/copy.pdf"),
+            ("hash:2", "id:3", None, "/folder/other.pdf"),
+        ]
+        content_hashes = [f"hash:{index}" for index in range(40000)]
+
+        files = await QueryService._get_files_by_content(
+            user_id=1, content_hashes=content_hashes, session=session
+        )
+
+        assert files == {
+            "hash:1": ("id:1", "file.pdf", "/file.pdf"),
+            "hash:2": ("id:3", "other.pdf", "/folder/other.pdf"),
+        }
+        statement = session.execute.call_args.args[0]
+        assert statement.compile().params["content_hashes"] == content_hashes
+        assert "ANY" in str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TestDecodeCursor:
+    def test_should_decode_encoded_offset(self):
+        cursor = QueryService._encode_cursor(20)
+
+        assert QueryService._decode_cursor(cursor) == 20
+
+    @pytest.mark.parametrize("offset", [-1, 1001, 10**9, "10"])
+    def test_should_reject_invalid_or_too_far_offset(self, mocker, offset):
+        mocker.patch.object(configuration.VECTOR_DB, "QUERY_MAX_OFFSET", 1000)
+        cursor = urlsafe_b64encode(json.dumps({"offset": offset}).encode()).decode()
+
+        with pytest.raises(InvalidInputError):
+            QueryService._decode_cursor(cursor)
+
+    def test_should_reject_malformed_cursor(self):
+        with pytest.raises(InvalidInputError):
+            QueryService._decode_cursor("not a cursor")
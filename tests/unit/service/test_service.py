@@ -0,0 +1,29 @@
+"""Unit tests for the shared service base."""
+
+from src.database.async_vector_db import created_tenants, tenant_activity
+from src.database.session import database_session_manager
+from src.service.cache import query_cache
+from src.service.dropbox.index_job import IndexJobService
+from src.service.dropbox.resource_index import ResourceIndexService
+from src.service.limiter import download_limiters
+from src.service.query import QueryService
+
+
+class TestService:
+    def test_should_share_process_state_between_services(self):
+        first, second = QueryService(), ResourceIndexService()
+
+        assert first.vector_db is not second.vector_db
+        for service in (first, second):
+            assert service.vector_db.tenant_activity is tenant_activity
+            assert service.vector_db.created_tenants is created_tenants
+            assert service.query_cache is query_cache
+        assert second.download_limiters is download_limiters
+        assert second.session_manager is database_session_manager
+
+    def test_should_share_state_of_nested_services(self):
+        index_job_service = IndexJobService()
+
+        resource_index_service = index_job_service.resource_index_service
+        assert resource_index_service.query_cache is query_cache
+        assert resource_index_service.vector_db.tenant_activity is tenant_activity
@@ -0,0 +1,76 @@
+"""Unit tests for the contents shared by the users in the vector database."""
+
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import AsyncVectorDB
+from src.database.session import DatabaseSessionManager
+from src.models import SharedContent
+from src.service.shared_content import SharedContents
+
+from tests import mock_async_func_generator
+
+
+@pytest.fixture
+def session(mocker):
+    session = mocker.MagicMock(spec=AsyncSession)
+    session.execute = mocker.AsyncMock(return_value=mocker.MagicMock())
+    session.delete = mocker.AsyncMock()
+    return session
+
+
+@pytest.fixture
+def shared_contents(mocker, session):
+    session_manager = mocker.MagicMock(spec=DatabaseSessionManager)
+
+    @asynccontextmanager
+    async def get_session():
+        yield session
+
+    session_manager.get_session = get_session
+    return SharedContents(session_manager=session_manager, vector_db=AsyncVectorDB())
+
+
+def compile_statement(session) -> str:
+    return str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+
+
+class TestSharedContents:
+    @pytest.mark.parametrize("row_id, expected", [(1, True), (None, False)])
+    async def test_should_touch_content(
+        self, session, shared_contents, row_id, expected
+    ):
+        session.execute.return_value.scalar_one_or_none.return_value = row_id
+
+        assert await shared_contents.touch(content_hash="hash") is expected
+        statement = compile_statement(session)
+        assert statement.startswith("UPDATE shared_contents SET used_at=now()")
+        assert "RETURNING shared_contents.id" in statement
+
+    async def test_should_save_content(self, session, shared_contents):
+        await shared_contents.save(content_hash="hash")
+
+        assert "ON CONFLICT (content_hash) DO UPDATE" in compile_statement(session)
+
+    async def test_should_collect_unused_contents(
+        self, mocker, session, shared_contents
+    ):
+        unused_content = SharedContent(content_hash="hash")
+        session.execute.return_value.scalars.return_value = [unused_content]
+        delete = mocker.patch.object(
+            AsyncVectorDB,
+            "delete_resource_objects",
+            side_effect=mock_async_func_generator(None),
+        )
+
+        deleted = await shared_contents.collect_garbage(grace_period=60)
+
+        assert deleted == 1
+        delete.assert_called_once_with(tenant="shared", resource_id="hash")
+        session.delete.assert_called_once_with(unused_content)
+        statement = compile_statement(session)
+        assert "NOT (EXISTS (SELECT" in statement
+        assert "FOR UPDATE SKIP LOCKED" in statement
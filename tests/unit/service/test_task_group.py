@@ -0,0 +1,36 @@
+"""Unit tests for the bounded task group."""
+
+import asyncio
+
+from src.service.task_group import BoundedTaskGroup
+
+
+class TestBoundedTaskGroup:
+    async def test_should_bound_running_tasks(self):
+        running: list[int] = []
+        peak: list[int] = [0]
+
+        async def task():
+            running.append(1)
+            peak[0] = max(peak[0], len(running))
+            await asyncio.sleep(0.01)
+            running.pop()
+
+        async with BoundedTaskGroup(limit=2) as task_group:
+            for _ in range(5):
+                await task_group.spawn(task())
+
+        assert peak[0] == 2
+        assert not running
+        assert task_group.failed == 0
+
+    async def test_should_count_failures(self):
+        async def task(fail: bool):
+            if fail:
+                raise ValueError("failed")
+
+        async with BoundedTaskGroup(limit=2) as task_group:
+            for fail in [True, False, True]:
+                await task_group.spawn(task(fail))
+
+        assert task_group.failed == 2
@@ -3,10 +3,11 @@
 import pytest
 from sqlalchemy import select
 
-from database import VectorDB
+from src.database import AsyncVectorDB, VectorDB
 from src.core.exceptions import ConflictError
 from src.models.user import User
 from src.schemas.user import UserCreateSchema
+from src.service.cache import user_id_cache
 from src.service.user import UserService
 
 from tests import mock_async_func_generator
@@ -15,13 +16,13 @@ from tests import mock_async_func_generator
 # VectorDB and MockVectorDB should be implemented from
 # abc. They shouldn't depend on each other ideally.
 class MockVectorDB(VectorDB):
-    def create_collection(self, collection_name: str) -> None:
+    def create_tenant(self, tenant: str) -> None:
         pass
 
 
 @pytest.fixture
 def user_service():
-    return UserService(vector_db=MockVectorDB())
+    return UserService(vector_db=AsyncVectorDB(vector_db=MockVectorDB()))
 
 
 class TestCreateUser:
@@ -43,6 +44,8 @@ class TestCreateUser:
         assert user_in_db.name == "New user"
         assert user_in_db.teams_id == "random-uuid"
         assert user_in_db.id is not None
+        # The ID is cached by the first lookup, once the user is committed.
+        assert user_id_cache.get("random-uuid") is None
 
     async def test_should_raise_conflict_error(self, user_service, db_session):
         with pytest.raises(ConflictError) as error:
@@ -5,10 +5,12 @@ from datetime import datetime, timezone
 import pytest
 
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.schemas.dropbox import DropboxAuthToken
 from src.core import NotFoundError
 from src.models import DropboxToken
+from src.service.cache import user_id_cache
 from src.service.utils import get_user_id_from_teams_id, add_tokens_to_db
 
 
@@ -19,6 +21,7 @@ class TestGetUserIdFromTeamsID:
         )
         assert isinstance(result, int)
         assert result == 1
+        assert user_id_cache.get("test-user-1") == 1
 
     async def test_should_raise_not_found_error(self, db_session):
         with pytest.raises(NotFoundError) as error:
@@ -26,6 +29,17 @@ class TestGetUserIdFromTeamsID:
                 teams_id="non-existing-user", session=db_session
             )
 
+    async def test_should_use_cached_user_id(self, mocker):
+        user_id_cache.set("cached-user", 42)
+        session = mocker.MagicMock(spec=AsyncSession)
+
+        result = await get_user_id_from_teams_id(
+            teams_id="cached-user", session=session
+        )
+
+        assert result == 42
+        session.execute.assert_not_called()
+
 
 class TestAddTokensToDB:
     tokens = DropboxAuthToken(
@@ -0,0 +1,75 @@
+"""Unit tests for the background services of a process."""
+
+import asyncio
+
+import pytest
+
+from src import lifecycle
+from src.database import AsyncVectorDB
+from src.service.dropbox.index_job import IndexJobService
+from src.service.notification import NotificationListener
+
+from tests import mock_async_func_generator
+
+
+@pytest.fixture
+def services(mocker):
+    async def run_forever(*args, **kwargs):
+        await asyncio.Event().wait()
+
+    create_shared_tenant = mocker.patch.object(
+        AsyncVectorDB,
+        "create_shared_tenant",
+        side_effect=mock_async_func_generator(False),
+    )
+    mocker.patch.object(
+        AsyncVectorDB, "deactivate_idle_tenants_periodically", side_effect=run_forever
+    )
+    mocker.patch.object(NotificationListener, "listen", side_effect=run_forever)
+    mocker.patch.object(
+        lifecycle.chunk_cache, "evict_periodically", side_effect=run_forever
+    )
+    mocker.patch.object(
+        lifecycle.shared_contents,
+        "collect_garbage_periodically",
+        side_effect=run_forever,
+    )
+    run_jobs = mocker.patch.object(
+        IndexJobService, "run_jobs_periodically", side_effect=run_forever
+    )
+    closes = [
+        mocker.patch.object(lifecycle.vector_db_executor, "shutdown"),
+        mocker.patch.object(lifecycle.process_pool, "shutdown"),
+        mocker.patch.object(
+            lifecycle.http_client_manager,
+            "close",
+            side_effect=mock_async_func_generator(None),
+        ),
+        mocker.patch.object(lifecycle.vector_db_client_manager, "close"),
+    ]
+    return create_shared_tenant, run_jobs, closes
+
+
+class TestBackgroundServices:
+    async def test_should_start_and_stop_services(self, services):
+        create_shared_tenant, run_jobs, closes = services
+
+        async with lifecycle.background_services(job_workers=2):
+            await asyncio.sleep(0)
+            tasks = asyncio.all_tasks() - {asyncio.current_task()}
+            assert len(tasks) == 6
+
+        create_shared_tenant.assert_called_once()
+        assert run_jobs.call_count == 2
+        assert all(task.cancelled() for task in tasks)
+        for close in closes:
+            close.assert_called_once()
+
+    async def test_should_start_without_shared_tenant(self, services):
+        create_shared_tenant, _, closes = services
+
+        async with lifecycle.background_services(job_workers=0):
+            pass
+
+        create_shared_tenant.assert_called_once()
+        closes[-1].assert_called_once()
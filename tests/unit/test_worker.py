@@ -0,0 +1,54 @@
+"""Unit tests for the index job worker entry point."""
+
+import asyncio
+import signal
+from contextlib import asynccontextmanager
+
+from src import worker
+
+
+class TestRunWorker:
+    async def test_should_run_background_services_until_signal(self, mocker):
+        entered = asyncio.Event()
+        exited = mocker.MagicMock()
+
+        @asynccontextmanager
+        async def background_services(job_workers):
+            entered.set()
+            yield
+            exited(job_workers)
+
+        mocker.patch.object(worker, "background_services", background_services)
+        mocker.patch.object(worker.configuration.INDEX, "JOB_WORKERS", 0)
+        handlers = {}
+        loop = asyncio.get_running_loop()
+        mocker.patch.object(
+            loop,
+            "add_signal_handler",
+            side_effect=lambda stop_signal, callback: handlers.update(
+                {stop_signal: callback}
+            ),
+        )
+
+        task = asyncio.create_task(worker.run_worker())
+        await entered.wait()
+        assert set(handlers) == {signal.SIGINT, signal.SIGTERM}
+        exited.assert_not_called()
+
+        handlers[signal.SIGTERM]()
+        await task
+
+        exited.assert_called_once_with(1)
+
+
+class TestMain:
+    def test_should_run_worker(self, mocker):
+        basic_config = mocker.patch.object(worker.logging, "basicConfig")
+        run = mocker.patch.object(
+            worker.asyncio, "run", side_effect=lambda coroutine: coroutine.close()
+        )
+
+        worker.main()
+
+        basic_config.assert_called_once()
+        run.assert_called_once()